@@ -0,0 +1,173 @@
+"""
+Admin profiling and fault injection endpoints.
+Disabled (404) unless ADMIN_API_KEY is set; requests must send the key in the
+API_KEY_HEADER header. Each call profiles or reconfigures only the worker that
+receives it, identified by the pid in the response.
+"""
+
+import hmac
+import logging
+import os
+from typing import Any, Dict, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from pydantic import BaseModel, Field
+from app.core.config import settings
+from app.core.container import Container, get_container
+from app.core.profiling import ProfilerBusy, ProfilerStateError
+
+logger = logging.getLogger(__name__)
+
+
+async def require_admin(request: Request) -> None:
+    """Reject requests without the admin key; hide the endpoints when no key is configured."""
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    supplied = request.headers.get(settings.API_KEY_HEADER, "")
+    if not hmac.compare_digest(supplied.encode(), settings.ADMIN_API_KEY.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin key")
+
+
+router = APIRouter(
+    prefix="/admin/profile",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+    include_in_schema=False,
+)
+
+
+def _conflict(exc: Exception) -> HTTPException:
+    """Map a busy profiler or wrong tracing state to 409."""
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+
+
+@router.get("/cpu", response_class=PlainTextResponse)
+async def cpu_profile(
+    seconds: float = Query(default=10.0, gt=0.0, description="Profile duration (capped at PROFILE_MAX_SECONDS)"),
+    interval_ms: float = Query(default=10.0, ge=1.0, le=1000.0, description="Sampling interval"),
+    threads: Literal["loop", "all"] = Query(default="loop", description="Sample the event loop thread or every thread"),
+    container: Container = Depends(get_container)
+):
+    """
+    Sample the worker's stacks for a bounded time.
+
+    Returns collapsed stacks ("frame;frame;frame count" per line) for
+    flamegraph.pl, speedscope or inferno.
+    """
+    try:
+        profile = await container.profiler.cpu_profile(seconds, interval_ms / 1000, all_threads=threads == "all")
+    except ProfilerBusy as e:
+        raise _conflict(e)
+
+    body = "\n".join(f"{stack} {count}" for stack, count in profile["collapsed"].items())
+    return PlainTextResponse(
+        body + "\n",
+        headers={
+            "X-Profile-Samples": str(profile["samples"]),
+            "X-Profile-Seconds": str(profile["seconds"]),
+            "X-Profile-Pid": str(profile["pid"]),
+            "Content-Disposition": f'attachment; filename="cpu-{profile["pid"]}.collapsed"',
+        },
+    )
+
+
+@router.post("/memory/start")
+async def start_memory_tracing(
+    seconds: float = Query(default=300.0, gt=0.0, description="Stop tracing after this long (capped at PROFILE_TRACE_MAX_SECONDS)"),
+    container: Container = Depends(get_container)
+):
+    """Start tracemalloc and record the baseline snapshot."""
+    try:
+        return ORJSONResponse(await container.profiler.start_tracing(seconds))
+    except ProfilerStateError as e:
+        raise _conflict(e)
+
+
+@router.get("/memory/snapshot")
+async def memory_snapshot(
+    limit: int = Query(default=30, ge=1, le=500),
+    key_type: Literal["lineno", "filename", "traceback"] = Query(default="lineno"),
+    diff: bool = Query(default=True, description="Compare against the baseline instead of reporting totals"),
+    reset_baseline: bool = Query(default=False, description="Make this snapshot the baseline for the next diff"),
+    container: Container = Depends(get_container)
+):
+    """Top allocation sites, or the growth since the baseline."""
+    try:
+        return ORJSONResponse(
+            await container.profiler.memory_snapshot(limit, key_type, diff=diff, reset_baseline=reset_baseline)
+        )
+    except (ProfilerStateError, ProfilerBusy) as e:
+        raise _conflict(e)
+
+
+@router.post("/memory/stop")
+async def stop_memory_tracing(container: Container = Depends(get_container)):
+    """Stop tracemalloc."""
+    return ORJSONResponse(container.profiler.stop_tracing())
+
+
+@router.get("/tasks")
+async def task_dump(
+    limit: int = Query(default=200, ge=1, le=5000),
+    container: Container = Depends(get_container)
+):
+    """Await chain of every asyncio task, with counts per coroutine."""
+    return ORJSONResponse(container.profiler.task_dump(limit))
+
+
+@router.get("/loop")
+async def loop_blocks(container: Container = Depends(get_container)):
+    """Recent event loop stalls captured by the loop monitor (LOOP_MONITOR_ENABLED)."""
+    return ORJSONResponse({
+        "enabled": container.loop_monitor.running,
+        "blocks": container.loop_monitor.recent_blocks(),
+    })
+
+
+faults_router = APIRouter(
+    prefix="/admin/faults",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+    include_in_schema=False,
+)
+
+
+class FaultRulesUpdate(BaseModel):
+    """Replacement fault injection rules."""
+
+    rules: Dict[str, Dict[str, Any]] = Field(default_factory=dict, description="\"target\" or \"target.operation\" -> rule fields")
+    seed: Optional[int] = Field(default=None, description="Seed for reproducible fault sequences")
+
+
+def _faults_state(container: Container) -> ORJSONResponse:
+    state = container.faults.describe()
+    state["pid"] = os.getpid()
+    return ORJSONResponse(state)
+
+
+@faults_router.get("")
+async def get_faults(container: Container = Depends(get_container)):
+    """Active fault rules and counts of injected faults."""
+    return _faults_state(container)
+
+
+@faults_router.put("")
+async def set_faults(update: FaultRulesUpdate, container: Container = Depends(get_container)):
+    """Replace the fault rules, e.g. between load test phases (FAULT_INJECTION_ENABLED)."""
+    if not container.faults.enabled:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Fault injection is disabled; set FAULT_INJECTION_ENABLED"
+        )
+    try:
+        container.faults.configure(update.rules, update.seed)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    return _faults_state(container)
+
+
+@faults_router.delete("")
+async def clear_faults(container: Container = Depends(get_container)):
+    """Remove all fault rules; wrapped clients pass calls straight through."""
+    container.faults.configure({})
+    return _faults_state(container)
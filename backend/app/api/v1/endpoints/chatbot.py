@@ -4,9 +4,9 @@ Provides RESTful API for chat, streaming, and conversation history.
 """
 
 import logging
-from typing import AsyncGenerator
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
+from typing import AsyncGenerator, Optional, Union
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from app.schemas.chatbot import (
     ChatRequest,
     ChatResponse,
@@ -14,24 +14,116 @@ from app.schemas.chatbot import (
     HealthCheckResponse,
     StreamChunk
 )
-from app.services.chatbot_service import ChatbotService, get_chatbot_service
-from app.core.cache import CacheManager, get_cache
-from app.core.database import db_manager
+from app.core.container import Container, get_container
+from app.core.idempotency import IdempotencyConflict, request_fingerprint
+from app.core.metrics import STREAMS_IN_FLIGHT
+from app.core.stream_registry import StreamBuffer
+from app.core.token_budget import TokenBudgetExceeded
 from app.core.config import settings
+from app.utils.sse import DONE_FRAME, content_frame, error_frame, with_id
 from datetime import datetime
-import json
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/chatbot", tags=["Chatbot"])
 
 
+def _budget_exceeded(exc: TokenBudgetExceeded) -> HTTPException:
+    """Map a token budget rejection to 429, or 413 if the request can never fit."""
+    if exc.retry_after is None:
+        return HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Request is larger than the token budget allows. Shorten the message or history."
+        )
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Token budget exceeded. Please retry shortly.",
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
+def _idempotency_conflict(exc: IdempotencyConflict) -> HTTPException:
+    """Map an unusable Idempotency-Key to 409 (in progress) or 422 (payload mismatch)."""
+    headers = {"Retry-After": str(exc.retry_after)} if exc.retry_after else None
+    return HTTPException(status_code=exc.status_code, detail=str(exc), headers=headers)
+
+
+def _reject_if_unavailable(container: Container) -> None:
+    """
+    Refuse new chats until warm-up completes or once shutdown has begun, so
+    clients retry on another instance instead of reaching unconnected dependencies.
+    """
+    if not container.startup.complete:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is starting up. Please retry.",
+            headers={"Retry-After": "1"}
+        )
+    if container.drain.draining:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is shutting down. Please retry.",
+            headers={"Retry-After": "1"}
+        )
+
+
+def _idempotency_scope(endpoint: str, request: ChatRequest, key: str) -> str:
+    """Namespace a client key by endpoint and user so keys cannot collide across them."""
+    return f"{endpoint}:{request.user_id or 'anonymous'}:{key}"
+
+
+def _resume_offset(stream_id: str, last_event_id: Optional[str]) -> int:
+    """First chunk index to send after Last-Event-ID ("<stream_id>:<index>")."""
+    if not last_event_id:
+        return 0
+    sid, _, index = last_event_id.rpartition(":")
+    if sid != stream_id or not index.isdigit():
+        return 0
+    return int(index) + 1
+
+
+async def _sse_events(buffer: StreamBuffer, start: int = 0) -> AsyncGenerator[bytes, None]:
+    """Follow a stream buffer from start, framing each chunk with its event ID."""
+    stream_id = buffer.stream_id
+    STREAMS_IN_FLIGHT.inc()
+    try:
+        count = start
+        async for index, chunk in buffer.follow(start, settings.STREAM_COALESCE_AFTER_CHUNKS):
+            # Format as SSE
+            yield with_id(content_frame(chunk), f"{stream_id}:{index}")
+            count = index + 1
+        
+        if buffer.error:
+            yield with_id(error_frame(buffer.error), f"{stream_id}:{count}")
+        else:
+            # Send final done message
+            yield with_id(DONE_FRAME, f"{stream_id}:{count}")
+        
+    except Exception as e:
+        logger.error(f"Error in stream: {e}")
+        yield error_frame(str(e))
+    finally:
+        STREAMS_IN_FLIGHT.dec()
+
+
+def _sse_response(buffer: StreamBuffer, start: int = 0, replayed: bool = False) -> StreamingResponse:
+    headers = {
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+        "X-Accel-Buffering": "no",
+        "X-Stream-ID": buffer.stream_id
+    }
+    if replayed:
+        headers["Idempotent-Replayed"] = "true"
+    return StreamingResponse(_sse_events(buffer, start), media_type="text/event-stream", headers=headers)
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
-    chatbot_service: ChatbotService = Depends(get_chatbot_service),
-    cache: CacheManager = Depends(get_cache)
-) -> ChatResponse:
+    container: Container = Depends(get_container),
+    idempotency_key: Optional[str] = Header(default=None, max_length=255)
+) -> Union[ChatResponse, ORJSONResponse]:
     """
     Send a chat message and receive AI response.
     
@@ -39,29 +131,54 @@ async def chat(
     - **history**: Previous conversation messages (optional)
     - **user_id**: User identifier for tracking (optional)
     - **session_id**: Session identifier for conversation continuity (optional)
+    - **Idempotency-Key**: Header; retries with the same key return the first response (optional)
     
     Returns AI response with conversation metadata and caching information.
     """
     try:
-        # Rate limiting check if enabled
-        if settings.RATE_LIMIT_ENABLED and cache.is_connected:
-            identifier = request.user_id or "anonymous"
-            is_allowed, count = await cache.check_rate_limit(identifier)
-            
-            if not is_allowed:
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail=f"Rate limit exceeded. Max {settings.RATE_LIMIT_REQUESTS} requests per {settings.RATE_LIMIT_WINDOW_SECONDS} seconds."
-                )
+        _reject_if_unavailable(container)
+        
+        # Retries with the same Idempotency-Key get the original response
+        if idempotency_key:
+            scope = _idempotency_scope("chat", request, idempotency_key)
+            fingerprint = request_fingerprint(request.model_dump_json().encode())
+            stored = await container.idempotency.begin(scope, fingerprint)
+            if stored is not None:
+                return ORJSONResponse(stored, headers={"Idempotent-Replayed": "true"})
         
-        # Process chat request
-        response = await chatbot_service.chat(request)
+        try:
+            # Rate limiting check if enabled
+            if settings.RATE_LIMIT_ENABLED and container.cache.is_connected:
+                identifier = request.user_id or "anonymous"
+                is_allowed, count = await container.cache.check_rate_limit(identifier)
+                
+                if not is_allowed:
+                    raise HTTPException(
+                        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                        detail=f"Rate limit exceeded. Max {settings.RATE_LIMIT_REQUESTS} requests per {settings.RATE_LIMIT_WINDOW_SECONDS} seconds."
+                    )
+            
+            # Process chat request
+            response = await container.chatbot_service.chat(request)
+        except BaseException:
+            # Let a retry with the same key run again
+            if idempotency_key:
+                await container.idempotency.release(scope)
+            raise
         
         logger.info(f"Chat request processed successfully (cached: {response.cached})")
-        return response
+        # Built by the service, so skip response_model re-validation
+        payload = response.model_dump()
+        if idempotency_key:
+            await container.idempotency.complete(scope, fingerprint, payload)
+        return ORJSONResponse(payload)
         
     except HTTPException:
         raise
+    except IdempotencyConflict as e:
+        raise _idempotency_conflict(e)
+    except TokenBudgetExceeded as e:
+        raise _budget_exceeded(e)
     except Exception as e:
         logger.error(f"Error processing chat request: {e}")
         raise HTTPException(
@@ -73,8 +190,9 @@ async def chat(
 @router.post("/stream")
 async def stream_chat(
     request: ChatRequest,
-    chatbot_service: ChatbotService = Depends(get_chatbot_service),
-    cache: CacheManager = Depends(get_cache)
+    container: Container = Depends(get_container),
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
+    last_event_id: Optional[str] = Header(default=None)
 ):
     """
     Stream chat response in real-time using Server-Sent Events.
@@ -85,45 +203,70 @@ async def stream_chat(
     - **session_id**: Session identifier (optional)
     
     Returns a stream of text chunks as the AI generates the response.
+    Each event carries an `id` ("<stream_id>:<index>"); the stream ID is
+    also returned in the `X-Stream-ID` header for resuming.
+    A retry with the same `Idempotency-Key` header attaches to the original
+    stream (from `Last-Event-ID` if sent) instead of generating again.
     """
     try:
-        # Rate limiting check if enabled
-        if settings.RATE_LIMIT_ENABLED and cache.is_connected:
-            identifier = request.user_id or "anonymous"
-            is_allowed, count = await cache.check_rate_limit(identifier)
+        _reject_if_unavailable(container)
+        
+        if idempotency_key:
+            scope = _idempotency_scope("stream", request, idempotency_key)
+            fingerprint = request_fingerprint(request.model_dump_json().encode())
+            stored = await container.idempotency.begin(scope, fingerprint)
+            if stored is not None:
+                stream_id = stored["stream_id"]
+                buffer = await container.stream_registry.get(stream_id)
+                if buffer is None:
+                    # Still generating on another worker; resumable once it finishes
+                    raise IdempotencyConflict(
+                        "The original stream is not available on this worker yet", 409, retry_after=1
+                    )
+                return _sse_response(buffer, _resume_offset(stream_id, last_event_id), replayed=True)
+        
+        try:
+            # Rate limiting check if enabled
+            if settings.RATE_LIMIT_ENABLED and container.cache.is_connected:
+                identifier = request.user_id or "anonymous"
+                is_allowed, count = await container.cache.check_rate_limit(identifier)
+                
+                if not is_allowed:
+                    raise HTTPException(
+                        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                        detail=f"Rate limit exceeded."
+                    )
             
-            if not is_allowed:
+            if not container.stream_registry.reserve():
                 raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail=f"Rate limit exceeded."
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent streams. Please retry shortly.",
+                    headers={"Retry-After": "1"}
                 )
-        
-        async def event_generator() -> AsyncGenerator[str, None]:
-            """Generate Server-Sent Events."""
+            
             try:
-                async for chunk in chatbot_service.stream_chat(request):
-                    # Format as SSE
-                    yield f"data: {json.dumps({'content': chunk, 'done': False})}\n\n"
-                
-                # Send final done message
-                yield f"data: {json.dumps({'content': '', 'done': True})}\n\n"
-                
-            except Exception as e:
-                logger.error(f"Error in stream: {e}")
-                yield f"data: {json.dumps({'error': str(e), 'done': True})}\n\n"
-        
-        return StreamingResponse(
-            event_generator(),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no"
-            }
-        )
+                chunks = await container.chatbot_service.stream_chat(request)
+            except BaseException:
+                container.stream_registry.release()
+                raise
+        except BaseException:
+            # Let a retry with the same key run again
+            if idempotency_key:
+                await container.idempotency.release(scope)
+            raise
+        
+        # Generation runs detached so a dropped client can resume it
+        buffer = container.stream_registry.start(chunks)
+        if idempotency_key:
+            await container.idempotency.complete(scope, fingerprint, {"stream_id": buffer.stream_id})
+        return _sse_response(buffer)
         
     except HTTPException:
         raise
+    except IdempotencyConflict as e:
+        raise _idempotency_conflict(e)
+    except TokenBudgetExceeded as e:
+        raise _budget_exceeded(e)
     except Exception as e:
         logger.error(f"Error setting up stream: {e}")
         raise HTTPException(
@@ -132,11 +275,36 @@ async def stream_chat(
         )
 
 
+@router.get("/stream/{stream_id}")
+async def resume_stream(
+    stream_id: str,
+    last_event_id: Optional[str] = Header(default=None),
+    container: Container = Depends(get_container)
+):
+    """
+    Resume a stream after a dropped connection.
+    
+    - **stream_id**: ID from the `X-Stream-ID` header or event IDs
+    - **Last-Event-ID**: Last event received (header); omit to replay from the start
+    
+    Continues live if the generation is still running, otherwise replays the
+    buffered response. No new LLM call is made.
+    """
+    buffer = await container.stream_registry.get(stream_id)
+    if buffer is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Stream not found or expired"
+        )
+    
+    return _sse_response(buffer, _resume_offset(stream_id, last_event_id))
+
+
 @router.get("/history/{session_id}", response_model=ConversationHistoryResponse)
 async def get_history(
     session_id: str,
-    chatbot_service: ChatbotService = Depends(get_chatbot_service)
-) -> ConversationHistoryResponse:
+    container: Container = Depends(get_container)
+) -> Union[ConversationHistoryResponse, ORJSONResponse]:
     """
     Retrieve conversation history for a session.
     
@@ -145,18 +313,19 @@ async def get_history(
     Returns all messages in the conversation session.
     """
     try:
-        messages = await chatbot_service.get_session_history(session_id)
+        messages = await container.chatbot_service.get_session_history(session_id)
         
         created_at = messages[0].timestamp if messages else None
         updated_at = messages[-1].timestamp if messages else None
         
-        return ConversationHistoryResponse(
+        history = ConversationHistoryResponse(
             session_id=session_id,
             messages=messages,
             message_count=len(messages),
             created_at=created_at,
             updated_at=updated_at
         )
+        return ORJSONResponse(history.model_dump())
         
     except Exception as e:
         logger.error(f"Error retrieving history: {e}")
@@ -169,7 +338,7 @@ async def get_history(
 @router.delete("/history/{session_id}")
 async def clear_history(
     session_id: str,
-    chatbot_service: ChatbotService = Depends(get_chatbot_service)
+    container: Container = Depends(get_container)
 ) -> dict:
     """
     Clear conversation history for a session.
@@ -179,7 +348,7 @@ async def clear_history(
     Returns the number of conversations deleted.
     """
     try:
-        deleted_count = await chatbot_service.clear_session_history(session_id)
+        deleted_count = await container.chatbot_service.clear_session_history(session_id)
         
         return {
             "session_id": session_id,
@@ -195,31 +364,57 @@ async def clear_history(
         )
 
 
+@router.get("/intents/stats")
+async def intent_stats(
+    container: Container = Depends(get_container)
+) -> dict:
+    """
+    Report intent fast-path hit rates.
+    
+    Returns per-intent hit counts and the share of chat traffic answered
+    from the answer bank without calling the LLM.
+    """
+    return {
+        "enabled": settings.INTENT_FASTPATH_ENABLED,
+        **container.intent_router.stats()
+    }
+
+
 @router.get("/health", response_model=HealthCheckResponse)
 async def health_check(
-    cache: CacheManager = Depends(get_cache)
+    container: Container = Depends(get_container)
 ) -> HealthCheckResponse:
     """
     Check health status of chatbot service and its dependencies.
     
     Returns:
-        Health status of MongoDB, Redis, and OpenRouter API
+        Health status of MongoDB, Redis, and OpenRouter API from the latest
+        background probe, with measured latency and age
     """
     try:
         services = {}
+        checks = container.health_prober.snapshot()
+        
+        def probed(name: str) -> dict:
+            check = checks.get(name)
+            if check is None:
+                return {"status": "unknown", "reason": "Not probed yet"}
+            entry = {
+                "status": "connected" if check["healthy"] else "disconnected",
+                "latency_ms": check["latency_ms"],
+                "age_seconds": check["age_seconds"]
+            }
+            if check["stale"]:
+                entry["stale"] = True
+            return entry
         
         # Check MongoDB
-        mongodb_healthy = await db_manager.health_check()
-        services["mongodb"] = {
-            "status": "connected" if mongodb_healthy else "disconnected"
-        }
+        services["mongodb"] = probed("mongodb")
+        mongodb_healthy = services["mongodb"]["status"] == "connected"
         
         # Check Redis
-        if cache.is_enabled:
-            redis_healthy = await cache.health_check()
-            services["redis"] = {
-                "status": "connected" if redis_healthy else "disconnected"
-            }
+        if container.cache.is_enabled:
+            services["redis"] = probed("redis")
         else:
             services["redis"] = {
                 "status": "disabled",
@@ -0,0 +1,307 @@
+"""
+Chatbot WebSocket endpoint.
+Keeps one connection per visitor with the session history held server-side,
+so each turn only sends the new message.
+
+Client messages (JSON text frames):
+    {"type": "chat", "message": "..."}   start a turn
+    {"type": "cancel"}                   stop the turn in progress
+    {"type": "ping"}                     keep-alive, answered with "pong"
+
+Server messages:
+    {"type": "session", "session_id": "..."}
+    {"type": "chunk", "content": "..."}
+    {"type": "done", "cancelled": false}
+    {"type": "error", "detail": "...", "retry_after": 12}
+    {"type": "ping"} / {"type": "pong"}
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, Query, WebSocket, status
+from pydantic import ValidationError
+from app.schemas.chatbot import MAX_HISTORY_MESSAGES, ChatMessage, ChatRequest
+from app.services.chatbot_service import ChatbotService
+from app.core.cache import CacheManager
+from app.core.container import Container, get_container
+from app.core.context import request_id_var, user_id_var
+from app.core.drain import drain_coordinator
+from app.core.metrics import WEBSOCKETS_OPEN
+from app.core.startup import startup
+from app.core.token_budget import TokenBudgetExceeded
+from app.core.config import settings
+from datetime import datetime
+import orjson
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/chatbot", tags=["Chatbot"])
+
+PING_FRAME = '{"type":"ping"}'
+PONG_FRAME = '{"type":"pong"}'
+
+
+def _frame(data: Dict[str, Any]) -> str:
+    return orjson.dumps(data).decode()
+
+
+def _chunk_frame(content: str) -> str:
+    return '{"type":"chunk","content":' + orjson.dumps(content).decode() + "}"
+
+
+class SlowConsumer(Exception):
+    """Raised when a client stops reading frames."""
+
+
+class ChatSocket:
+    """One WebSocket connection: receive loop, generation task, writer and heartbeat."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        chatbot_service: ChatbotService,
+        cache: CacheManager,
+        session_id: str,
+        user_id: Optional[str]
+    ):
+        self.websocket = websocket
+        self.chatbot_service = chatbot_service
+        self.cache = cache
+        self.session_id = session_id
+        self.user_id = user_id
+        self.history: List[ChatMessage] = []
+        # ChatRequest rejects longer histories
+        self.max_history = min(settings.MAX_CONVERSATION_HISTORY, MAX_HISTORY_MESSAGES)
+        # Bounded so a slow client pushes back on generation instead of growing memory
+        self.outbox: asyncio.Queue = asyncio.Queue(maxsize=settings.WS_SEND_QUEUE_SIZE)
+        self.generation: Optional[asyncio.Task] = None
+        # True from turn start until its terminal frame is queued
+        self.turn_active = False
+        self.last_seen = time.monotonic()
+        self.closed = False
+
+    async def run(self) -> None:
+        """Serve the connection until the client leaves or it is closed."""
+        writer = asyncio.create_task(self._writer())
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            await self._send(_frame({"type": "session", "session_id": self.session_id}))
+            while not self.closed:
+                message = await self.websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                self.last_seen = time.monotonic()
+                raw = message.get("text") or message.get("bytes") or b""
+                await self._handle(raw)
+        finally:
+            self.closed = True
+            # A turn in progress finishes detached, like a stream, so its answer is
+            # saved; the drain waits for it on shutdown and cancels it at the deadline
+            for task in (heartbeat, writer):
+                task.cancel()
+            await asyncio.gather(heartbeat, writer, return_exceptions=True)
+
+    async def _handle(self, raw) -> None:
+        """Dispatch one client message."""
+        try:
+            data = orjson.loads(raw)
+            kind = data.get("type")
+        except (orjson.JSONDecodeError, AttributeError):
+            await self._send(_frame({"type": "error", "detail": "Invalid message"}))
+            return
+
+        if kind == "ping":
+            await self._send(PONG_FRAME)
+        elif kind == "cancel":
+            if self.turn_active:
+                self.generation.cancel()
+        elif kind == "chat":
+            if self.turn_active:
+                await self._send(_frame({"type": "error", "detail": "A response is already in progress"}))
+                return
+            if not startup.complete:
+                await self._send(_frame({
+                    "type": "error",
+                    "detail": "Server is starting up. Please retry.",
+                    "retry_after": 1
+                }))
+                return
+            if drain_coordinator.draining:
+                await self._send(_frame({"type": "error", "detail": "Server is shutting down. Please reconnect."}))
+                return
+            self.turn_active = True
+            self.generation = drain_coordinator.track(
+                "websocket", asyncio.create_task(self._generate(data.get("message", "")))
+            )
+        else:
+            await self._send(_frame({"type": "error", "detail": f"Unknown message type: {kind}"}))
+
+    async def _generate(self, message: str) -> None:
+        """Run one chat turn; the terminal frame is sent only after cleanup."""
+        parts: List[str] = []
+        try:
+            final = await self._stream_turn(message, parts)
+        except asyncio.CancelledError:
+            logger.info(f"WebSocket turn cancelled for session {self.session_id}")
+            final = '{"type":"done","cancelled":true}'
+        except ValidationError as e:
+            final = _frame({"type": "error", "detail": e.errors()[0]["msg"]})
+        except TokenBudgetExceeded as e:
+            if e.retry_after is None:
+                final = _frame({"type": "error", "detail": "Message is larger than the token budget allows."})
+            else:
+                final = _frame({
+                    "type": "error",
+                    "detail": "Token budget exceeded. Please retry shortly.",
+                    "retry_after": e.retry_after
+                })
+        except SlowConsumer:
+            logger.warning(f"Closing slow WebSocket client for session {self.session_id}")
+            self.turn_active = False
+            await self._close(status.WS_1013_TRY_AGAIN_LATER)
+            return
+        except Exception as e:
+            logger.error(f"Error in WebSocket chat: {e}")
+            final = _frame({"type": "error", "detail": "Error generating response"})
+
+        if parts:
+            now = datetime.utcnow()
+            self.history.append(ChatMessage(role="user", content=message.strip(), timestamp=now))
+            self.history.append(ChatMessage(role="assistant", content="".join(parts), timestamp=now))
+            del self.history[:-self.max_history]
+
+        self.turn_active = False
+        if not self.closed:
+            try:
+                await self._send(final)
+            except SlowConsumer:
+                await self._close(status.WS_1013_TRY_AGAIN_LATER)
+
+    async def _stream_turn(self, message: str, parts: List[str]) -> str:
+        """
+        Stream one turn to the client.
+
+        Args:
+            message: User message
+            parts: Collects the chunks sent so far
+
+        Returns:
+            str: Terminal frame to send
+        """
+        request = ChatRequest(
+            message=message,
+            history=self.history[-self.max_history:],
+            user_id=self.user_id,
+            session_id=self.session_id
+        )
+
+        if settings.RATE_LIMIT_ENABLED and self.cache.is_connected:
+            is_allowed, _ = await self.cache.check_rate_limit(self.user_id or "anonymous")
+            if not is_allowed:
+                return _frame({"type": "error", "detail": "Rate limit exceeded."})
+
+        chunks = await self.chatbot_service.stream_chat(request)
+        try:
+            async for chunk in chunks:
+                if not self.closed:
+                    await self._send(_chunk_frame(chunk))
+                parts.append(chunk)
+        finally:
+            if hasattr(chunks, "aclose"):
+                # Release the budget reservation and upstream connection promptly
+                await asyncio.shield(chunks.aclose())
+
+        return '{"type":"done","cancelled":false}'
+
+    async def _send(self, frame: str) -> None:
+        """Queue a frame, waiting for room up to WS_SEND_TIMEOUT_SECONDS."""
+        try:
+            self.outbox.put_nowait(frame)
+            return
+        except asyncio.QueueFull:
+            pass
+        try:
+            await asyncio.wait_for(self.outbox.put(frame), timeout=settings.WS_SEND_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            raise SlowConsumer()
+
+    def _offer(self, frame: str) -> None:
+        """Queue a frame if there is room; used for best-effort notices."""
+        try:
+            self.outbox.put_nowait(frame)
+        except asyncio.QueueFull:
+            pass
+
+    async def _writer(self) -> None:
+        """Drain the outbox to the socket."""
+        try:
+            while True:
+                frame = await self.outbox.get()
+                await self.websocket.send_text(frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Client went away; the receive loop sees the disconnect
+            self.closed = True
+
+    async def _heartbeat(self) -> None:
+        """Send pings and close idle connections."""
+        while not self.closed:
+            await asyncio.sleep(settings.WS_HEARTBEAT_SECONDS)
+            idle = time.monotonic() - self.last_seen
+            if idle > settings.WS_IDLE_TIMEOUT_SECONDS and not self.turn_active:
+                await self._close(status.WS_1000_NORMAL_CLOSURE)
+                return
+            self._offer(PING_FRAME)
+
+    async def _close(self, code: int) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+
+def _origin_allowed(websocket: WebSocket) -> bool:
+    """WebSockets bypass CORS, so check Origin against the same allow-list."""
+    origin = websocket.headers.get("origin")
+    if origin is None or "*" in settings.CORS_ORIGINS:
+        return True
+    return origin in settings.CORS_ORIGINS
+
+
+@router.websocket("/ws")
+async def chat_socket(
+    websocket: WebSocket,
+    session_id: Optional[str] = Query(default=None, max_length=128),
+    user_id: Optional[str] = Query(default=None, max_length=128),
+    container: Container = Depends(get_container)
+):
+    """
+    Multi-turn chat over a single WebSocket connection.
+
+    - **session_id**: Session identifier (optional, generated if omitted)
+    - **user_id**: User identifier (optional)
+
+    History is kept server-side for the life of the connection.
+    """
+    if not _origin_allowed(websocket):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+
+    session_id = session_id or str(uuid.uuid4())
+    request_id_var.set(uuid.uuid4().hex)
+    user_id_var.set(user_id)
+
+    WEBSOCKETS_OPEN.inc()
+    try:
+        await ChatSocket(websocket, container.chatbot_service, container.cache, session_id, user_id).run()
+    finally:
+        WEBSOCKETS_OPEN.dec()
@@ -4,14 +4,17 @@ Combines all v1 endpoints into a single router.
 """
 
 from fastapi import APIRouter
-from app.api.v1.endpoints import chatbot, contact
+from app.api.v1.endpoints import admin, chatbot, chatbot_ws, contact
 
 # Create v1 API router
 api_router = APIRouter(prefix="/v1")
 
 # Include all endpoint routers
 api_router.include_router(chatbot.router)
+api_router.include_router(chatbot_ws.router)
 api_router.include_router(contact.router)
+api_router.include_router(admin.router)
+api_router.include_router(admin.faults_router)
 
 # Add more routers here as needed
 # api_router.include_router(users.router)
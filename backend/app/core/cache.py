@@ -3,12 +3,15 @@ Redis cache management for caching and rate limiting.
 Gracefully degrades when Redis is not available.
 """
 
+import asyncio
 import logging
 from typing import Optional, Any
 import json
 from redis import asyncio as aioredis
 from redis.exceptions import RedisError, ConnectionError
 from app.core.config import settings
+from app.core.faults import fault_injector
+from app.core.metrics import track_redis
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +23,8 @@ class CacheManager:
         self.redis: Optional[aioredis.Redis] = None
         self._is_connected = False
         self._is_enabled = settings.REDIS_ENABLED
+        # Serializes startup and on-demand connects so only one pool is created
+        self._connect_lock = asyncio.Lock()
     
     async def connect(self) -> None:
         """
@@ -30,17 +35,22 @@ class CacheManager:
             logger.info("Redis is disabled in configuration")
             return
         
+        async with self._connect_lock:
+            if not self._is_connected:
+                await self._connect()
+    
+    async def _connect(self) -> None:
         try:
             logger.info(f"Connecting to Redis at {settings.REDIS_HOST}:{settings.REDIS_PORT}")
             
-            self.redis = await aioredis.from_url(
+            self.redis = fault_injector.wrap_redis(await aioredis.from_url(
                 f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}",
                 password=settings.REDIS_PASSWORD,
                 max_connections=settings.REDIS_POOL_SIZE,
                 decode_responses=True,
                 socket_timeout=settings.REDIS_TIMEOUT,
                 socket_connect_timeout=settings.REDIS_TIMEOUT,
-            )
+            ))
             
             # Verify connection
             await self.redis.ping()
@@ -68,6 +78,7 @@ class CacheManager:
             except Exception as e:
                 logger.error(f"Error disconnecting from Redis: {e}")
     
+    @track_redis("ping")
     async def health_check(self) -> bool:
         """
         Check Redis connection health.
@@ -85,6 +96,7 @@ class CacheManager:
             logger.error(f"Redis health check failed: {e}")
             return False
     
+    @track_redis("get")
     async def get(self, key: str) -> Optional[str]:
         """
         Get value from cache.
@@ -107,6 +119,7 @@ class CacheManager:
             logger.warning(f"Error getting cache key {key}: {e}")
             return None
     
+    @track_redis("setex")
     async def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
         """
         Set value in cache with optional TTL.
@@ -131,6 +144,7 @@ class CacheManager:
             logger.warning(f"Error setting cache key {key}: {e}")
             return False
     
+    @track_redis("delete")
     async def delete(self, key: str) -> bool:
         """
         Delete key from cache.
@@ -152,6 +166,7 @@ class CacheManager:
             logger.warning(f"Error deleting cache key {key}: {e}")
             return False
     
+    @track_redis("incrby")
     async def increment(self, key: str, amount: int = 1) -> Optional[int]:
         """
         Increment a counter in cache.
@@ -172,6 +187,7 @@ class CacheManager:
             logger.warning(f"Error incrementing cache key {key}: {e}")
             return None
     
+    @track_redis("expire")
     async def expire(self, key: str, ttl: int) -> bool:
         """
         Set expiration time for a key.
@@ -193,6 +209,7 @@ class CacheManager:
             logger.warning(f"Error setting expiration for key {key}: {e}")
             return False
     
+    @track_redis("rate_limit")
     async def check_rate_limit(self, identifier: str, max_requests: Optional[int] = None, window: Optional[int] = None) -> tuple[bool, int]:
         """
         Check if request is within rate limit.
@@ -251,11 +268,9 @@ cache_manager = CacheManager()
 async def get_cache() -> CacheManager:
     """
     Dependency to get cache manager.
+    Reconnection after a failure is handled by the background health prober.
     
     Returns:
         CacheManager: Cache manager instance
     """
-    if cache_manager.is_enabled and not cache_manager.is_connected:
-        await cache_manager.connect()
-    
     return cache_manager
@@ -3,7 +3,7 @@ Centralized configuration management for the chatbot service.
 Uses Pydantic Settings for environment variable validation and type safety.
 """
 
-from typing import Optional, List
+from typing import Any, Optional, List, Dict
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, validator
 
@@ -20,6 +20,9 @@ class Settings(BaseSettings):
     # Server Settings
     HOST: str = Field(default="0.0.0.0")
     PORT: int = Field(default=8000)
+    WORKERS: int = Field(default=0, ge=0, description="Worker processes started by serve.py (0 = one per available CPU)")
+    GRACEFUL_SHUTDOWN_SECONDS: int = Field(default=30, description="Time in-flight requests and streams get to finish on shutdown")
+    DRAIN_TIMEOUT_SECONDS: float = Field(default=20.0, description="Time detached stream generations and pending writes get to finish before clients close")
     
     # CORS Settings
     CORS_ORIGINS: List[str] = Field(
@@ -43,6 +46,9 @@ class Settings(BaseSettings):
     OPENROUTER_FALLBACK_MODEL: Optional[str] = Field(default="openai/gpt-3.5-turbo", description="Fallback model")
     SITE_URL: str = Field(default="https://www.bigfat.ai")
     SITE_NAME: str = Field(default="BIGFAT AI")
+    LLM_MAX_CONNECTIONS: int = Field(default=100, description="Max open connections in the shared OpenRouter HTTP pool")
+    LLM_KEEPALIVE_SECONDS: float = Field(default=30.0, description="How long idle OpenRouter connections stay open for reuse")
+    LLM_WARM_CONNECTIONS: int = Field(default=2, description="OpenRouter connections opened during warm-up (0 disables)")
     
     # MongoDB Settings
     MONGODB_URI: Optional[str] = Field(
@@ -54,10 +60,12 @@ class Settings(BaseSettings):
     MONGODB_MAX_POOL_SIZE: int = Field(default=10, description="MongoDB connection pool size")
     MONGODB_MIN_POOL_SIZE: int = Field(default=1)
     MONGODB_TIMEOUT_MS: int = Field(default=15000, description="MongoDB connection timeout in milliseconds")
+    MONGODB_TLS: bool = Field(default=True, description="Connect with TLS; disable for a local MongoDB without TLS")
     
     # Contact Database Settings
     MONGODB_CONTACT_DATABASE: str = Field(default="contact", description="MongoDB database name for contacts")
     MONGODB_ENQUIRY_COLLECTION: str = Field(default="enquiry", description="MongoDB collection for contact enquiries")
+    MONGODB_SUMMARY_COLLECTION: str = Field(default="session_summaries", description="MongoDB collection for rolling session summaries")
     
     # Redis Settings (Optional - for future use)
     REDIS_ENABLED: bool = Field(default=False, description="Enable Redis for caching and rate limiting")
@@ -71,17 +79,72 @@ class Settings(BaseSettings):
     # Caching Settings
     CACHE_TTL_SECONDS: int = Field(default=3600, description="Default cache TTL (1 hour)")
     CACHE_ENABLED: bool = Field(default=False, description="Enable response caching (requires Redis)")
+    SEMANTIC_CACHE_ENABLED: bool = Field(default=False, description="Enable in-process semantic cache for first-turn questions")
+    SEMANTIC_CACHE_THRESHOLD: float = Field(default=0.97, description="Min cosine similarity for a semantic cache hit (content terms must also match)")
+    SEMANTIC_CACHE_SIZE: int = Field(default=1000, description="Max questions held in the semantic cache (LRU)")
     
     # Rate Limiting Settings
     RATE_LIMIT_ENABLED: bool = Field(default=False, description="Enable rate limiting (requires Redis)")
     RATE_LIMIT_REQUESTS: int = Field(default=20, description="Max requests per window")
     RATE_LIMIT_WINDOW_SECONDS: int = Field(default=60, description="Rate limit window in seconds")
-    
+
+    # Token Budget Settings
+    TOKEN_BUDGET_ENABLED: bool = Field(default=False, description="Enforce rolling tokens-per-minute budgets before calling the LLM")
+    TOKEN_BUDGET_GLOBAL_TPM: int = Field(default=200_000, description="Max tokens per minute across all users")
+    TOKEN_BUDGET_USER_TPM: int = Field(default=20_000, description="Max tokens per minute per user_id")
+    TOKEN_BUDGET_ACTION: str = Field(default="downgrade", description="Action when over budget: reject or downgrade")
+    TOKEN_BUDGET_DOWNGRADE_MODEL: Optional[str] = Field(default=None, description="Model used when downgrading. Defaults to OPENROUTER_FALLBACK_MODEL")
+    TOKEN_BUDGET_DOWNGRADE_MAX_TOKENS: int = Field(default=512, description="Completion token cap for downgraded requests")
+    TOKEN_BUDGET_MIN_COMPLETION_TOKENS: int = Field(default=256, ge=1, description="Requests are capped to the remaining budget, and rejected only when fewer completion tokens than this are left")
+    TOKEN_USAGE_TTL_SECONDS: int = Field(default=604_800, description="Retention for per-user and per-session token usage (7 days)")
+
     # Chatbot Settings
-    MAX_CONVERSATION_HISTORY: int = Field(default=10, description="Max messages to include in context")
+    MAX_CONVERSATION_HISTORY: int = Field(default=10, description="Max messages to include in context (the token budget may bind first)")
     MAX_TOKENS: int = Field(default=4000, description="Max tokens for LLM response")
+    COMPLETION_RESERVE_TOKENS: int = Field(default=512, description="Context tokens reserved for the completion when filling history")
+    DEFAULT_CONTEXT_WINDOW: int = Field(default=8192, description="Context window for models not listed in MODEL_CONTEXT_WINDOWS")
+    MODEL_CONTEXT_WINDOWS: Dict[str, int] = Field(
+        default={
+            "anthropic/claude-3-haiku": 200_000,
+            "openai/gpt-4o": 128_000,
+            "openai/gpt-4o-mini": 128_000,
+            "openai/gpt-3.5-turbo": 16_385,
+        },
+        description="Context window per model (JSON object)"
+    )
+    TOKENIZER_ENCODING: str = Field(default="cl100k_base", description="tiktoken encoding used for token counting")
+    TOKENIZER_CACHE_DIR: str = Field(default="data/tiktoken", description="Directory holding the tiktoken BPE file, seeded at build time (TIKTOKEN_CACHE_DIR overrides)")
+    TOKEN_COUNT_CACHE_SIZE: int = Field(default=4096, description="Max cached token counts (LRU)")
     TEMPERATURE: float = Field(default=0.7, description="LLM temperature")
     STREAM_ENABLED: bool = Field(default=True, description="Enable streaming responses")
+    IDEMPOTENCY_TTL_SECONDS: int = Field(default=3600, description="How long results are kept for Idempotency-Key retries")
+    IDEMPOTENCY_WAIT_SECONDS: float = Field(default=30.0, description="How long a retry waits for the original request before returning 409")
+    STREAM_RESUME_TTL_SECONDS: int = Field(default=300, description="How long finished streams stay resumable")
+    STREAM_REGISTRY_MAX_STREAMS: int = Field(default=1000, description="Max streams buffered in-process per worker; older finished ones are evicted")
+    STREAM_SLOW_CLIENT_POLICY: str = Field(default="coalesce", description="Slow SSE clients: coalesce (merge pending chunks) or abort (also stop generation after STREAM_MAX_LAG_SECONDS)")
+    STREAM_COALESCE_AFTER_CHUNKS: int = Field(default=8, ge=0, description="Merge pending chunks into one frame once a client is this far behind (0 disables)")
+    STREAM_MAX_LAG_SECONDS: float = Field(default=30.0, description="Lag after which the abort policy stops generation and saves the partial answer")
+    MAX_CONCURRENT_STREAMS: int = Field(default=200, ge=1, description="Max generating SSE streams per worker; further requests get 503")
+    
+    # WebSocket Settings
+    WS_HEARTBEAT_SECONDS: float = Field(default=20.0, description="Interval between server ping frames")
+    WS_IDLE_TIMEOUT_SECONDS: float = Field(default=300.0, description="Close connections with no client messages for this long")
+    WS_SEND_QUEUE_SIZE: int = Field(default=64, ge=1, description="Frames buffered per connection before generation waits for the client")
+    WS_SEND_TIMEOUT_SECONDS: float = Field(default=10.0, description="Abort a turn when the client stops reading for this long")
+    
+    # Intent Fast-Path Settings
+    INTENT_FASTPATH_ENABLED: bool = Field(default=False, description="Answer canned requests from the answer bank without calling the LLM")
+    INTENT_ANSWER_BANK_PATH: str = Field(default="data/answer_bank.json", description="Path to the versioned answer bank")
+    INTENT_MAX_WORDS: int = Field(default=12, description="Messages longer than this always go to the LLM")
+    INTENT_VECTOR_ENABLED: bool = Field(default=False, description="Also match intents by similarity to answer bank examples")
+    INTENT_VECTOR_THRESHOLD: float = Field(default=0.85, description="Min similarity for a vector intent match")
+    
+    # Conversation Summary Settings
+    SUMMARY_ENABLED: bool = Field(default=False, description="Maintain rolling summaries for long sessions")
+    SUMMARY_TRIGGER_TOKENS: int = Field(default=2000, description="Unsummarized history tokens that trigger a summary update")
+    SUMMARY_KEEP_MESSAGES: int = Field(default=6, description="Most recent history messages always sent verbatim")
+    SUMMARY_MAX_TOKENS: int = Field(default=300, description="Max tokens for a generated summary")
+    SUMMARY_MODEL: Optional[str] = Field(default=None, description="Model used for summaries. Defaults to OPENROUTER_FALLBACK_MODEL")
     
     # Knowledgebase Settings
     KNOWLEDGEBASE_PATH: str = Field(default="data/knowledgebase.txt", description="Path to knowledgebase file")
@@ -90,12 +153,29 @@ class Settings(BaseSettings):
     # Logging Settings
     LOG_LEVEL: str = Field(default="INFO", description="Logging level: DEBUG, INFO, WARNING, ERROR, CRITICAL")
     JSON_LOGS: bool = Field(default=False, description="Enable JSON formatted logs")
+    LOG_QUEUE_SIZE: int = Field(default=10000, ge=1, description="Max log records buffered for the writer thread; extra records are dropped")
+    LOG_DEDUP_WINDOW_SECONDS: float = Field(default=10.0, ge=0.0, description="Suppress identical warnings repeated within this window (0 disables)")
+    ACCESS_LOG_LEVEL: str = Field(default="INFO", description="Level access log lines are emitted at; set above LOG_LEVEL to silence them")
+    ACCESS_LOG_SAMPLE_RATE: float = Field(default=1.0, ge=0.0, le=1.0, description="Fraction of successful requests written to the access log (5xx other than 503 are always logged)")
     
     # Monitoring Settings
     METRICS_ENABLED: bool = Field(default=True, description="Enable Prometheus metrics")
+    HEALTH_PROBE_INTERVAL_SECONDS: float = Field(default=15.0, description="Interval between background dependency probes")
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = Field(default=2.0, description="Timeout for a single dependency probe")
+    HEALTH_READY_REQUIRES: List[str] = Field(default=[], description="Dependencies (mongodb, redis) that must be healthy for /readyz")
+    STARTUP_PHASE_TIMEOUT_SECONDS: float = Field(default=30.0, description="Max time for one background startup phase before it is reported failed")
+    LOOP_MONITOR_ENABLED: bool = Field(default=False, description="Sample event loop lag and log the stack of callbacks that block the loop")
+    LOOP_MONITOR_INTERVAL_SECONDS: float = Field(default=0.25, gt=0.0, description="Interval between event loop lag samples")
+    LOOP_BLOCK_THRESHOLD_SECONDS: float = Field(default=0.1, gt=0.0, description="Lag above which the blocking callback's stack is captured and logged")
+    FAULT_INJECTION_ENABLED: bool = Field(default=False, description="Wrap MongoDB, Redis and OpenRouter clients with the fault injector (ignored in production)")
+    FAULT_INJECTION_RULES: Dict[str, Dict[str, Any]] = Field(default={}, description="Faults per \"target\" or \"target.operation\" (mongo, redis, llm), as JSON")
+    FAULT_INJECTION_SEED: Optional[int] = Field(default=None, description="Seed for reproducible fault sequences")
     
     # Security Settings
     API_KEY_HEADER: str = Field(default="X-API-Key", description="Header name for API key")
+    ADMIN_API_KEY: Optional[str] = Field(default=None, description="Key for /api/v1/admin endpoints, sent in API_KEY_HEADER; admin endpoints are disabled when unset")
+    PROFILE_MAX_SECONDS: float = Field(default=60.0, gt=0.0, description="Longest CPU profile an admin can request")
+    PROFILE_TRACE_MAX_SECONDS: float = Field(default=600.0, gt=0.0, description="tracemalloc stops automatically after at most this long")
     REQUEST_TIMEOUT: int = Field(default=30, description="Request timeout in seconds")
     MAX_REQUEST_SIZE: int = Field(default=10_000, description="Max request body size in bytes")
     
@@ -121,7 +201,31 @@ class Settings(BaseSettings):
         if v.upper() not in allowed:
             raise ValueError(f"LOG_LEVEL must be one of {allowed}")
         return v.upper()
-    
+
+    @validator("ACCESS_LOG_LEVEL")
+    def validate_access_log_level(cls, v):
+        """Validate access log level is valid."""
+        allowed = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+        if v.upper() not in allowed:
+            raise ValueError(f"ACCESS_LOG_LEVEL must be one of {allowed}")
+        return v.upper()
+
+    @validator("STREAM_SLOW_CLIENT_POLICY")
+    def validate_slow_client_policy(cls, v):
+        """Validate slow client policy is known."""
+        allowed = ["coalesce", "abort"]
+        if v.lower() not in allowed:
+            raise ValueError(f"STREAM_SLOW_CLIENT_POLICY must be one of {allowed}")
+        return v.lower()
+
+    @validator("TOKEN_BUDGET_ACTION")
+    def validate_token_budget_action(cls, v):
+        """Validate token budget action is supported."""
+        allowed = ["reject", "downgrade"]
+        if v.lower() not in allowed:
+            raise ValueError(f"TOKEN_BUDGET_ACTION must be one of {allowed}")
+        return v.lower()
+
     @property
     def is_production(self) -> bool:
         """Check if running in production environment."""
@@ -0,0 +1,111 @@
+"""
+Application-scoped dependency container.
+Built once in lifespan and stored on app.state, so request dependencies are
+an attribute lookup instead of constructing services and repositories per
+request.
+"""
+
+from starlette.requests import HTTPConnection
+from app.core.cache import CacheManager, cache_manager
+from app.core.database import DatabaseManager, db_manager
+from app.core.drain import DrainCoordinator, drain_coordinator
+from app.core.faults import FaultInjector, fault_injector
+from app.core.health import HealthProber, health_prober
+from app.core.idempotency import IdempotencyStore, idempotency_store
+from app.core.loop_monitor import LoopMonitor, loop_monitor
+from app.core.profiling import Profiler, profiler
+from app.core.semantic_cache import get_semantic_cache
+from app.core.startup import StartupCoordinator, startup
+from app.core.stream_registry import StreamRegistry, stream_registry
+from app.core.token_budget import get_token_budget
+from app.repositories.chatbot_repository import ChatbotRepository, get_chatbot_repository
+from app.services.chatbot_service import ChatbotService
+from app.services.intent_service import IntentRouter, get_intent_router
+from app.services.llm_service import LLMService, get_llm_service
+from app.services.summary_service import get_summarizer
+
+
+class Container:
+    """Services shared by every request for the lifetime of the application."""
+
+    def __init__(
+        self,
+        database: DatabaseManager,
+        cache: CacheManager,
+        llm_service: LLMService,
+        repository: ChatbotRepository,
+        intent_router: IntentRouter,
+        chatbot_service: ChatbotService,
+        stream_registry: StreamRegistry,
+        idempotency: IdempotencyStore,
+        drain: DrainCoordinator,
+        startup: StartupCoordinator,
+        health_prober: HealthProber,
+        loop_monitor: LoopMonitor,
+        profiler: Profiler,
+        faults: FaultInjector
+    ):
+        self.database = database
+        self.cache = cache
+        self.llm_service = llm_service
+        self.repository = repository
+        self.intent_router = intent_router
+        self.chatbot_service = chatbot_service
+        self.stream_registry = stream_registry
+        self.idempotency = idempotency
+        self.drain = drain
+        self.startup = startup
+        self.health_prober = health_prober
+        self.loop_monitor = loop_monitor
+        self.profiler = profiler
+        self.faults = faults
+
+
+def build_container() -> Container:
+    """
+    Wire the application's services.
+
+    Returns:
+        Container: Container holding the shared instances
+    """
+    llm_service = get_llm_service()
+    repository = get_chatbot_repository()
+    intent_router = get_intent_router()
+    chatbot_service = ChatbotService(
+        llm_service,
+        repository,
+        cache_manager,
+        get_token_budget(),
+        get_summarizer(),
+        get_semantic_cache(),
+        intent_router
+    )
+    return Container(
+        database=db_manager,
+        cache=cache_manager,
+        llm_service=llm_service,
+        repository=repository,
+        intent_router=intent_router,
+        chatbot_service=chatbot_service,
+        stream_registry=stream_registry,
+        idempotency=idempotency_store,
+        drain=drain_coordinator,
+        startup=startup,
+        health_prober=health_prober,
+        loop_monitor=loop_monitor,
+        profiler=profiler,
+        faults=fault_injector
+    )
+
+
+async def get_container(connection: HTTPConnection) -> Container:
+    """
+    Dependency to get the application container.
+
+    Args:
+        connection: Current HTTP or WebSocket connection
+
+    Returns:
+        Container: Application container
+    """
+    return connection.app.state.container
@@ -0,0 +1,48 @@
+"""
+Per-request context shared across layers via contextvars.
+Holds the request ID, user ID and Server-Timing stage durations.
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+user_id_var: ContextVar[Optional[str]] = ContextVar("user_id", default=None)
+timings_var: ContextVar[Optional[Dict[str, float]]] = ContextVar("timings", default=None)
+
+
+def get_request_id() -> Optional[str]:
+    """Return the current request ID, if any."""
+    return request_id_var.get()
+
+
+def record_stage(name: str, duration: float) -> None:
+    """
+    Add a stage duration (seconds) to the current request's Server-Timing.
+    Repeated stages accumulate.
+
+    Args:
+        name: Stage name (token characters only)
+        duration: Duration in seconds
+    """
+    timings = timings_var.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + duration
+
+
+class stage:
+    """Context manager timing a block into the current request's Server-Timing."""
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> "stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        record_stage(self.name, time.perf_counter() - self.start)
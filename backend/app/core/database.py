@@ -3,11 +3,13 @@ MongoDB database connection and management.
 Provides async MongoDB client with connection pooling and health checks.
 """
 
+import asyncio
 import logging
 from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 from app.core.config import settings
+from app.core.faults import fault_injector
 
 logger = logging.getLogger(__name__)
 
@@ -19,12 +21,26 @@ class DatabaseManager:
         self.client: Optional[AsyncIOMotorClient] = None
         self.db: Optional[AsyncIOMotorDatabase] = None
         self._is_connected = False
+        # Serializes startup and on-demand connects so only one client is created
+        self._connect_lock = asyncio.Lock()
     
-    async def connect(self) -> None:
+    async def connect(self, create_indexes: bool = True) -> None:
         """
         Establish connection to MongoDB.
         Creates connection pool and verifies connectivity.
+        
+        Args:
+            create_indexes: Also ensure collection indexes once connected
         """
+        async with self._connect_lock:
+            if self._is_connected:
+                return
+            await self._connect()
+        
+        if create_indexes and self._is_connected:
+            await self.create_indexes()
+    
+    async def _connect(self) -> None:
         try:
             if not settings.MONGODB_URI:
                 logger.error("MONGODB_URI is not set in environment variables.")
@@ -33,7 +49,11 @@ class DatabaseManager:
 
             logger.info(f"Connecting to MongoDB: {settings.MONGODB_DATABASE}")
             
-            self.client = AsyncIOMotorClient(
+            if self.client is not None:
+                # Left over from a failed attempt
+                self.client.close()
+            
+            self.client = fault_injector.wrap_mongo(AsyncIOMotorClient(
                 settings.MONGODB_URI.strip(),
                 maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
                 minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
@@ -42,8 +62,8 @@ class DatabaseManager:
                 socketTimeoutMS=settings.MONGODB_TIMEOUT_MS,
                 retryWrites=True,
                 w="majority",
-                tls=True,
-            )
+                tls=settings.MONGODB_TLS,
+            ))
             
             # Select database
             self.db = self.client[settings.MONGODB_DATABASE]
@@ -54,9 +74,6 @@ class DatabaseManager:
             
             logger.info(f"Successfully connected to MongoDB database: {settings.MONGODB_DATABASE}")
             
-            # Create indexes for chatbot collection
-            await self._create_indexes()
-            
         except (ConnectionFailure, ServerSelectionTimeoutError) as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
             self._is_connected = False
@@ -94,7 +111,7 @@ class DatabaseManager:
             logger.error(f"MongoDB health check failed: {e}")
             return False
     
-    async def _create_indexes(self) -> None:
+    async def create_indexes(self) -> None:
         """Create indexes for the chatbot collection to optimize queries."""
         try:
             collection = self.get_collection()
@@ -111,6 +128,10 @@ class DatabaseManager:
             # Index on timestamp for expiration and cleanup
             await collection.create_index("timestamp")
             
+            # Rolling summaries are looked up by session
+            summaries = self.get_collection(settings.MONGODB_SUMMARY_COLLECTION)
+            await summaries.create_index("session_id", unique=True)
+            
             logger.info("MongoDB indexes created successfully")
             
         except Exception as e:
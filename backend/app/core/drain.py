@@ -0,0 +1,104 @@
+"""
+Shutdown drain for detached background work.
+Stream generations and summary updates run as tasks that outlive the request
+that started them. On shutdown, new chats are refused, tracked tasks get until
+DRAIN_TIMEOUT_SECONDS to finish, and only then are MongoDB and Redis closed.
+Tasks still running at the deadline are cancelled, which still lets streams
+save their partial answer before the clients go away.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from typing import Dict, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Time cancelled tasks get to run their cleanup (e.g. saving a partial answer)
+CANCEL_GRACE_SECONDS = 5.0
+
+
+class DrainCoordinator:
+    """Tracks background tasks by kind and waits for them on shutdown."""
+
+    def __init__(self):
+        self.draining = False
+        self._tasks: Dict[asyncio.Task, str] = {}
+
+    def track(self, kind: str, task: asyncio.Task) -> asyncio.Task:
+        """
+        Register a background task to wait for on shutdown.
+
+        Args:
+            kind: Task category used in the drain report (e.g. "stream", "summary")
+            task: Task to track
+
+        Returns:
+            asyncio.Task: The same task
+        """
+        self._tasks[task] = kind
+        task.add_done_callback(self._discard)
+        return task
+
+    def _discard(self, task: asyncio.Task) -> None:
+        self._tasks.pop(task, None)
+
+    def pending(self) -> Dict[str, int]:
+        """Number of running tasks per kind."""
+        return dict(Counter(self._tasks.values()))
+
+    async def drain(self, timeout: Optional[float] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Stop accepting new work and wait for tracked tasks.
+        Tasks started while draining (e.g. a summary scheduled by a finishing
+        stream) are waited for as well, within the same deadline.
+
+        Args:
+            timeout: Seconds to wait before cancelling. Defaults to DRAIN_TIMEOUT_SECONDS
+
+        Returns:
+            Dict mapping kind to completed and abandoned counts
+        """
+        self.draining = True
+        timeout = settings.DRAIN_TIMEOUT_SECONDS if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        # Every task seen while draining, with its kind (finished tasks leave _tasks)
+        seen: Dict[asyncio.Task, str] = {}
+
+        while self._tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            batch = dict(self._tasks)
+            seen.update(batch)
+            logger.info(f"Draining {len(batch)} background task(s): {self.pending()}")
+            await asyncio.wait(batch, timeout=remaining)
+
+        abandoned = dict(self._tasks)
+        seen.update(abandoned)
+        for task in abandoned:
+            task.cancel()
+        if abandoned:
+            await asyncio.wait(abandoned, timeout=CANCEL_GRACE_SECONDS)
+
+        report: Dict[str, Dict[str, int]] = {}
+        for task, kind in seen.items():
+            counts = report.setdefault(kind, {"completed": 0, "abandoned": 0})
+            counts["abandoned" if task in abandoned else "completed"] += 1
+        return report
+
+
+# Global drain coordinator instance
+drain_coordinator = DrainCoordinator()
+
+
+def get_drain_coordinator() -> DrainCoordinator:
+    """
+    Dependency to get drain coordinator.
+
+    Returns:
+        DrainCoordinator: Drain coordinator instance
+    """
+    return drain_coordinator
@@ -0,0 +1,483 @@
+"""
+Fault injection for MongoDB, Redis and OpenRouter calls.
+When FAULT_INJECTION_ENABLED is set, the Motor client, the Redis client and
+the aiohttp session are wrapped at connect time. Each call is matched against
+FAULT_INJECTION_RULES by "target.operation" (e.g. "mongo.find_one",
+"redis.pipeline", "llm.stream") and then by target ("mongo"), and the rule can:
+- add latency drawn from a distribution ("const:2", "lognormal:0.5,0.6", ...)
+- fail a fraction of calls with the client's own error, timeout or
+  connection-drop exception (streams are dropped part way through instead)
+- flap: fail every call for flap_down seconds out of every flap_period
+Latency or injected timeouts never exceed the client's configured timeout,
+so callers see the same exceptions a slow dependency would raise. The
+application's own error handling, fallbacks and metrics run unchanged.
+Never enabled in production.
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import math
+import random
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from pymongo.errors import AutoReconnect, NetworkTimeout, OperationFailure
+from redis import exceptions as redis_errors
+from yarl import URL
+from app.core.config import settings
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+TARGETS = ("mongo", "redis", "llm")
+
+# Motor methods that return awaitables; find and aggregate return cursors
+_MONGO_OPERATIONS = frozenset({
+    "command", "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+    "delete_one", "delete_many", "find_one", "find_one_and_update", "find_one_and_replace",
+    "find_one_and_delete", "count_documents", "estimated_document_count", "distinct",
+    "create_index", "create_indexes", "drop_index", "bulk_write",
+})
+_MONGO_CURSORS = frozenset({"find", "aggregate"})
+# Client methods that are never faulted
+_PASSTHROUGH = frozenset({"close", "aclose", "connection_pool"})
+
+
+class Distribution:
+    """Latency distribution in seconds, parsed from a "kind:params" spec."""
+
+    KINDS = {"const": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exp": 1}
+
+    def __init__(self, spec: str):
+        kind, _, params = spec.partition(":")
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown distribution '{kind}', expected one of {sorted(self.KINDS)}")
+        values = [float(v) for v in params.split(",") if v]
+        if len(values) != self.KINDS[kind]:
+            raise ValueError(f"Distribution '{kind}' takes {self.KINDS[kind]} parameter(s), got '{params}'")
+        self.spec = spec
+        self.kind = kind
+        self.params = values
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one delay in seconds (never negative)."""
+        p = self.params
+        if self.kind == "const":
+            value = p[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(p[0], p[1])
+        elif self.kind == "normal":
+            value = rng.gauss(p[0], p[1])
+        elif self.kind == "lognormal":
+            value = p[0] * math.exp(rng.gauss(0.0, p[1]))
+        else:
+            value = rng.expovariate(1.0 / p[0]) if p[0] > 0 else 0.0
+        return max(0.0, value)
+
+    def __repr__(self) -> str:
+        return self.spec
+
+
+class FaultRule:
+    """Faults applied to one target or operation."""
+
+    FIELDS = (
+        "latency", "error_rate", "timeout_rate", "timeout_seconds", "drop_rate",
+        "drop_after_lines", "flap_period", "flap_down",
+    )
+
+    def __init__(
+        self,
+        latency: Optional[str] = None,
+        error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        timeout_seconds: Optional[float] = None,
+        drop_rate: float = 0.0,
+        drop_after_lines: int = 20,
+        flap_period: float = 0.0,
+        flap_down: float = 0.0,
+    ):
+        for name, rate in (("error_rate", error_rate), ("timeout_rate", timeout_rate), ("drop_rate", drop_rate)):
+            if not 0.0 <= rate <= 1.0:
+                raise ValueError(f"{name} must be between 0 and 1, got {rate}")
+        if error_rate + timeout_rate + drop_rate > 1.0:
+            raise ValueError("error_rate + timeout_rate + drop_rate must not exceed 1")
+        if flap_down and not 0 < flap_down < flap_period:
+            raise ValueError("flap_down must be between 0 and flap_period")
+        self.latency = Distribution(latency) if latency else None
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_seconds = timeout_seconds
+        self.drop_rate = drop_rate
+        self.drop_after_lines = max(0, drop_after_lines)
+        self.flap_period = flap_period
+        self.flap_down = flap_down
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> "FaultRule":
+        """
+        Build a rule from its settings form.
+
+        Raises:
+            ValueError: On unknown fields or invalid values
+        """
+        unknown = set(spec) - set(cls.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fault rule field(s) {sorted(unknown)}, expected {list(cls.FIELDS)}")
+        return cls(**spec)
+
+    def is_down(self, elapsed: float) -> bool:
+        """Whether a flapping dependency is in its down phase."""
+        return self.flap_down > 0 and elapsed % self.flap_period < self.flap_down
+
+    def describe(self) -> Dict[str, Any]:
+        """Settings form of the rule, without defaults."""
+        defaults = FaultRule()
+        result = {}
+        for name in self.FIELDS:
+            value = getattr(self, name)
+            if name == "latency":
+                value = value.spec if value else None
+                default = None
+            else:
+                default = getattr(defaults, name)
+            if value != default:
+                result[name] = value
+        return result
+
+
+def _llm_error(message: str) -> Exception:
+    url = URL(settings.OPENROUTER_API_URL)
+    request_info = aiohttp.RequestInfo(url, "POST", CIMultiDictProxy(CIMultiDict()), url)
+    return aiohttp.ClientResponseError(request_info, (), status=503, message=message)
+
+
+# target -> (error, timeout, connection drop) exception factories, matching what each client raises
+_EXCEPTIONS: Dict[str, Tuple[Callable[[str], Exception], ...]] = {
+    "mongo": (OperationFailure, NetworkTimeout, AutoReconnect),
+    "redis": (redis_errors.ResponseError, redis_errors.TimeoutError, redis_errors.ConnectionError),
+    "llm": (_llm_error, aiohttp.ServerTimeoutError, aiohttp.ServerDisconnectedError),
+}
+
+
+def _client_timeout(target: str) -> float:
+    """Timeout the real client would apply."""
+    if target == "mongo":
+        return settings.MONGODB_TIMEOUT_MS / 1000
+    if target == "redis":
+        return float(settings.REDIS_TIMEOUT)
+    return float(settings.REQUEST_TIMEOUT)
+
+
+class FaultInjector:
+    """Applies configured faults to wrapped dependency clients."""
+
+    def __init__(self):
+        self.enabled = False
+        self._rules: Dict[str, FaultRule] = {}
+        self._rng = random.Random()
+        self._seed: Optional[int] = None
+        self._epoch = time.monotonic()
+        self._counts: Counter = Counter()
+
+    def configure(self, rules: Dict[str, Dict[str, Any]], seed: Optional[int] = None) -> None:
+        """
+        Replace the rules.
+
+        Args:
+            rules: "target" or "target.operation" -> rule fields
+            seed: Seed for reproducible fault sequences
+
+        Raises:
+            ValueError: On unknown targets or invalid rules
+        """
+        parsed = {}
+        for key, spec in rules.items():
+            target = key.partition(".")[0]
+            if target not in TARGETS:
+                raise ValueError(f"Unknown fault target '{key}', expected one of {list(TARGETS)}")
+            parsed[key] = FaultRule.from_dict(spec)
+        self._rules = parsed
+        self._seed = seed
+        self._rng = random.Random(seed)
+        # Flapping phases and counts restart with the new rules
+        self._epoch = time.monotonic()
+        self._counts.clear()
+        if parsed:
+            logger.warning(f"Fault injection rules active: {self.describe()['rules']}")
+
+    def rule(self, target: str, operation: str) -> Optional[FaultRule]:
+        """Rule for an operation, falling back to the target's rule."""
+        rules = self._rules
+        if not rules:
+            return None
+        return rules.get(f"{target}.{operation}") or rules.get(target)
+
+    def _record(self, target: str, operation: str, fault: str) -> None:
+        self._counts[(target, operation, fault)] += 1
+        metrics.record_fault(target, operation, fault)
+
+    async def inject(self, target: str, operation: str, defer_drop: bool = False) -> Optional[int]:
+        """
+        Apply the matching rule before a call.
+
+        Args:
+            target: "mongo", "redis" or "llm"
+            operation: Client method or call kind
+            defer_drop: Return the drop point instead of raising, for streams
+
+        Returns:
+            Lines to pass through before dropping the stream, if a deferred drop was drawn
+
+        Raises:
+            Exception: The client's error, timeout or connection exception
+        """
+        rule = self.rule(target, operation)
+        if rule is None:
+            return None
+        error, timeout_error, drop_error = _EXCEPTIONS[target]
+        timeout = rule.timeout_seconds if rule.timeout_seconds is not None else _client_timeout(target)
+
+        if rule.is_down(time.monotonic() - self._epoch):
+            self._record(target, operation, "flap")
+            raise drop_error(f"Injected outage ({target}.{operation})")
+
+        roll = self._rng.random()
+        if roll < rule.drop_rate:
+            self._record(target, operation, "drop")
+            if defer_drop:
+                return self._rng.randint(0, rule.drop_after_lines)
+            raise drop_error(f"Injected connection drop ({target}.{operation})")
+        roll -= rule.drop_rate
+        if roll < rule.error_rate:
+            self._record(target, operation, "error")
+            raise error(f"Injected error ({target}.{operation})")
+        roll -= rule.error_rate
+
+        delay = None
+        if roll < rule.timeout_rate:
+            delay = math.inf
+        elif rule.latency is not None:
+            delay = rule.latency.sample(self._rng)
+        if delay is not None:
+            if delay >= timeout:
+                self._record(target, operation, "timeout")
+                await asyncio.sleep(timeout)
+                raise timeout_error(f"Injected timeout after {timeout:.1f}s ({target}.{operation})")
+            self._record(target, operation, "latency")
+            await asyncio.sleep(delay)
+        return None
+
+    async def call(self, target: str, operation: str, awaitable: Awaitable) -> Any:
+        """Await a client call after injecting faults; the call is discarded if a fault is raised."""
+        try:
+            await self.inject(target, operation)
+        except BaseException:
+            if inspect.iscoroutine(awaitable):
+                awaitable.close()
+            raise
+        return await awaitable
+
+    # Wrappers
+
+    def wrap_mongo(self, client: Any) -> Any:
+        """Wrap a Motor client; returns it unchanged when injection is disabled."""
+        return _MongoProxy(self, client) if self.enabled else client
+
+    def wrap_redis(self, client: Any) -> Any:
+        """Wrap a redis.asyncio client; returns it unchanged when injection is disabled."""
+        return _CallProxy(self, "redis", client) if self.enabled else client
+
+    def wrap_llm(self, session: aiohttp.ClientSession) -> Any:
+        """Wrap the OpenRouter session; returns it unchanged when injection is disabled."""
+        return _SessionProxy(self, session) if self.enabled else session
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        Current rules and fault counts.
+
+        Returns:
+            Dict with enabled, seed, rules and injected (target.operation -> fault -> count)
+        """
+        injected: Dict[str, Dict[str, int]] = {}
+        for (target, operation, fault), count in sorted(self._counts.items()):
+            injected.setdefault(f"{target}.{operation}", {})[fault] = count
+        return {
+            "enabled": self.enabled,
+            "seed": self._seed,
+            "rules": {key: rule.describe() for key, rule in self._rules.items()},
+            "injected": injected,
+        }
+
+
+class _CallProxy:
+    """
+    Delegates to a client, faulting every call that returns an awaitable.
+    Methods returning the wrapped object itself (pipeline and cursor
+    chaining) return the proxy instead.
+    """
+
+    def __init__(self, injector: FaultInjector, target: str, obj: Any, operation: Optional[str] = None):
+        self._injector = injector
+        self._target = target
+        self._obj = obj
+        # Fixed operation name for pipelines and cursors
+        self._operation = operation
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._obj, name)
+        if name.startswith("_") or name in _PASSTHROUGH or not callable(attr):
+            return attr
+        if name == "pipeline" and self._target == "redis":
+            return lambda *args, **kwargs: _CallProxy(self._injector, "redis", attr(*args, **kwargs), "pipeline")
+        operation = self._operation or name
+
+        @functools.wraps(attr)
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if result is self._obj:
+                return self
+            if inspect.isawaitable(result):
+                return self._injector.call(self._target, operation, result)
+            return result
+
+        return call
+
+    async def __aenter__(self):
+        await self._obj.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return await self._obj.__aexit__(*exc_info)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        await self._injector.inject(self._target, self._operation or "iterate")
+        async for item in self._obj:
+            yield item
+
+
+class _MongoProxy:
+    """Wraps a Motor client, database or collection; operations are faulted by method name."""
+
+    def __init__(self, injector: FaultInjector, obj: Any):
+        self._injector = injector
+        self._obj = obj
+
+    def __getitem__(self, name: str) -> "_MongoProxy":
+        return _MongoProxy(self._injector, self._obj[name])
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._obj, name)
+        if name in _MONGO_OPERATIONS:
+            @functools.wraps(attr)
+            def call(*args, **kwargs):
+                return self._injector.call("mongo", name, attr(*args, **kwargs))
+            return call
+        if name in _MONGO_CURSORS:
+            return lambda *args, **kwargs: _CallProxy(self._injector, "mongo", attr(*args, **kwargs), name)
+        if name == "admin":
+            return _MongoProxy(self._injector, attr)
+        if name in ("get_database", "get_collection", "get_default_database"):
+            return lambda *args, **kwargs: _MongoProxy(self._injector, attr(*args, **kwargs))
+        return attr
+
+
+class _SessionProxy:
+    """Wraps the OpenRouter aiohttp session; requests are faulted as "chat", "stream" or "warm"."""
+
+    def __init__(self, injector: FaultInjector, session: aiohttp.ClientSession):
+        self._injector = injector
+        self._session = session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+    def post(self, *args, **kwargs) -> "_FaultyRequest":
+        payload = kwargs.get("json") or {}
+        operation = "stream" if payload.get("stream") else "chat"
+        return _FaultyRequest(self._injector, operation, functools.partial(self._session.post, *args, **kwargs))
+
+    def head(self, *args, **kwargs) -> "_FaultyRequest":
+        return _FaultyRequest(self._injector, "warm", functools.partial(self._session.head, *args, **kwargs))
+
+
+class _FaultyRequest:
+    """Async context manager that injects faults before the request is sent."""
+
+    def __init__(self, injector: FaultInjector, operation: str, request: Callable):
+        self._injector = injector
+        self._operation = operation
+        self._request = request
+        self._context = None
+
+    async def __aenter__(self):
+        drop_after = await self._injector.inject("llm", self._operation, defer_drop=self._operation == "stream")
+        self._context = self._request()
+        response = await self._context.__aenter__()
+        if drop_after is None:
+            return response
+        return _DroppingResponse(response, drop_after)
+
+    async def __aexit__(self, *exc_info):
+        if self._context is not None:
+            return await self._context.__aexit__(*exc_info)
+        return None
+
+
+class _DroppingResponse:
+    """Response whose body is cut off after a number of lines."""
+
+    def __init__(self, response: aiohttp.ClientResponse, drop_after: int):
+        self._response = response
+        self.content = _DroppingStream(response.content, drop_after)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._response, name)
+
+
+class _DroppingStream:
+    def __init__(self, stream: aiohttp.StreamReader, drop_after: int):
+        self._lines = stream.__aiter__()
+        self._remaining = drop_after
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> bytes:
+        if self._remaining <= 0:
+            raise aiohttp.ClientPayloadError("Injected connection drop (llm.stream)")
+        self._remaining -= 1
+        return await self._lines.__anext__()
+
+
+def _build_injector() -> FaultInjector:
+    injector = FaultInjector()
+    if not settings.FAULT_INJECTION_ENABLED:
+        return injector
+    if settings.is_production:
+        logger.error("FAULT_INJECTION_ENABLED is ignored in production")
+        return injector
+    injector.enabled = True
+    injector.configure(settings.FAULT_INJECTION_RULES, settings.FAULT_INJECTION_SEED)
+    return injector
+
+
+# Global fault injector instance
+fault_injector = _build_injector()
+
+
+def get_fault_injector() -> FaultInjector:
+    """
+    Dependency to get fault injector.
+
+    Returns:
+        FaultInjector: Fault injector instance
+    """
+    return fault_injector
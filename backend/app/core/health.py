@@ -0,0 +1,178 @@
+"""
+Background dependency health prober.
+Pings MongoDB and Redis on an interval and caches the result, so health
+endpoints answer from memory instead of calling dependencies per request.
+Dependencies that failed to connect, and a tokenizer that failed to load, are
+retried here rather than per request.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from app.core.config import settings
+from app.core.cache import CacheManager, cache_manager
+from app.core.database import DatabaseManager, db_manager
+from app.core.drain import drain_coordinator
+from app.core.startup import startup
+from app.utils.tokenizer import TokenCounter, token_counter
+
+logger = logging.getLogger(__name__)
+
+
+class ProbeResult:
+    """Outcome of the latest probe of one dependency."""
+
+    __slots__ = ("healthy", "latency", "checked_at", "error")
+
+    def __init__(self, healthy: bool, latency: float, checked_at: float, error: Optional[str] = None):
+        self.healthy = healthy
+        self.latency = latency
+        self.checked_at = checked_at
+        self.error = error
+
+
+class HealthProber:
+    """Periodically probes dependencies and serves cached status."""
+
+    def __init__(self, database: DatabaseManager, cache: CacheManager, tokenizer: TokenCounter):
+        self.database = database
+        self.cache = cache
+        self.tokenizer = tokenizer
+        self._results: Dict[str, ProbeResult] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+    @property
+    def started(self) -> bool:
+        """Whether at least one probe round has completed."""
+        return bool(self._results)
+
+    def start(self) -> None:
+        """Start probing in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop probing and any reconnect in progress."""
+        for task in (self._task, self._reconnect_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._reconnect_task = None
+
+    async def _run(self) -> None:
+        while True:
+            if startup.complete:
+                self._start_reconnect()
+            await self.probe()
+            await asyncio.sleep(settings.HEALTH_PROBE_INTERVAL_SECONDS)
+
+    def _start_reconnect(self) -> None:
+        """
+        Retry failed dependencies in their own task. A connect can block for
+        the driver's server selection timeout, so it must not hold up probes.
+        """
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        """Retry dependencies that failed to connect; requests never connect on their own."""
+        try:
+            if settings.MONGODB_URI and not self.database.is_connected:
+                await self.database.connect()
+            if self.cache.is_enabled and not self.cache.is_connected:
+                await self.cache.connect()
+            if not self.tokenizer.loaded:
+                await asyncio.to_thread(self.tokenizer.load)
+        except Exception as e:
+            logger.warning(f"Dependency reconnect failed: {e}")
+
+    def _checks(self) -> Dict[str, Callable[[], Awaitable[bool]]]:
+        checks = {"mongodb": self.database.health_check}
+        if self.cache.is_enabled:
+            checks["redis"] = self.cache.health_check
+        return checks
+
+    async def probe(self) -> None:
+        """Probe all dependencies concurrently and store the results."""
+        checks = self._checks()
+        results = await asyncio.gather(*(self._probe_one(check) for check in checks.values()))
+        self._results = dict(zip(checks, results))
+
+    async def _probe_one(self, check: Callable[[], Awaitable[bool]]) -> ProbeResult:
+        start = time.perf_counter()
+        try:
+            healthy = await asyncio.wait_for(check(), timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS)
+            error = None
+        except asyncio.TimeoutError:
+            healthy, error = False, "timeout"
+        except Exception as e:
+            healthy, error = False, str(e)
+        return ProbeResult(healthy, time.perf_counter() - start, time.time(), error)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Cached status per dependency.
+
+        Returns:
+            Dict mapping dependency name to healthy, latency_ms, age_seconds,
+            stale and error
+        """
+        now = time.time()
+        stale_after = settings.HEALTH_PROBE_INTERVAL_SECONDS * 3
+        snapshot = {}
+        for name, result in self._results.items():
+            age = now - result.checked_at
+            entry = {
+                "healthy": result.healthy,
+                "latency_ms": round(result.latency * 1000, 1),
+                "age_seconds": round(age, 1),
+                "stale": age > stale_after,
+            }
+            if result.error:
+                entry["error"] = result.error
+            snapshot[name] = entry
+        return snapshot
+
+    def readiness(self) -> Dict[str, Any]:
+        """
+        Whether this instance should receive traffic.
+        Requires completed warm-up, no shutdown drain in progress, a completed
+        probe round and fresh, healthy results for every dependency in
+        HEALTH_READY_REQUIRES.
+
+        Returns:
+            Dict with ready flag and the reasons it is not ready
+        """
+        reasons = []
+        if drain_coordinator.draining:
+            reasons.append("draining")
+        if not startup.complete:
+            reasons.append("warming up")
+        if not self.started:
+            reasons.append("health probes pending")
+        snapshot = self.snapshot()
+        for name in settings.HEALTH_READY_REQUIRES:
+            entry = snapshot.get(name)
+            if entry is None or not entry["healthy"] or entry["stale"]:
+                reasons.append(f"{name} unavailable")
+        return {"ready": not reasons, "reasons": reasons}
+
+
+# Global health prober instance
+health_prober = HealthProber(db_manager, cache_manager, token_counter)
+
+
+def get_health_prober() -> HealthProber:
+    """
+    Dependency to get health prober.
+
+    Returns:
+        HealthProber: Health prober instance
+    """
+    return health_prober
@@ -0,0 +1,189 @@
+"""
+Idempotency-Key support for chat requests.
+The first request with a key claims it and stores its result; retries with the
+same key get that result (or wait for it) instead of generating again.
+Uses Redis when available and falls back to in-process records.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import settings
+from app.core.cache import CacheManager, cache_manager
+from app.core.metrics import observe_redis
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# A claim that is never completed (e.g. the worker died) expires after this
+PENDING_TTL_SECONDS = 120
+POLL_INTERVAL_SECONDS = 0.1
+MAX_LOCAL_KEYS = 10_000
+
+
+class IdempotencyConflict(Exception):
+    """Raised when a key cannot be honoured (payload mismatch or still in progress)."""
+
+    def __init__(self, message: str, status_code: int, retry_after: Optional[int] = None):
+        self.status_code = status_code
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+def request_fingerprint(payload: bytes) -> str:
+    """Hash of the request body, used to reject keys reused with a different payload."""
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+class IdempotencyStore:
+    """Claims keys and stores the result of the request that claimed them."""
+
+    def __init__(self, cache: CacheManager):
+        self.cache = cache
+        # key -> (expires_at, record); used when Redis is unavailable
+        self._records: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # key -> future resolved when the owner on this worker finishes
+        self._waiters: Dict[str, asyncio.Future] = {}
+
+    @property
+    def _use_redis(self) -> bool:
+        return self.cache.is_connected and self.cache.redis is not None
+
+    async def begin(self, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Claim a key, or return the result already stored for it.
+        Waits up to IDEMPOTENCY_WAIT_SECONDS while another request holds the key.
+
+        Args:
+            key: Scoped idempotency key
+            fingerprint: Request fingerprint
+
+        Returns:
+            Optional[Dict[str, Any]]: None if the caller now owns the key,
+            otherwise the stored result
+
+        Raises:
+            IdempotencyConflict: Payload mismatch, or still in progress after waiting
+        """
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            record = await self._claim(key, fingerprint)
+            if record is None:
+                self._waiters[key] = asyncio.get_running_loop().create_future()
+                return None
+
+            if record["fingerprint"] != fingerprint:
+                raise IdempotencyConflict(
+                    "Idempotency-Key was already used with a different request", 422
+                )
+
+            if record["state"] == "done":
+                return record["result"]
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise IdempotencyConflict(
+                    "A request with this Idempotency-Key is still in progress", 409, retry_after=1
+                )
+
+            waiter = self._waiters.get(key)
+            if waiter is not None:
+                # Owner is on this worker: wake as soon as it finishes
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(min(POLL_INTERVAL_SECONDS, remaining))
+
+    async def complete(self, key: str, fingerprint: str, result: Dict[str, Any]) -> None:
+        """
+        Store the result for a claimed key.
+
+        Args:
+            key: Scoped idempotency key
+            fingerprint: Request fingerprint
+            result: JSON-serialisable result returned to retries
+        """
+        record = {"state": "done", "fingerprint": fingerprint, "result": result}
+        await self._store(key, record, settings.IDEMPOTENCY_TTL_SECONDS)
+        self._wake(key)
+
+    async def release(self, key: str) -> None:
+        """Drop a claim after a failed request so a retry can run it again."""
+        if self._use_redis:
+            try:
+                await self.cache.delete(f"idempotency:{key}")
+            except Exception as e:
+                logger.warning(f"Error releasing idempotency key: {e}")
+        self._records.pop(key, None)
+        self._wake(key)
+
+    def _wake(self, key: str) -> None:
+        waiter = self._waiters.pop(key, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def _claim(self, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Atomically claim a key; return the existing record if already claimed."""
+        pending = {"state": "pending", "fingerprint": fingerprint}
+
+        if self._use_redis:
+            redis_key = f"idempotency:{key}"
+            try:
+                start = time.perf_counter()
+                claimed = await self.cache.redis.set(
+                    redis_key, orjson.dumps(pending), nx=True, ex=PENDING_TTL_SECONDS
+                )
+                if claimed:
+                    observe_redis("set", time.perf_counter() - start)
+                    return None
+                existing = await self.cache.redis.get(redis_key)
+                observe_redis("set", time.perf_counter() - start)
+                if existing is None:
+                    # Expired or released between the two calls
+                    return await self._claim(key, fingerprint)
+                return orjson.loads(existing)
+            except Exception as e:
+                logger.warning(f"Error claiming idempotency key in Redis: {e}")
+
+        now = time.monotonic()
+        entry = self._records.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+        self._put_local(key, pending, PENDING_TTL_SECONDS)
+        return None
+
+    async def _store(self, key: str, record: Dict[str, Any], ttl: int) -> None:
+        if self._use_redis:
+            try:
+                start = time.perf_counter()
+                await self.cache.redis.set(f"idempotency:{key}", orjson.dumps(record), ex=ttl)
+                observe_redis("set", time.perf_counter() - start)
+                return
+            except Exception as e:
+                logger.warning(f"Error storing idempotent result in Redis: {e}")
+        self._put_local(key, record, ttl)
+
+    def _put_local(self, key: str, record: Dict[str, Any], ttl: int) -> None:
+        self._records[key] = (time.monotonic() + ttl, record)
+        self._records.move_to_end(key)
+        while len(self._records) > MAX_LOCAL_KEYS:
+            self._records.popitem(last=False)
+
+
+# Global idempotency store instance
+idempotency_store = IdempotencyStore(cache_manager)
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """
+    Dependency to get idempotency store.
+
+    Returns:
+        IdempotencyStore: Idempotency store instance
+    """
+    return idempotency_store
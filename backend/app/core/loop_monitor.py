@@ -0,0 +1,148 @@
+"""
+Event loop lag monitor.
+A sampler task sleeps for a fixed interval and records how late it wakes up,
+which is the scheduling delay every other callback saw at that moment. A
+watchdog thread watches the sampler's heartbeat; when the loop is overdue by
+more than LOOP_BLOCK_THRESHOLD_SECONDS it captures the loop thread's stack
+while the blocking call is still running, so the log shows the culprit rather
+than the code that happened to run afterwards.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+# Innermost frames kept from the blocked loop thread
+STACK_DEPTH = 25
+# Recent stalls kept for inspection
+RECENT_BLOCKS = 20
+
+
+class LoopMonitor:
+    """Samples event loop lag and captures the stack of blocking callbacks."""
+
+    def __init__(self):
+        self.interval = settings.LOOP_MONITOR_INTERVAL_SECONDS
+        self.threshold = settings.LOOP_BLOCK_THRESHOLD_SECONDS
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        # (heartbeat of the stall, captured stack) set by the watchdog
+        self._captured: Optional[Tuple[float, str]] = None
+        self._blocks: Deque[Dict[str, Any]] = deque(maxlen=RECENT_BLOCKS)
+
+    @property
+    def running(self) -> bool:
+        """Whether the sampler is active."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the sampler on the running loop and the watchdog thread."""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(
+            f"Event loop monitor started (interval {self.interval * 1000:.0f} ms, "
+            f"block threshold {self.threshold * 1000:.0f} ms)"
+        )
+
+    async def stop(self) -> None:
+        """Stop the sampler and the watchdog."""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join, 1.0)
+            self._watchdog = None
+
+    async def _sample(self) -> None:
+        while True:
+            beat = self._heartbeat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - beat - self.interval)
+            metrics.observe_loop_lag(lag)
+            if lag >= self.threshold:
+                self._record_block(beat, lag)
+
+    def _record_block(self, beat: float, lag: float) -> None:
+        """Record a finished stall, with the stack the watchdog captured during it."""
+        with self._lock:
+            captured, self._captured = self._captured, None
+        stack = captured[1] if captured and captured[0] == beat else None
+
+        metrics.record_loop_block()
+        self._blocks.append({"at": time.time(), "lag_ms": round(lag * 1000, 1), "stack": stack})
+        if stack is None:
+            # Over before the watchdog looked; only the lag is known
+            logger.warning(f"Event loop lag {lag * 1000:.0f} ms (stall ended before a stack was captured)")
+        else:
+            logger.warning(f"Event loop lag {lag * 1000:.0f} ms (stack logged above)")
+
+    def _watch(self) -> None:
+        """Watchdog thread: capture the loop thread's stack while it is blocked."""
+        poll = self.threshold / 2
+        reported = None
+        while not self._stopped.wait(poll):
+            beat = self._heartbeat
+            overdue = time.monotonic() - beat - self.interval
+            if overdue < self.threshold or beat == reported:
+                continue
+            reported = beat
+            stack = self._loop_stack()
+            with self._lock:
+                self._captured = (beat, stack)
+            logger.warning(
+                f"Event loop blocked, lag sample overdue by {overdue * 1000:.0f} ms; loop thread stack:\n{stack}"
+            )
+
+    def _loop_stack(self) -> str:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return "<loop thread not found>"
+        return "".join(traceback.format_stack(frame, limit=STACK_DEPTH)).rstrip()
+
+    def recent_blocks(self) -> List[Dict[str, Any]]:
+        """
+        Most recent loop stalls, oldest first.
+
+        Returns:
+            List of dicts with at (epoch seconds), lag_ms and stack (None if the
+            stall ended before the watchdog captured it)
+        """
+        return list(self._blocks)
+
+
+# Global loop monitor instance
+loop_monitor = LoopMonitor()
+
+
+def get_loop_monitor() -> LoopMonitor:
+    """
+    Dependency to get loop monitor.
+
+    Returns:
+        LoopMonitor: Loop monitor instance
+    """
+    return loop_monitor
@@ -0,0 +1,293 @@
+"""
+Prometheus metrics for HTTP, LLM, cache, MongoDB and Redis.
+Label children are bound once and reused so hot paths only do an observe().
+Set PROMETHEUS_MULTIPROC_DIR to aggregate metrics across worker processes.
+"""
+
+import functools
+import os
+import time
+from typing import Callable, Dict, Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from app.core.config import settings
+
+METRICS_ENABLED = settings.METRICS_ENABLED
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+_LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 13, 21, 30, 60)
+_DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency until the response body completes",
+    ["method", "route", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+LLM_REQUEST_DURATION = Histogram(
+    "llm_request_duration_seconds",
+    "LLM call latency (complete response or full stream)",
+    ["model", "mode", "outcome"],
+    buckets=_LLM_BUCKETS,
+)
+LLM_TIME_TO_FIRST_TOKEN = Histogram(
+    "llm_time_to_first_token_seconds",
+    "Time from request to first streamed content chunk",
+    ["model"],
+    buckets=_LLM_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens reported by the provider",
+    ["model", "kind"],
+)
+LLM_FALLBACKS = Counter(
+    "llm_fallbacks_total",
+    "Calls retried on the fallback model",
+    ["from_model", "to_model"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups per tier",
+    ["tier", "result"],
+)
+MONGO_OPERATION_DURATION = Histogram(
+    "mongodb_operation_duration_seconds",
+    "MongoDB latency per repository method",
+    ["operation"],
+    buckets=_DB_BUCKETS,
+)
+REDIS_COMMAND_DURATION = Histogram(
+    "redis_command_duration_seconds",
+    "Redis command latency",
+    ["command"],
+    buckets=_DB_BUCKETS,
+)
+STREAMS_IN_FLIGHT = Gauge(
+    "streams_in_flight",
+    "Streaming responses currently open",
+    multiprocess_mode="livesum",
+)
+SSE_CLIENT_LAG = Histogram(
+    "sse_client_lag_seconds",
+    "Longest time an SSE client was behind the generation, per stream",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+SSE_SLOW_CLIENT_ACTIONS = Counter(
+    "sse_slow_client_actions_total",
+    "Frames coalesced and streams aborted for slow SSE clients",
+    ["action"],
+)
+SSE_BUFFERED_BYTES = Gauge(
+    "sse_buffered_bytes",
+    "Generated bytes not yet sent to SSE clients",
+)
+WEBSOCKETS_OPEN = Gauge(
+    "websockets_open",
+    "Chat WebSocket connections currently open",
+    multiprocess_mode="livesum",
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between when a loop lag sample was due and when it ran",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+EVENT_LOOP_BLOCKS = Counter(
+    "event_loop_blocks_total",
+    "Event loop stalls longer than LOOP_BLOCK_THRESHOLD_SECONDS",
+)
+FAULTS_INJECTED = Counter(
+    "faults_injected_total",
+    "Faults added to dependency calls by FAULT_INJECTION_RULES",
+    ["target", "operation", "fault"],
+)
+
+# Pre-bound children for fixed label sets
+_CACHE_CHILDREN = {
+    (tier, result): CACHE_REQUESTS.labels(tier, result)
+    for tier in ("redis", "semantic", "intent")
+    for result in ("hit", "miss")
+}
+_SLOW_CLIENT_CHILDREN = {
+    action: SSE_SLOW_CLIENT_ACTIONS.labels(action) for action in ("coalesce", "abort")
+}
+_HTTP_CHILDREN: Dict[Tuple[str, str, str], object] = {}
+_LLM_CHILDREN: Dict[Tuple[str, str, str], object] = {}
+_TTFT_CHILDREN: Dict[str, object] = {}
+_TOKEN_CHILDREN: Dict[Tuple[str, str], object] = {}
+_FALLBACK_CHILDREN: Dict[Tuple[str, str], object] = {}
+_REDIS_CHILDREN: Dict[str, object] = {}
+_FAULT_CHILDREN: Dict[Tuple[str, str, str], object] = {}
+
+
+def observe_http(method: str, route: str, status_code: int, duration: float) -> None:
+    """Record an HTTP request. Status is bucketed by class to bound cardinality."""
+    if not METRICS_ENABLED:
+        return
+    key = (method, route, f"{status_code // 100}xx")
+    child = _HTTP_CHILDREN.get(key)
+    if child is None:
+        child = _HTTP_CHILDREN[key] = HTTP_REQUEST_DURATION.labels(*key)
+    child.observe(duration)
+
+
+def observe_llm(model: str, mode: str, outcome: str, duration: float) -> None:
+    """Record an LLM call. mode is "chat" or "stream"; outcome is "success" or "error"."""
+    if not METRICS_ENABLED:
+        return
+    key = (model, mode, outcome)
+    child = _LLM_CHILDREN.get(key)
+    if child is None:
+        child = _LLM_CHILDREN[key] = LLM_REQUEST_DURATION.labels(*key)
+    child.observe(duration)
+
+
+def observe_ttft(model: str, duration: float) -> None:
+    """Record time to first streamed token."""
+    if not METRICS_ENABLED:
+        return
+    child = _TTFT_CHILDREN.get(model)
+    if child is None:
+        child = _TTFT_CHILDREN[model] = LLM_TIME_TO_FIRST_TOKEN.labels(model)
+    child.observe(duration)
+
+
+def record_tokens(model: str, prompt_tokens: int, completion_tokens: int) -> None:
+    """Record provider-reported token usage."""
+    if not METRICS_ENABLED:
+        return
+    for kind, count in (("prompt", prompt_tokens), ("completion", completion_tokens)):
+        if not count:
+            continue
+        key = (model, kind)
+        child = _TOKEN_CHILDREN.get(key)
+        if child is None:
+            child = _TOKEN_CHILDREN[key] = LLM_TOKENS.labels(*key)
+        child.inc(count)
+
+
+def record_fallback(from_model: str, to_model: str) -> None:
+    """Record a retry on the fallback model."""
+    if not METRICS_ENABLED:
+        return
+    key = (from_model, to_model)
+    child = _FALLBACK_CHILDREN.get(key)
+    if child is None:
+        child = _FALLBACK_CHILDREN[key] = LLM_FALLBACKS.labels(*key)
+    child.inc()
+
+
+def record_cache(tier: str, hit: bool) -> None:
+    """Record a cache lookup for a tier ("redis", "semantic" or "intent")."""
+    if METRICS_ENABLED:
+        _CACHE_CHILDREN[(tier, "hit" if hit else "miss")].inc()
+
+
+def record_slow_client(action: str) -> None:
+    """Record a slow-client action ("coalesce" or "abort")."""
+    if METRICS_ENABLED:
+        _SLOW_CLIENT_CHILDREN[action].inc()
+
+
+def observe_stream_lag(lag: float) -> None:
+    """Record the longest lag of one SSE client."""
+    if METRICS_ENABLED:
+        SSE_CLIENT_LAG.observe(lag)
+
+
+def observe_loop_lag(lag: float) -> None:
+    """Record one event loop lag sample."""
+    if METRICS_ENABLED:
+        EVENT_LOOP_LAG.observe(lag)
+
+
+def record_loop_block() -> None:
+    """Record an event loop stall above the block threshold."""
+    if METRICS_ENABLED:
+        EVENT_LOOP_BLOCKS.inc()
+
+
+def record_fault(target: str, operation: str, fault: str) -> None:
+    """Record an injected fault ("latency", "error", "timeout", "drop" or "flap")."""
+    if not METRICS_ENABLED:
+        return
+    key = (target, operation, fault)
+    child = _FAULT_CHILDREN.get(key)
+    if child is None:
+        child = _FAULT_CHILDREN[key] = FAULTS_INJECTED.labels(*key)
+    child.inc()
+
+
+def _timed(histogram: Histogram, label: str) -> Callable:
+    """Decorator factory timing an async function into a pre-bound histogram child."""
+    child = histogram.labels(label)
+
+    def decorator(func: Callable) -> Callable:
+        if not METRICS_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def track_mongo(operation: str) -> Callable:
+    """Time a repository method as a MongoDB operation."""
+    return _timed(MONGO_OPERATION_DURATION, operation)
+
+
+def track_redis(command: str) -> Callable:
+    """Time a cache method as a Redis command."""
+    return _timed(REDIS_COMMAND_DURATION, command)
+
+
+def observe_redis(command: str, duration: float) -> None:
+    """Record a Redis command issued outside CacheManager (e.g. pipelines)."""
+    if not METRICS_ENABLED:
+        return
+    child = _REDIS_CHILDREN.get(command)
+    if child is None:
+        child = _REDIS_CHILDREN[command] = REDIS_COMMAND_DURATION.labels(command)
+    child.observe(duration)
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from multiprocess aggregation; call on shutdown."""
+    if MULTIPROCESS:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render metrics in the Prometheus text format.
+    Aggregates all workers when running in multiprocess mode.
+
+    Returns:
+        Tuple of payload and content type
+    """
+    if MULTIPROCESS:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,93 @@
+"""
+Pure ASGI request middleware.
+Assigns request IDs, emits Server-Timing and access logs, and records HTTP
+metrics without wrapping or buffering the response body.
+"""
+
+import logging
+import random
+import re
+import time
+import uuid
+from typing import Dict, Optional
+from app.core.config import settings
+from app.core.context import request_id_var, timings_var, user_id_var
+from app.core.metrics import observe_http
+
+logger = logging.getLogger("app.access")
+
+REQUEST_ID_HEADER = b"x-request-id"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+
+def _incoming_request_id(headers) -> Optional[str]:
+    for name, value in headers:
+        if name == REQUEST_ID_HEADER:
+            candidate = value.decode("latin-1")
+            return candidate if _VALID_REQUEST_ID.match(candidate) else None
+    return None
+
+
+def _server_timing(timings: Dict[str, float], total: float) -> bytes:
+    parts = [f"{name};dur={duration * 1000:.1f}" for name, duration in timings.items()]
+    parts.append(f"app;dur={total * 1000:.1f}")
+    return ", ".join(parts).encode("latin-1")
+
+
+class RequestContextMiddleware:
+    """Request ID propagation, Server-Timing, sampled access logs and HTTP metrics."""
+
+    def __init__(self, app):
+        self.app = app
+        self.sample_rate = settings.ACCESS_LOG_SAMPLE_RATE
+        self.log_level = getattr(logging, settings.ACCESS_LOG_LEVEL, logging.INFO)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        request_id = _incoming_request_id(scope["headers"]) or uuid.uuid4().hex
+        timings: Dict[str, float] = {}
+        request_id_token = request_id_var.set(request_id)
+        user_id_token = user_id_var.set(None)
+        timings_token = timings_var.set(timings)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed = time.perf_counter() - start
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER, request_id.encode("latin-1")))
+                headers.append((b"x-process-time", f"{elapsed:.6f}".encode("latin-1")))
+                headers.append((b"server-timing", _server_timing(timings, elapsed)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            route = scope.get("route")
+            observe_http(scope["method"], route.path if route else "unmatched", status_code, duration)
+
+            # 503 is only sent on purpose (warming up, draining, at capacity), so it
+            # is logged like a normal response instead of alerting on every deploy
+            error = status_code >= 500 and status_code != 503
+            if error or (
+                logger.isEnabledFor(self.log_level)
+                and (self.sample_rate >= 1.0 or random.random() < self.sample_rate)
+            ):
+                logger.log(
+                    logging.ERROR if error else self.log_level,
+                    "%s %s %d %.3fs",
+                    scope["method"], scope["path"], status_code, duration,
+                    extra={"request_id": request_id},
+                )
+
+            timings_var.reset(timings_token)
+            user_id_var.reset(user_id_token)
+            request_id_var.reset(request_id_token)
@@ -0,0 +1,307 @@
+"""
+On-demand profiling of a live worker.
+- CPU: a sampling profiler thread reads every thread's stack at a fixed
+  interval for a bounded duration and returns flamegraph-compatible
+  collapsed stacks. Overhead is one stack walk per interval; nothing is
+  instrumented.
+- Memory: tracemalloc is started on request, stops itself after at most
+  PROFILE_TRACE_MAX_SECONDS, and reports top allocations or a diff against
+  the snapshot taken when tracing started.
+- Tasks: the await chain of every asyncio task.
+Only one CPU profile and one memory snapshot run at a time per worker.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Frames kept per sampled stack (innermost first when truncating)
+MAX_STACK_DEPTH = 128
+# Frames kept per task await chain
+MAX_TASK_DEPTH = 50
+# Frames recorded per allocation while tracing
+TRACE_FRAMES = 10
+
+_TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+class ProfilerBusy(Exception):
+    """Raised when a profile of the same kind is already running."""
+
+
+class ProfilerStateError(Exception):
+    """Raised when an operation needs a different tracing state."""
+
+
+class Profiler:
+    """Runs bounded CPU profiles, tracemalloc snapshots and task dumps."""
+
+    def __init__(self):
+        self._cpu_lock = asyncio.Lock()
+        self._memory_lock = asyncio.Lock()
+        self._labels: Dict[CodeType, str] = {}
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._trace_timer: Optional[asyncio.TimerHandle] = None
+        self._trace_started_at: Optional[float] = None
+
+    # CPU
+
+    async def cpu_profile(self, seconds: float, interval: float, all_threads: bool = False) -> Dict[str, Any]:
+        """
+        Sample stacks of the running worker.
+
+        Args:
+            seconds: Profile duration, capped at PROFILE_MAX_SECONDS
+            interval: Seconds between samples
+            all_threads: Sample every thread instead of only the event loop thread
+
+        Returns:
+            Dict with collapsed (stack -> sample count), samples, seconds and pid
+
+        Raises:
+            ProfilerBusy: If a CPU profile is already running
+        """
+        if self._cpu_lock.locked():
+            raise ProfilerBusy("A CPU profile is already running")
+        seconds = min(seconds, settings.PROFILE_MAX_SECONDS)
+        # Called from the loop, so this is the loop thread
+        loop_thread = None if all_threads else threading.get_ident()
+
+        async with self._cpu_lock:
+            logger.info(f"CPU profile started for {seconds:.1f}s at {interval * 1000:.0f} ms intervals")
+            start = time.perf_counter()
+            collapsed, samples = await asyncio.to_thread(self._sample, seconds, interval, loop_thread)
+            elapsed = time.perf_counter() - start
+
+        return {"collapsed": collapsed, "samples": samples, "seconds": round(elapsed, 2), "pid": os.getpid()}
+
+    def _sample(self, seconds: float, interval: float, only_thread: Optional[int]) -> Tuple[Dict[str, int], int]:
+        """Sampling loop; runs in a worker thread."""
+        me = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        counts: Counter = Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+
+        while time.monotonic() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == me or (only_thread is not None and ident != only_thread):
+                    continue
+                if ident not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                counts[self._collapse(frame, names.get(ident, f"thread-{ident}"))] += 1
+            samples += 1
+            time.sleep(interval)
+
+        return dict(counts.most_common()), samples
+
+    def _collapse(self, frame: Optional[FrameType], root: str) -> str:
+        """Stack as "root;outer;...;inner" with module:function frames."""
+        stack: List[str] = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = f"{frame.f_globals.get('__name__', '?')}:{code.co_name}"
+            stack.append(label)
+            frame = frame.f_back
+        stack.append(root)
+        return ";".join(reversed(stack))
+
+    # Memory
+
+    @property
+    def tracing(self) -> bool:
+        """Whether tracemalloc is running."""
+        return tracemalloc.is_tracing()
+
+    async def start_tracing(self, seconds: float) -> Dict[str, Any]:
+        """
+        Start tracemalloc and take the baseline snapshot for diffs.
+
+        Args:
+            seconds: Stop tracing automatically after this long, capped at PROFILE_TRACE_MAX_SECONDS
+
+        Returns:
+            Dict with tracing state
+
+        Raises:
+            ProfilerStateError: If tracing is already running
+        """
+        if self.tracing:
+            raise ProfilerStateError("tracemalloc is already running")
+        seconds = min(seconds, settings.PROFILE_TRACE_MAX_SECONDS)
+
+        tracemalloc.start(TRACE_FRAMES)
+        self._trace_started_at = time.time()
+        self._trace_timer = asyncio.get_running_loop().call_later(seconds, self.stop_tracing)
+        self._baseline = await asyncio.to_thread(self._snapshot)
+        logger.info(f"tracemalloc started, stopping automatically in {seconds:.0f}s")
+        return self.tracing_state()
+
+    def stop_tracing(self) -> Dict[str, Any]:
+        """Stop tracemalloc and drop the baseline."""
+        if self._trace_timer is not None:
+            self._trace_timer.cancel()
+            self._trace_timer = None
+        if self.tracing:
+            tracemalloc.stop()
+            logger.info("tracemalloc stopped")
+        self._baseline = None
+        self._trace_started_at = None
+        return self.tracing_state()
+
+    def tracing_state(self) -> Dict[str, Any]:
+        """Tracing flag, start time and traced memory."""
+        state: Dict[str, Any] = {"tracing": self.tracing, "started_at": self._trace_started_at, "pid": os.getpid()}
+        if self.tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            state["traced_kb"] = round(current / 1024, 1)
+            state["peak_kb"] = round(peak / 1024, 1)
+        return state
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+
+    async def memory_snapshot(
+        self, limit: int, key_type: str = "lineno", diff: bool = True, reset_baseline: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Top allocation sites now, or the change since the baseline.
+
+        Args:
+            limit: Number of entries to return
+            key_type: Grouping: "lineno", "filename" or "traceback"
+            diff: Compare against the baseline snapshot instead of reporting totals
+            reset_baseline: Use this snapshot as the baseline for the next diff
+
+        Returns:
+            Dict with tracing state and stats entries
+
+        Raises:
+            ProfilerStateError: If tracing is not running
+            ProfilerBusy: If a snapshot is already being taken
+        """
+        if not self.tracing:
+            raise ProfilerStateError("tracemalloc is not running; start tracing first")
+        if self._memory_lock.locked():
+            raise ProfilerBusy("A memory snapshot is already being taken")
+
+        async with self._memory_lock:
+            snapshot = await asyncio.to_thread(self._snapshot)
+            baseline = self._baseline
+            if diff and baseline is not None:
+                stats = await asyncio.to_thread(snapshot.compare_to, baseline, key_type)
+                entries = [
+                    {
+                        "location": self._location(stat.traceback, key_type),
+                        "size_kb": round(stat.size / 1024, 1),
+                        "size_diff_kb": round(stat.size_diff / 1024, 1),
+                        "count": stat.count,
+                        "count_diff": stat.count_diff,
+                    }
+                    for stat in stats[:limit]
+                ]
+            else:
+                stats = await asyncio.to_thread(snapshot.statistics, key_type)
+                entries = [
+                    {
+                        "location": self._location(stat.traceback, key_type),
+                        "size_kb": round(stat.size / 1024, 1),
+                        "count": stat.count,
+                    }
+                    for stat in stats[:limit]
+                ]
+            if reset_baseline:
+                self._baseline = snapshot
+
+        result = self.tracing_state()
+        result.update({"diff": diff and baseline is not None, "key_type": key_type, "stats": entries})
+        return result
+
+    @staticmethod
+    def _location(traceback: tracemalloc.Traceback, key_type: str) -> Any:
+        if key_type == "traceback":
+            return [f"{frame.filename}:{frame.lineno}" for frame in traceback]
+        frame = traceback[0]
+        return frame.filename if key_type == "filename" else f"{frame.filename}:{frame.lineno}"
+
+    # Tasks
+
+    def task_dump(self, limit: int) -> Dict[str, Any]:
+        """
+        Await chain of every asyncio task on the running loop.
+
+        Args:
+            limit: Maximum number of tasks to include
+
+        Returns:
+            Dict with total, counts per coroutine and per-task entries
+        """
+        tasks = list(asyncio.all_tasks())
+        by_coroutine = Counter(self._coroutine_name(task) for task in tasks)
+        entries = []
+        for task in tasks[:limit]:
+            entries.append({
+                "name": task.get_name(),
+                "coroutine": self._coroutine_name(task),
+                "done": task.done(),
+                "cancelling": task.cancelling() if hasattr(task, "cancelling") else None,
+                "stack": self._await_chain(task),
+            })
+        return {
+            "total": len(tasks),
+            "by_coroutine": dict(by_coroutine.most_common()),
+            "tasks": entries,
+            "pid": os.getpid(),
+        }
+
+    @staticmethod
+    def _coroutine_name(task: asyncio.Task) -> str:
+        coro = task.get_coro()
+        return getattr(coro, "__qualname__", type(coro).__name__)
+
+    @staticmethod
+    def _await_chain(task: asyncio.Task) -> List[str]:
+        """
+        Frames from the task's coroutine down to where it is suspended.
+        Task.get_stack() returns a single frame for suspended coroutines, so
+        the cr_await chain is followed instead.
+        """
+        chain: List[str] = []
+        coro: Any = task.get_coro()
+        while coro is not None and len(chain) < MAX_TASK_DEPTH:
+            frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+            if frame is None:
+                break
+            chain.append(f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}")
+            coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+        return chain
+
+
+# Global profiler instance
+profiler = Profiler()
+
+
+def get_profiler() -> Profiler:
+    """
+    Dependency to get profiler.
+
+    Returns:
+        Profiler: Profiler instance
+    """
+    return profiler
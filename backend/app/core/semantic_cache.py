@@ -0,0 +1,245 @@
+"""
+Semantic response cache for first-turn questions.
+Questions are embedded with a hashing vectorizer and matched by cosine
+similarity, so paraphrases of a cached question reuse its answer. Bag-of-words
+similarity stays high for "do you offer X" vs "do you not offer X" or "X on
+AWS", so a hit also requires both questions to have the same content terms.
+"""
+
+import logging
+import re
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+import numpy as np
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 1024
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Function words carry little meaning for matching questions
+_STOPWORDS = frozenset(
+    "a about ai an and any are bigfat can could do does for have how i in is it "
+    "know labs like me my of on or please some tell the to us want we what "
+    "which with would you your".split()
+)
+
+# Map common paraphrases onto one term so they share features
+_SYNONYMS = {
+    "provide": "offer", "provides": "offer", "offering": "offer", "offerings": "offer",
+    "offers": "offer", "sell": "offer", "supply": "offer",
+    "service": "services", "solution": "services", "solutions": "services",
+    "reach": "contact", "email": "contact", "phone": "contact",
+    "schedule": "book", "booking": "book", "arrange": "book",
+    "appointment": "meeting", "consultation": "meeting", "demo": "meeting",
+    "technology": "tech", "technologies": "tech",
+    "cost": "price", "costs": "price", "pricing": "price", "prices": "price",
+}
+# Contractions split into "don" + "t" etc.; all map to one term
+_NEGATIONS = frozenset("not no never nor none cannot without t don doesn didn isn aren wasn".split())
+_STOPWORD_WEIGHT = 0.25
+_NGRAM_WEIGHT = 0.5
+
+
+def content_terms(text: str) -> FrozenSet[str]:
+    """
+    Terms two questions must share to reuse an answer: words other than
+    stopwords, after synonyms and a plural "s", with negations as "not".
+
+    Args:
+        text: Question text
+
+    Returns:
+        FrozenSet[str]: Content terms
+    """
+    terms = set()
+    for word in _WORD_RE.findall(text.lower()):
+        if word in _NEGATIONS:
+            terms.add("not")
+            continue
+        word = _SYNONYMS.get(word, word)
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.add(word)
+    return frozenset(terms)
+
+
+class HashingVectorizer:
+    """Embeds short texts into fixed-size vectors using hashed word and character n-gram features."""
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[Tuple[str, float]]:
+        features = []
+        for word in _WORD_RE.findall(text.lower()):
+            word = _SYNONYMS.get(word, word)
+            weight = _STOPWORD_WEIGHT if word in _STOPWORDS else 1.0
+            features.append((word, weight))
+            if weight == 1.0 and len(word) > 3:
+                padded = f"<{word}>"
+                for i in range(len(padded) - 2):
+                    features.append((f"#{padded[i:i + 3]}", _NGRAM_WEIGHT))
+        return features
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Embed text as an L2-normalized vector.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            np.ndarray: float32 vector of length dim
+        """
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self._features(text):
+            h = zlib.crc32(feature.encode())
+            # Signed hashing keeps collisions from only adding up
+            vector[h % self.dim] += weight if h & 0x80000000 else -weight
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+class SemanticCache:
+    """Bounded in-process similarity index of cached answers with LRU eviction."""
+
+    def __init__(
+        self,
+        capacity: int,
+        threshold: float,
+        ttl_seconds: int,
+        vectorizer: Optional[HashingVectorizer] = None
+    ):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self._version: Optional[str] = None
+        self._vectors = np.zeros((capacity, self.vectorizer.dim), dtype=np.float32)
+        self._payloads: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self._expires = np.zeros(capacity, dtype=np.float64)
+        # normalized question -> slot, ordered from least to most recently used
+        self._slots: "OrderedDict[str, int]" = OrderedDict()
+        self._questions: List[Optional[str]] = [None] * capacity
+        self._terms: List[Optional[FrozenSet[str]]] = [None] * capacity
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(question: str) -> str:
+        return " ".join(_WORD_RE.findall(question.lower()))
+
+    def _check_version(self, version: str) -> None:
+        """Drop all entries when the knowledgebase version changes."""
+        if version != self._version:
+            if self._slots:
+                logger.info(f"Semantic cache cleared for knowledgebase version {version}")
+            self.clear()
+            self._version = version
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._slots.clear()
+        self._vectors[:] = 0
+        self._expires[:] = 0
+        self._payloads = [None] * self.capacity
+        self._questions = [None] * self.capacity
+        self._terms = [None] * self.capacity
+
+    def lookup(self, question: str, version: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached answer for a similar question.
+
+        Args:
+            question: Incoming question
+            version: Knowledgebase version the answer must belong to
+
+        Returns:
+            Optional[Dict[str, Any]]: Cached payload with a "similarity" key, or None
+        """
+        self._check_version(version)
+        if not self._slots:
+            self.misses += 1
+            return None
+
+        query = self.vectorizer.embed(question)
+        scores = self._vectors @ query
+        # Expired and empty slots never match
+        scores[self._expires < time.time()] = -1.0
+        best = int(np.argmax(scores))
+        similarity = float(scores[best])
+
+        if similarity < self.threshold or self._terms[best] != content_terms(question):
+            self.misses += 1
+            return None
+
+        self._slots.move_to_end(self._questions[best])
+        self.hits += 1
+        return {**self._payloads[best], "similarity": similarity}
+
+    def store(self, question: str, version: str, payload: Dict[str, Any]) -> None:
+        """
+        Cache an answer for a question.
+
+        Args:
+            question: Question that produced the answer
+            version: Knowledgebase version the answer belongs to
+            payload: Data to return on a hit (response, model, tokens_used)
+        """
+        self._check_version(version)
+        key = self._normalize(question)
+        if not key:
+            return
+
+        slot = self._slots.get(key)
+        if slot is not None:
+            self._slots.move_to_end(key)
+        elif len(self._slots) < self.capacity:
+            slot = len(self._slots)
+            self._slots[key] = slot
+        else:
+            # Evict the least recently used entry and reuse its slot
+            _, slot = self._slots.popitem(last=False)
+            self._slots[key] = slot
+
+        self._vectors[slot] = self.vectorizer.embed(question)
+        self._payloads[slot] = payload
+        self._questions[slot] = key
+        self._terms[slot] = content_terms(question)
+        self._expires[slot] = time.time() + self.ttl_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and occupancy."""
+        return {
+            "entries": len(self._slots),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Global semantic cache instance
+semantic_cache = SemanticCache(
+    capacity=settings.SEMANTIC_CACHE_SIZE,
+    threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+    ttl_seconds=settings.CACHE_TTL_SECONDS
+)
+
+
+def get_semantic_cache() -> SemanticCache:
+    """
+    Dependency to get semantic cache.
+
+    Returns:
+        SemanticCache: Semantic cache instance
+    """
+    return semantic_cache
@@ -0,0 +1,119 @@
+"""
+Background startup and warm-up.
+Dependency connections, index builds and cache warm-up run as a task after the
+server binds its port, so liveness answers immediately and readiness waits
+until warm-up completes. Each phase is timed and reported once at the end.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Phase = Callable[[], Awaitable[Any]]
+
+
+class StartupCoordinator:
+    """Runs startup phases in stages and records their timings."""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.started_at: Optional[float] = None
+        self.completed_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def complete(self) -> bool:
+        """Whether every phase has finished (successfully or not)."""
+        return self.completed_at is not None
+
+    def start(self, stages: List[Dict[str, Phase]]) -> None:
+        """
+        Start running phases in the background.
+        Phases within a stage run concurrently; stages run in order.
+
+        Args:
+            stages: List of {phase name: coroutine function}
+        """
+        if self._task is None or self._task.done():
+            self.started_at = time.perf_counter()
+            self._task = asyncio.create_task(self._run(stages))
+
+    async def wait(self) -> None:
+        """Wait for warm-up to finish."""
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    async def stop(self) -> None:
+        """Cancel warm-up if it is still running."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _run(self, stages: List[Dict[str, Phase]]) -> None:
+        for stage in stages:
+            await asyncio.gather(*(self._phase(name, fn) for name, fn in stage.items()))
+        self.completed_at = time.perf_counter()
+        logger.info(f"Warm-up complete: {self.format_report()}")
+
+    async def _phase(self, name: str, fn: Phase) -> None:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(fn(), timeout=settings.STARTUP_PHASE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self.errors[name] = "timeout"
+            logger.warning(f"Startup phase {name} timed out after {settings.STARTUP_PHASE_TIMEOUT_SECONDS}s")
+        except Exception as e:
+            self.errors[name] = str(e)
+            logger.warning(f"Startup phase {name} failed: {e}")
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Startup timing report.
+
+        Returns:
+            Dict with complete flag, total_ms, per-phase milliseconds and errors
+        """
+        total = None
+        if self.started_at is not None:
+            total = (self.completed_at or time.perf_counter()) - self.started_at
+        return {
+            "complete": self.complete,
+            "total_ms": round(total * 1000, 1) if total is not None else None,
+            "phases": {name: round(duration * 1000, 1) for name, duration in self.phases.items()},
+            "errors": dict(self.errors),
+        }
+
+    def format_report(self) -> str:
+        """One-line summary of phase timings, slowest first."""
+        report = self.report()
+        phases = sorted(report["phases"].items(), key=lambda item: item[1], reverse=True)
+        parts = [
+            f"{name}={ms:.0f}ms" + (" (failed)" if name in self.errors else "")
+            for name, ms in phases
+        ]
+        return f"total={report['total_ms']:.0f}ms " + " ".join(parts)
+
+
+# Global startup coordinator instance
+startup = StartupCoordinator()
+
+
+def get_startup() -> StartupCoordinator:
+    """
+    Dependency to get startup coordinator.
+
+    Returns:
+        StartupCoordinator: Startup coordinator instance
+    """
+    return startup
@@ -0,0 +1,309 @@
+"""
+Registry of in-flight and recently finished streamed responses.
+Generation runs as a detached task writing into a per-stream buffer, so a
+client that reconnects with Last-Event-ID resumes from the buffer instead of
+starting a new LLM call. Finished streams spill to Redis (when available) so
+other workers can replay them until they expire.
+
+Slow clients are handled per follower: once a follower falls
+STREAM_COALESCE_AFTER_CHUNKS behind, pending chunks are merged into one frame;
+with STREAM_SLOW_CLIENT_POLICY=abort, a generation whose follower has been
+behind for STREAM_MAX_LAG_SECONDS is stopped and the partial answer saved.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import AsyncIterator, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.core.cache import CacheManager, cache_manager
+from app.core import metrics
+from app.core.drain import drain_coordinator
+from app.core.metrics import observe_redis
+
+logger = logging.getLogger(__name__)
+
+_ERROR_PREFIX = "error:"
+SLOW_CLIENT_ERROR = "Stream aborted: client is not keeping up"
+
+
+class StreamFollower:
+    """Read position and lag of one client following a stream."""
+
+    __slots__ = ("next_index", "behind_since", "max_lag")
+
+    def __init__(self, start: int):
+        self.next_index = start
+        self.behind_since: Optional[float] = None
+        self.max_lag = 0.0
+
+    def lag(self, now: float) -> float:
+        """Seconds this follower has been behind the producer."""
+        return now - self.behind_since if self.behind_since is not None else 0.0
+
+
+class StreamBuffer:
+    """Chunks produced by one generation, readable from any offset."""
+
+    __slots__ = (
+        "stream_id", "chunks", "offsets", "done", "error", "created_at", "finished_at",
+        "task", "followers", "_changed"
+    )
+
+    def __init__(self, stream_id: str):
+        self.stream_id = stream_id
+        self.chunks: List[str] = []
+        # offsets[i] = bytes produced up to and including chunk i
+        self.offsets: List[int] = []
+        self.followers: Set[StreamFollower] = set()
+        self.done = False
+        self.error: Optional[str] = None
+        self.created_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    @property
+    def size(self) -> int:
+        """Bytes produced so far."""
+        return self.offsets[-1] if self.offsets else 0
+
+    def append(self, chunk: str) -> None:
+        """Add a chunk, mark followers that still had unread chunks as behind, and wake them."""
+        self.chunks.append(chunk)
+        self.offsets.append(self.size + len(chunk.encode()))
+        last = len(self.chunks) - 1
+        for follower in self.followers:
+            if follower.next_index < last and follower.behind_since is None:
+                follower.behind_since = time.monotonic()
+        self._notify()
+
+    def buffered_bytes(self) -> int:
+        """Bytes produced but not yet handed to followers."""
+        size = self.size
+        return sum(
+            size - (self.offsets[f.next_index - 1] if f.next_index else 0)
+            for f in self.followers
+        )
+
+    def max_lag(self) -> float:
+        """Longest time any follower has been behind."""
+        now = time.monotonic()
+        return max((f.lag(now) for f in self.followers), default=0.0)
+
+    def finish(self, error: Optional[str] = None) -> None:
+        """Mark the stream complete, optionally with an error."""
+        self.done = True
+        self.error = error
+        self.finished_at = time.monotonic()
+        self._notify()
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def follow(self, start: int = 0, coalesce_after: int = 0) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Yield (last index, content) from start, waiting for new chunks until done.
+        When more than coalesce_after chunks are pending, they are merged into one item.
+
+        Args:
+            start: Index of the first chunk to yield
+            coalesce_after: Pending-chunk threshold for merging (0 disables)
+        """
+        follower = StreamFollower(start)
+        self.followers.add(follower)
+        try:
+            while True:
+                index = follower.next_index
+                pending = len(self.chunks) - index
+                if pending <= 0:
+                    if follower.behind_since is not None:
+                        follower.max_lag = max(follower.max_lag, follower.lag(time.monotonic()))
+                        follower.behind_since = None
+                    if self.done:
+                        return
+                    await self._changed.wait()
+                    continue
+
+                if coalesce_after and pending > coalesce_after:
+                    last = len(self.chunks) - 1
+                    content = "".join(self.chunks[index:])
+                    metrics.record_slow_client("coalesce")
+                else:
+                    last = index
+                    content = self.chunks[index]
+                follower.next_index = last + 1
+                yield last, content
+        finally:
+            self.followers.discard(follower)
+            metrics.observe_stream_lag(max(follower.max_lag, follower.lag(time.monotonic())))
+
+
+class StreamRegistry:
+    """Tracks stream buffers by ID with TTL- and size-bounded retention."""
+
+    def __init__(self, cache: CacheManager):
+        self.cache = cache
+        self._streams: "OrderedDict[str, StreamBuffer]" = OrderedDict()
+        self.active = 0
+
+    def reserve(self) -> bool:
+        """
+        Claim a generation slot before setting up a stream.
+        Check and claim happen without awaiting, so concurrent requests cannot
+        all pass the MAX_CONCURRENT_STREAMS check. The slot passes to start(),
+        or must be given back with release() if setup fails.
+
+        Returns:
+            bool: False if this worker already runs MAX_CONCURRENT_STREAMS generations
+        """
+        if self.active >= settings.MAX_CONCURRENT_STREAMS:
+            return False
+        self.active += 1
+        return True
+
+    def release(self) -> None:
+        """Give back a slot from reserve() that was not passed to start()."""
+        self.active -= 1
+
+    def buffered_bytes(self) -> int:
+        """Bytes produced but not yet sent, across all followers."""
+        return sum(buffer.buffered_bytes() for buffer in self._streams.values() if buffer.followers)
+
+    def start(self, chunks: AsyncIterator[str]) -> StreamBuffer:
+        """
+        Register a new stream and start pumping chunks into it.
+        Uses the slot claimed with reserve(); it is freed when the pump ends.
+
+        Args:
+            chunks: Content chunks from the chatbot service
+
+        Returns:
+            StreamBuffer: Buffer to follow
+        """
+        self._evict()
+        buffer = StreamBuffer(uuid.uuid4().hex)
+        self._streams[buffer.stream_id] = buffer
+        buffer.task = drain_coordinator.track("stream", asyncio.create_task(self._pump(buffer, chunks)))
+        return buffer
+
+    async def _pump(self, buffer: StreamBuffer, chunks: AsyncIterator[str]) -> None:
+        """Drain the service stream into the buffer, independent of any client."""
+        abort_after = settings.STREAM_MAX_LAG_SECONDS if settings.STREAM_SLOW_CLIENT_POLICY == "abort" else 0
+        try:
+            async for chunk in chunks:
+                buffer.append(chunk)
+                if abort_after and buffer.followers and buffer.max_lag() > abort_after:
+                    logger.warning(f"Aborting stream {buffer.stream_id}: client lagging over {abort_after}s")
+                    metrics.record_slow_client("abort")
+                    # Closing the service stream saves the partial answer
+                    await chunks.aclose()
+                    buffer.finish(SLOW_CLIENT_ERROR)
+                    break
+            else:
+                buffer.finish()
+        except asyncio.CancelledError:
+            buffer.finish("Stream cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Error in stream {buffer.stream_id}: {e}")
+            buffer.finish(str(e))
+        finally:
+            self.active -= 1
+
+        await self._spill(buffer)
+
+    async def get(self, stream_id: str) -> Optional[StreamBuffer]:
+        """
+        Find a stream by ID, locally or in Redis.
+
+        Args:
+            stream_id: Stream identifier
+
+        Returns:
+            Optional[StreamBuffer]: Buffer if the stream is known and unexpired
+        """
+        buffer = self._streams.get(stream_id)
+        if buffer is not None:
+            return buffer
+        return await self._load(stream_id)
+
+    async def _spill(self, buffer: StreamBuffer) -> None:
+        """Copy a finished stream to Redis so any worker can replay it."""
+        if not (self.cache.is_connected and self.cache.redis is not None):
+            return
+
+        key = f"stream:{buffer.stream_id}"
+        ttl = settings.STREAM_RESUME_TTL_SECONDS
+        try:
+            pipe = self.cache.redis.pipeline(transaction=False)
+            if buffer.chunks:
+                pipe.rpush(f"{key}:chunks", *buffer.chunks)
+                pipe.expire(f"{key}:chunks", ttl)
+            pipe.setex(f"{key}:status", ttl, _ERROR_PREFIX + buffer.error if buffer.error else "done")
+            start = time.perf_counter()
+            await pipe.execute()
+            observe_redis("pipeline", time.perf_counter() - start)
+        except Exception as e:
+            logger.warning(f"Error saving stream {buffer.stream_id} to Redis: {e}")
+
+    async def _load(self, stream_id: str) -> Optional[StreamBuffer]:
+        """Rebuild a finished stream spilled to Redis by this or another worker."""
+        if not (self.cache.is_connected and self.cache.redis is not None):
+            return None
+
+        key = f"stream:{stream_id}"
+        try:
+            pipe = self.cache.redis.pipeline(transaction=False)
+            pipe.get(f"{key}:status")
+            pipe.lrange(f"{key}:chunks", 0, -1)
+            start = time.perf_counter()
+            status, chunks = await pipe.execute()
+            observe_redis("pipeline", time.perf_counter() - start)
+        except Exception as e:
+            logger.warning(f"Error loading stream {stream_id} from Redis: {e}")
+            return None
+
+        if status is None:
+            return None
+
+        buffer = StreamBuffer(stream_id)
+        buffer.chunks = list(chunks)
+        buffer.finish(status[len(_ERROR_PREFIX):] if status.startswith(_ERROR_PREFIX) else None)
+        return buffer
+
+    def _evict(self) -> None:
+        """Drop expired finished streams, then the oldest finished ones over the cap."""
+        now = time.monotonic()
+        ttl = settings.STREAM_RESUME_TTL_SECONDS
+        for stream_id in [
+            sid for sid, buffer in self._streams.items()
+            if buffer.done and now - buffer.finished_at > ttl
+        ]:
+            del self._streams[stream_id]
+
+        excess = len(self._streams) - settings.STREAM_REGISTRY_MAX_STREAMS + 1
+        if excess > 0:
+            for stream_id in [sid for sid, buffer in self._streams.items() if buffer.done][:excess]:
+                del self._streams[stream_id]
+
+
+# Global stream registry instance
+stream_registry = StreamRegistry(cache_manager)
+
+if metrics.METRICS_ENABLED and not metrics.MULTIPROCESS:
+    # Computed at scrape time; function gauges are not supported in multiprocess mode
+    metrics.SSE_BUFFERED_BYTES.set_function(stream_registry.buffered_bytes)
+
+
+def get_stream_registry() -> StreamRegistry:
+    """
+    Dependency to get stream registry.
+
+    Returns:
+        StreamRegistry: Stream registry instance
+    """
+    return stream_registry
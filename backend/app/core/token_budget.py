@@ -0,0 +1,323 @@
+"""
+Token accounting and tokens-per-minute budget enforcement.
+Uses Redis when available and falls back to in-process counters.
+"""
+
+import logging
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from app.core.config import settings
+from app.core.cache import CacheManager, cache_manager
+from app.core.metrics import observe_redis
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SECONDS = 60
+
+
+class TokenBudgetExceeded(Exception):
+    """
+    Raised when a request is predicted to exceed a token budget.
+    retry_after is None when the request is larger than the limit itself,
+    so retrying can never succeed.
+    """
+
+    def __init__(self, scope: str, used: int, limit: int, retry_after: Optional[int]):
+        self.scope = scope
+        self.used = used
+        self.limit = limit
+        self.retry_after = retry_after
+        if retry_after is None:
+            message = f"Request is larger than the token budget for {scope} ({limit} tokens per minute)"
+        else:
+            message = f"Token budget exceeded for {scope} ({used}/{limit} tokens per minute)"
+        super().__init__(message)
+
+
+class BudgetDecision(NamedTuple):
+    """Outcome of a budget admission check."""
+
+    model: str
+    max_tokens: int
+    downgraded: bool
+    reserved: int
+    scopes: Tuple[str, ...]
+    user_id: Optional[str]
+    prompt_tokens: int
+
+
+class TokenBudgetManager:
+    """Records token usage and enforces rolling tokens-per-minute budgets."""
+
+    def __init__(self, cache: CacheManager):
+        self.cache = cache
+        # scope -> {minute bucket: tokens}
+        self._windows: Dict[str, Dict[int, int]] = {}
+        # model -> {"prompt_tokens": n, "completion_tokens": n, "requests": n}
+        self._model_usage: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def _limits(user_id: Optional[str]) -> List[Tuple[str, int]]:
+        """Budget scopes and their limits for a request."""
+        limits = [("global", settings.TOKEN_BUDGET_GLOBAL_TPM)]
+        if user_id:
+            limits.append((f"user:{user_id}", settings.TOKEN_BUDGET_USER_TPM))
+        return limits
+
+    @property
+    def _use_redis(self) -> bool:
+        return self.cache.is_connected and self.cache.redis is not None
+
+    async def _window_usage(self, scopes: List[str]) -> List[int]:
+        """
+        Estimate tokens used in the last minute for each scope.
+        Uses a sliding window over the current and previous minute buckets.
+
+        Args:
+            scopes: Budget scopes to read
+
+        Returns:
+            List[int]: Estimated usage per scope, in the same order
+        """
+        now = time.time()
+        bucket = int(now // WINDOW_SECONDS)
+        weight = 1 - (now % WINDOW_SECONDS) / WINDOW_SECONDS
+
+        if self._use_redis:
+            try:
+                keys = []
+                for scope in scopes:
+                    keys.append(f"token_budget:{scope}:{bucket}")
+                    keys.append(f"token_budget:{scope}:{bucket - 1}")
+                start = time.perf_counter()
+                values = await self.cache.redis.mget(keys)
+                observe_redis("mget", time.perf_counter() - start)
+                return [
+                    int(int(values[i] or 0) + int(values[i + 1] or 0) * weight)
+                    for i in range(0, len(values), 2)
+                ]
+            except Exception as e:
+                logger.warning(f"Error reading token budget from Redis: {e}")
+
+        usage = []
+        for scope in scopes:
+            window = self._windows.get(scope, {})
+            usage.append(int(window.get(bucket, 0) + window.get(bucket - 1, 0) * weight))
+        return usage
+
+    async def _add(self, scopes: Tuple[str, ...], tokens: int) -> None:
+        """Add tokens (possibly negative) to the current bucket of each scope."""
+        if not scopes or tokens == 0:
+            return
+
+        bucket = int(time.time() // WINDOW_SECONDS)
+
+        if self._use_redis:
+            try:
+                pipe = self.cache.redis.pipeline(transaction=False)
+                for scope in scopes:
+                    key = f"token_budget:{scope}:{bucket}"
+                    pipe.incrby(key, tokens)
+                    pipe.expire(key, WINDOW_SECONDS * 2)
+                start = time.perf_counter()
+                await pipe.execute()
+                observe_redis("pipeline", time.perf_counter() - start)
+                return
+            except Exception as e:
+                logger.warning(f"Error updating token budget in Redis: {e}")
+
+        for scope in scopes:
+            window = self._windows.setdefault(scope, {})
+            window[bucket] = window.get(bucket, 0) + tokens
+            for old in [b for b in window if b < bucket - 1]:
+                del window[old]
+
+        # Drop idle per-user windows so the fallback stays bounded
+        if len(self._windows) > 10_000:
+            self._windows = {
+                scope: window for scope, window in self._windows.items()
+                if any(b >= bucket - 1 for b in window)
+            }
+
+    async def admit(
+        self,
+        model: str,
+        prompt_tokens: int,
+        max_tokens: int,
+        user_id: Optional[str] = None
+    ) -> BudgetDecision:
+        """
+        Check a request against the token budgets and reserve its tokens.
+
+        Args:
+            model: Model the request would use
+            prompt_tokens: Estimated prompt tokens
+            max_tokens: Completion tokens requested
+            user_id: User identifier, if known
+
+        Returns:
+            BudgetDecision: Model and completion cap to use. The cap is lowered
+                to the remaining budget when at least
+                TOKEN_BUDGET_MIN_COMPLETION_TOKENS are left
+
+        Raises:
+            TokenBudgetExceeded: If the request does not fit even after downgrading
+        """
+        if not settings.TOKEN_BUDGET_ENABLED:
+            return BudgetDecision(model, max_tokens, False, 0, (), user_id, prompt_tokens)
+
+        limits = self._limits(user_id)
+        scopes = tuple(scope for scope, _ in limits)
+        usage = await self._window_usage(list(scopes))
+        # Completion tokens every scope still has room for after the prompt
+        headroom = min(limit - used for (_, limit), used in zip(limits, usage)) - prompt_tokens
+
+        def decide(model_name: str, tokens: int, downgraded: bool) -> BudgetDecision:
+            return BudgetDecision(model_name, tokens, downgraded, prompt_tokens + tokens, scopes, user_id, prompt_tokens)
+
+        decision = decide(model, max_tokens, False)
+
+        if max_tokens > headroom and settings.TOKEN_BUDGET_ACTION == "downgrade":
+            downgrade_model = settings.TOKEN_BUDGET_DOWNGRADE_MODEL or settings.OPENROUTER_FALLBACK_MODEL
+            if downgrade_model:
+                decision = decide(downgrade_model, min(max_tokens, settings.TOKEN_BUDGET_DOWNGRADE_MAX_TOKENS), True)
+
+        if decision.max_tokens > headroom:
+            smallest = min(decision.max_tokens, settings.TOKEN_BUDGET_MIN_COMPLETION_TOKENS)
+            if headroom < smallest:
+                self._reject(limits, usage, prompt_tokens + smallest)
+            # Cap the completion to what is left instead of refusing a request that fits
+            decision = decide(decision.model, headroom, decision.downgraded)
+
+        if decision.downgraded:
+            logger.info(f"Token budget near limit, downgrading to {decision.model}")
+
+        await self._add(scopes, decision.reserved)
+        return decision
+
+    @staticmethod
+    def _reject(limits: List[Tuple[str, int]], usage: List[int], needed: int) -> None:
+        """
+        Raise for a request that does not fit.
+
+        Args:
+            limits: Budget scopes and their limits
+            usage: Tokens used per scope, in the same order
+            needed: Smallest reservation the request could run with
+
+        Raises:
+            TokenBudgetExceeded: Without retry_after if no scope could ever fit
+                the request, otherwise for the scope with the least room
+        """
+        for scope, limit in limits:
+            if needed > limit:
+                logger.warning(f"Request needs {needed} tokens, over the {scope} budget of {limit} tokens per minute")
+                raise TokenBudgetExceeded(scope, 0, limit, retry_after=None)
+
+        (scope, limit), used = min(zip(limits, usage), key=lambda item: item[0][1] - item[1])
+        retry_after = WINDOW_SECONDS - int(time.time() % WINDOW_SECONDS)
+        logger.warning(f"Token budget exceeded for {scope}: {used}/{limit} tokens per minute")
+        raise TokenBudgetExceeded(scope, used, limit, retry_after)
+
+    async def settle(
+        self,
+        decision: BudgetDecision,
+        prompt_tokens: int,
+        completion_tokens: int,
+        model: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> None:
+        """
+        Replace a reservation with the actual usage and record it.
+        Call with zero tokens to release a reservation after a failed call.
+
+        Args:
+            decision: Decision returned by admit()
+            prompt_tokens: Actual prompt tokens
+            completion_tokens: Actual completion tokens
+            model: Model reported by the provider. Defaults to decision.model
+            session_id: Session identifier, if known
+        """
+        total = prompt_tokens + completion_tokens
+        await self._add(decision.scopes, total - decision.reserved)
+
+        if total == 0:
+            return
+
+        await self._record_usage(
+            model or decision.model, decision.user_id, session_id,
+            prompt_tokens, completion_tokens
+        )
+
+    async def _record_usage(
+        self,
+        model: str,
+        user_id: Optional[str],
+        session_id: Optional[str],
+        prompt_tokens: int,
+        completion_tokens: int
+    ) -> None:
+        """Accumulate usage per model, user and session."""
+        if self._use_redis:
+            try:
+                pipe = self.cache.redis.pipeline(transaction=False)
+                targets = [(f"token_usage:model:{model}", None)]
+                if user_id:
+                    targets.append((f"token_usage:user:{user_id}", settings.TOKEN_USAGE_TTL_SECONDS))
+                if session_id:
+                    targets.append((f"token_usage:session:{session_id}", settings.TOKEN_USAGE_TTL_SECONDS))
+                for key, ttl in targets:
+                    pipe.hincrby(key, "prompt_tokens", prompt_tokens)
+                    pipe.hincrby(key, "completion_tokens", completion_tokens)
+                    pipe.hincrby(key, "requests", 1)
+                    if ttl:
+                        pipe.expire(key, ttl)
+                start = time.perf_counter()
+                await pipe.execute()
+                observe_redis("pipeline", time.perf_counter() - start)
+                return
+            except Exception as e:
+                logger.warning(f"Error recording token usage in Redis: {e}")
+
+        # In-process fallback keeps per-model totals only to stay bounded
+        totals = self._model_usage.setdefault(
+            model, {"prompt_tokens": 0, "completion_tokens": 0, "requests": 0}
+        )
+        totals["prompt_tokens"] += prompt_tokens
+        totals["completion_tokens"] += completion_tokens
+        totals["requests"] += 1
+
+    async def get_usage(self, scope: str) -> Dict[str, int]:
+        """
+        Get accumulated usage for a scope.
+
+        Args:
+            scope: "model:<name>", "user:<id>" or "session:<id>"
+
+        Returns:
+            Dict[str, int]: prompt_tokens, completion_tokens and requests
+        """
+        if self._use_redis:
+            try:
+                data = await self.cache.redis.hgetall(f"token_usage:{scope}")
+                return {field: int(value) for field, value in data.items()}
+            except Exception as e:
+                logger.warning(f"Error reading token usage for {scope}: {e}")
+
+        if scope.startswith("model:"):
+            return dict(self._model_usage.get(scope[len("model:"):], {}))
+        return {}
+
+
+# Global token budget manager instance
+token_budget_manager = TokenBudgetManager(cache_manager)
+
+
+def get_token_budget() -> TokenBudgetManager:
+    """
+    Dependency to get token budget manager.
+
+    Returns:
+        TokenBudgetManager: Token budget manager instance
+    """
+    return token_budget_manager
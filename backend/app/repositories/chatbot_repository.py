@@ -8,8 +8,16 @@ from typing import List, Optional
 from datetime import datetime
 import uuid
 from motor.motor_asyncio import AsyncIOMotorCollection
-from app.schemas.chatbot import ChatMessage, ConversationDocument
-from app.core.database import get_chatbot_collection
+from app.schemas.chatbot import (
+    ChatMessage,
+    ConversationDocument,
+    SessionSummary,
+    chat_message_list_adapter,
+    conversation_document_list_adapter,
+)
+from app.core.config import settings
+from app.core.metrics import track_mongo
+from app.core.database import DatabaseManager, db_manager
 
 logger = logging.getLogger(__name__)
 
@@ -17,9 +25,33 @@ logger = logging.getLogger(__name__)
 class ChatbotRepository:
     """Repository for chatbot conversation data access."""
     
-    def __init__(self, collection: Optional[AsyncIOMotorCollection]):
-        self.collection = collection
+    def __init__(self, database: DatabaseManager):
+        self.database = database
+        self._bound_db = None
+        self._collection: Optional[AsyncIOMotorCollection] = None
+        self._summary_collection: Optional[AsyncIOMotorCollection] = None
     
+    def _bind(self) -> None:
+        """Resolve collections against the current database; it may connect after startup."""
+        db = self.database.db if self.database.is_connected else None
+        if db is not self._bound_db:
+            self._bound_db = db
+            self._collection = db[settings.MONGODB_COLLECTION] if db is not None else None
+            self._summary_collection = db[settings.MONGODB_SUMMARY_COLLECTION] if db is not None else None
+    
+    @property
+    def collection(self) -> Optional[AsyncIOMotorCollection]:
+        """Conversation collection, or None while the database is unavailable."""
+        self._bind()
+        return self._collection
+    
+    @property
+    def summary_collection(self) -> Optional[AsyncIOMotorCollection]:
+        """Summary collection, or None while the database is unavailable."""
+        self._bind()
+        return self._summary_collection
+    
+    @track_mongo("save_conversation")
     async def save_conversation(
         self,
         conversation_id: str,
@@ -48,8 +80,8 @@ class ChatbotRepository:
         try:
             now = datetime.utcnow()
             
-            # Convert messages to dict format
-            messages_dict = [msg.model_dump() for msg in messages]
+            # Convert messages to dict format in one serializer call
+            messages_dict = chat_message_list_adapter.dump_python(messages)
             
             document = {
                 "conversation_id": conversation_id,
@@ -77,6 +109,7 @@ class ChatbotRepository:
             logger.error(f"Error saving conversation {conversation_id}: {e}")
             return False
     
+    @track_mongo("get_conversation")
     async def get_conversation(self, conversation_id: str) -> Optional[ConversationDocument]:
         """
         Retrieve a conversation by ID.
@@ -105,6 +138,7 @@ class ChatbotRepository:
             logger.error(f"Error retrieving conversation {conversation_id}: {e}")
             return None
     
+    @track_mongo("get_session_history")
     async def get_session_history(self, session_id: str, limit: int = 50) -> List[ConversationDocument]:
         """
         Retrieve all conversations for a session.
@@ -124,10 +158,8 @@ class ChatbotRepository:
                 {"session_id": session_id}
             ).sort("updated_at", -1).limit(limit)
             
-            conversations = []
-            async for doc in cursor:
-                doc.pop("_id", None)
-                conversations.append(ConversationDocument(**doc))
+            # Validated as one list; unknown fields such as _id are ignored
+            conversations = conversation_document_list_adapter.validate_python(await cursor.to_list(length=limit))
             
             logger.info(f"Retrieved {len(conversations)} conversations for session {session_id}")
             return conversations
@@ -136,6 +168,7 @@ class ChatbotRepository:
             logger.error(f"Error retrieving session history {session_id}: {e}")
             return []
     
+    @track_mongo("get_user_history")
     async def get_user_history(self, user_id: str, limit: int = 50) -> List[ConversationDocument]:
         """
         Retrieve all conversations for a user.
@@ -155,10 +188,8 @@ class ChatbotRepository:
                 {"user_id": user_id}
             ).sort("updated_at", -1).limit(limit)
             
-            conversations = []
-            async for doc in cursor:
-                doc.pop("_id", None)
-                conversations.append(ConversationDocument(**doc))
+            # Validated as one list; unknown fields such as _id are ignored
+            conversations = conversation_document_list_adapter.validate_python(await cursor.to_list(length=limit))
             
             logger.info(f"Retrieved {len(conversations)} conversations for user {user_id}")
             return conversations
@@ -167,6 +198,7 @@ class ChatbotRepository:
             logger.error(f"Error retrieving user history {user_id}: {e}")
             return []
     
+    @track_mongo("delete_conversation")
     async def delete_conversation(self, conversation_id: str) -> bool:
         """
         Delete a conversation by ID.
@@ -194,6 +226,7 @@ class ChatbotRepository:
             logger.error(f"Error deleting conversation {conversation_id}: {e}")
             return False
     
+    @track_mongo("delete_session_history")
     async def delete_session_history(self, session_id: str) -> int:
         """
         Delete all conversations for a session.
@@ -210,6 +243,9 @@ class ChatbotRepository:
         try:
             result = await self.collection.delete_many({"session_id": session_id})
             
+            if self.summary_collection is not None:
+                await self.summary_collection.delete_one({"session_id": session_id})
+            
             logger.info(f"Deleted {result.deleted_count} conversations for session {session_id}")
             return result.deleted_count
             
@@ -217,6 +253,7 @@ class ChatbotRepository:
             logger.error(f"Error deleting session history {session_id}: {e}")
             return 0
     
+    @track_mongo("append_message")
     async def append_message(
         self,
         conversation_id: str,
@@ -255,13 +292,73 @@ class ChatbotRepository:
             logger.error(f"Error appending message to conversation {conversation_id}: {e}")
             return False
 
+    
+    @track_mongo("get_session_summary")
+    async def get_session_summary(self, session_id: str) -> Optional[SessionSummary]:
+        """
+        Retrieve the rolling summary for a session.
+        
+        Args:
+            session_id: Session identifier
+            
+        Returns:
+            Optional[SessionSummary]: Summary or None if not found
+        """
+        if self.summary_collection is None:
+            return None
+        
+        try:
+            doc = await self.summary_collection.find_one({"session_id": session_id})
+            
+            if not doc:
+                return None
+            
+            doc.pop("_id", None)
+            
+            return SessionSummary(**doc)
+            
+        except Exception as e:
+            logger.error(f"Error retrieving summary for session {session_id}: {e}")
+            return None
+    
+    @track_mongo("save_session_summary")
+    async def save_session_summary(self, summary: SessionSummary) -> bool:
+        """
+        Save or replace the rolling summary for a session.
+        
+        Args:
+            summary: Session summary
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        if self.summary_collection is None:
+            return False
+        
+        try:
+            await self.summary_collection.update_one(
+                {"session_id": summary.session_id},
+                {"$set": summary.model_dump()},
+                upsert=True
+            )
+            
+            logger.info(f"Saved summary for session {summary.session_id} (covers {summary.covered_messages} messages)")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error saving summary for session {summary.session_id}: {e}")
+            return False
+
+
+# Global chatbot repository instance
+chatbot_repository = ChatbotRepository(db_manager)
+
 
-async def get_chatbot_repository() -> ChatbotRepository:
+def get_chatbot_repository() -> ChatbotRepository:
     """
-    Dependency to get chatbot repository instance.
+    Get the chatbot repository.
     
     Returns:
         ChatbotRepository: Repository instance
     """
-    collection = await get_chatbot_collection()
-    return ChatbotRepository(collection)
+    return chatbot_repository
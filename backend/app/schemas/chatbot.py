@@ -1,62 +1,58 @@
 """
 Pydantic schemas for chatbot requests, responses, and data models.
+
+Models that parse client input (ChatMessage, ChatRequest) use lax validation,
+since JSON carries timestamps as strings. Models only ever built by this
+service or read back from MongoDB are strict: a wrong type there is a bug,
+not input to coerce.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import Annotated, List, Literal, Optional, Dict, Any
 from datetime import datetime
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, TypeAdapter
+
+MAX_MESSAGE_LENGTH = 2000
+MAX_HISTORY_MESSAGES = 50
+
+Role = Literal["user", "assistant", "system"]
+
+# Checked by pydantic-core, stripping before the length checks
+UserMessage = Annotated[
+    str, StringConstraints(strip_whitespace=True, min_length=1, max_length=MAX_MESSAGE_LENGTH)
+]
 
 
 class ChatMessage(BaseModel):
     """Individual chat message."""
     
-    role: str = Field(..., description="Message role: 'user', 'assistant', or 'system'")
+    role: Role = Field(..., description="Message role: 'user', 'assistant', or 'system'")
     content: str = Field(..., description="Message content")
     timestamp: Optional[datetime] = Field(default_factory=datetime.utcnow, description="Message timestamp")
     
-    @validator("role")
-    def validate_role(cls, v):
-        """Validate role is one of the allowed values."""
-        allowed = ["user", "assistant", "system"]
-        if v not in allowed:
-            raise ValueError(f"Role must be one of {allowed}")
-        return v
-    
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "role": "user",
                 "content": "What services does BIGFAT AI Labs provide?",
                 "timestamp": "2026-01-09T14:00:00Z"
             }
         }
+    )
 
 
 class ChatRequest(BaseModel):
     """Request model for chat endpoint."""
     
-    message: str = Field(..., min_length=1, max_length=2000, description="User message")
-    history: List[ChatMessage] = Field(default=[], description="Conversation history")
+    message: UserMessage = Field(..., description="User message")
+    # Length is checked before the items are validated, so oversized histories fail fast
+    history: List[ChatMessage] = Field(
+        default_factory=list, max_length=MAX_HISTORY_MESSAGES, description="Conversation history"
+    )
     user_id: Optional[str] = Field(default=None, description="User identifier for tracking")
     session_id: Optional[str] = Field(default=None, description="Session identifier for conversation continuity")
     
-    @validator("message")
-    def validate_message(cls, v):
-        """Validate message is not empty after stripping."""
-        if not v.strip():
-            raise ValueError("Message cannot be empty")
-        return v.strip()
-    
-    @validator("history")
-    def validate_history(cls, v):
-        """Validate history doesn't exceed maximum length."""
-        # This will be enforced in the service layer as well
-        if len(v) > 50:  # Hard limit
-            raise ValueError("Conversation history too long (max 50 messages)")
-        return v
-    
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "message": "What are your AI consulting services?",
                 "history": [
@@ -73,6 +69,7 @@ class ChatRequest(BaseModel):
                 "session_id": "session_abc"
             }
         }
+    )
 
 
 class ChatResponse(BaseModel):
@@ -86,8 +83,9 @@ class ChatResponse(BaseModel):
     model: Optional[str] = Field(default=None, description="Model used for response")
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="Response timestamp")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        strict=True,
+        json_schema_extra={
             "example": {
                 "response": "BIGFAT AI Labs provides AI Consulting, Enterprise AI Platform, AI Agents/Automation, and Custom AI Solutions.",
                 "conversation_id": "conv_123456789",
@@ -98,6 +96,7 @@ class ChatResponse(BaseModel):
                 "timestamp": "2026-01-09T14:00:00Z"
             }
         }
+    )
 
 
 class StreamChunk(BaseModel):
@@ -107,14 +106,15 @@ class StreamChunk(BaseModel):
     done: bool = Field(default=False, description="Whether this is the final chunk")
     conversation_id: Optional[str] = Field(default=None, description="Conversation ID")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "content": "BIGFAT AI Labs",
                 "done": False,
                 "conversation_id": "conv_123456789"
             }
         }
+    )
 
 
 class ConversationHistoryResponse(BaseModel):
@@ -126,8 +126,9 @@ class ConversationHistoryResponse(BaseModel):
     created_at: Optional[datetime] = Field(default=None, description="First message timestamp")
     updated_at: Optional[datetime] = Field(default=None, description="Last message timestamp")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        strict=True,
+        json_schema_extra={
             "example": {
                 "session_id": "session_abc",
                 "messages": [
@@ -147,6 +148,7 @@ class ConversationHistoryResponse(BaseModel):
                 "updated_at": "2026-01-09T14:00:01Z"
             }
         }
+    )
 
 
 class HealthCheckResponse(BaseModel):
@@ -154,10 +156,10 @@ class HealthCheckResponse(BaseModel):
     
     status: str = Field(..., description="Overall health status")
     timestamp: datetime = Field(default_factory=datetime.utcnow, description="Health check timestamp")
-    services: Dict[str, Any] = Field(default={}, description="Individual service health status")
+    services: Dict[str, Any] = Field(default_factory=dict, description="Individual service health status")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "status": "healthy",
                 "timestamp": "2026-01-09T14:00:00Z",
@@ -168,6 +170,7 @@ class HealthCheckResponse(BaseModel):
                 }
             }
         }
+    )
 
 
 class ConversationDocument(BaseModel):
@@ -179,10 +182,11 @@ class ConversationDocument(BaseModel):
     messages: List[ChatMessage] = Field(..., description="Conversation messages")
     created_at: datetime = Field(default_factory=datetime.utcnow, description="Creation timestamp")
     updated_at: datetime = Field(default_factory=datetime.utcnow, description="Last update timestamp")
-    metadata: Dict[str, Any] = Field(default={}, description="Additional metadata")
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        strict=True,
+        json_schema_extra={
             "example": {
                 "conversation_id": "conv_123456789",
                 "session_id": "session_abc",
@@ -202,3 +206,33 @@ class ConversationDocument(BaseModel):
                 }
             }
         }
+    )
+
+
+class SessionSummary(BaseModel):
+    """MongoDB document model for a session's rolling conversation summary."""
+    
+    session_id: str = Field(..., description="Session identifier")
+    summary: str = Field(..., description="Compact summary of the older conversation turns")
+    covered_messages: int = Field(..., description="Number of leading history messages folded into the summary")
+    fingerprint: str = Field(..., description="Hash of the covered messages, used to detect diverged history")
+    updated_at: datetime = Field(default_factory=datetime.utcnow, description="Last update timestamp")
+    
+    model_config = ConfigDict(
+        strict=True,
+        json_schema_extra={
+            "example": {
+                "session_id": "session_abc",
+                "summary": "Visitor runs a logistics startup and asked about AI agents for scheduling.",
+                "covered_messages": 12,
+                "fingerprint": "3f2a9c...",
+                "updated_at": "2026-01-09T14:00:00Z"
+            }
+        }
+    )
+
+
+# Cached adapters for list validation and serialization on hot paths; building
+# a TypeAdapter compiles a validator, so they are created once at import
+chat_message_list_adapter = TypeAdapter(List[ChatMessage])
+conversation_document_list_adapter = TypeAdapter(List[ConversationDocument])
@@ -6,13 +6,21 @@ Handles knowledgebase, conversation management, and response generation.
 import logging
 import os
 import uuid
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator, Tuple
 from datetime import datetime
+from starlette.requests import HTTPConnection
 from app.core.config import settings
-from app.core.cache import CacheManager, get_cache
-from app.schemas.chatbot import ChatMessage, ChatRequest, ChatResponse
-from app.repositories.chatbot_repository import ChatbotRepository, get_chatbot_repository
-from app.services.llm_service import LLMService, get_llm_service
+from app.core import metrics
+from app.core.cache import CacheManager
+from app.core.context import stage, user_id_var
+from app.core.semantic_cache import SemanticCache
+from app.core.token_budget import BudgetDecision, TokenBudgetExceeded, TokenBudgetManager
+from app.schemas.chatbot import ChatMessage, ChatRequest, ChatResponse, SessionSummary
+from app.repositories.chatbot_repository import ChatbotRepository
+from app.services.llm_service import LLMService, MESSAGE_TOKEN_OVERHEAD
+from app.services.intent_service import IntentMatch, IntentRouter
+from app.services.summary_service import ConversationSummarizer
+from app.utils.tokenizer import token_counter
 import hashlib
 import json
 
@@ -22,19 +30,31 @@ logger = logging.getLogger(__name__)
 class ChatbotService:
     """Service for chatbot business logic."""
     
+    # Shared by the per-request instances; filled on first use or during warm-up
+    _knowledgebase: Optional[str] = None
+    _system_prompt: Optional[str] = None
+    
     def __init__(
         self,
         llm_service: LLMService,
         repository: ChatbotRepository,
-        cache: CacheManager
+        cache: CacheManager,
+        token_budget: TokenBudgetManager,
+        summarizer: ConversationSummarizer,
+        semantic_cache: SemanticCache,
+        intent_router: IntentRouter
     ):
         self.llm_service = llm_service
         self.repository = repository
         self.cache = cache
-        self._knowledgebase = None
+        self.token_budget = token_budget
+        self.summarizer = summarizer
+        self.semantic_cache = semantic_cache
+        self.intent_router = intent_router
         self._knowledgebase_version = settings.KNOWLEDGEBASE_VERSION
     
-    def _load_knowledgebase(self) -> str:
+    @classmethod
+    def _load_knowledgebase(cls) -> str:
         """
         Load knowledgebase from file.
         Cached in memory for performance.
@@ -42,8 +62,8 @@ class ChatbotService:
         Returns:
             str: Knowledgebase content
         """
-        if self._knowledgebase is not None:
-            return self._knowledgebase
+        if cls._knowledgebase is not None:
+            return cls._knowledgebase
         
         try:
             file_path = os.path.join(
@@ -52,25 +72,29 @@ class ChatbotService:
             )
             
             with open(file_path, "r", encoding="utf-8") as f:
-                self._knowledgebase = f.read()
+                cls._knowledgebase = f.read()
             
             logger.info("Knowledgebase loaded successfully")
-            return self._knowledgebase
+            return cls._knowledgebase
             
         except Exception as e:
             logger.error(f"Error loading knowledgebase: {e}")
             return "BIGFAT AI Labs is an enterprise AI company providing AI solutions."
     
-    def _build_system_prompt(self) -> str:
+    @classmethod
+    def _build_system_prompt(cls) -> str:
         """
         Build system prompt with knowledgebase context.
         
         Returns:
             str: System prompt
         """
-        knowledgebase = self._load_knowledgebase()
+        if cls._system_prompt is not None:
+            return cls._system_prompt
+        
+        knowledgebase = cls._load_knowledgebase()
         
-        return f"""You are a helpful AI assistant for BIGFAT AI Labs, an enterprise AI company specializing in Generative AI solutions, custom development, and AI partnerships.
+        prompt = f"""You are a helpful AI assistant for BIGFAT AI Labs, an enterprise AI company specializing in Generative AI solutions, custom development, and AI partnerships.
 
 Your role is to provide comprehensive, accurate, and helpful responses about:
 - AI services and technical capabilities
@@ -98,6 +122,22 @@ Context about BIGFAT AI Labs:
 {knowledgebase}
 
 Remember: You are representing a professional AI company. Be helpful, accurate, maintain a professional tone, and keep responses concise (under 30 words)."""
+        
+        # Only cache once the real knowledgebase loaded, so a transient read error is retried
+        if cls._knowledgebase is not None:
+            cls._system_prompt = prompt
+        return prompt
+    
+    @classmethod
+    def warm(cls) -> int:
+        """
+        Load the knowledgebase and build the system prompt ahead of the first request.
+        Also primes the token count cache for the prompt.
+        
+        Returns:
+            int: System prompt size in tokens
+        """
+        return token_counter.count(cls._build_system_prompt())
     
     def _generate_cache_key(self, message: str, history: List[ChatMessage]) -> str:
         """
@@ -125,6 +165,210 @@ Remember: You are representing a professional AI company. Be helpful, accurate,
         
         return f"chat_response:{hash_obj.hexdigest()}"
     
+    def _build_messages(
+        self,
+        request: ChatRequest,
+        model: str,
+        summary: Optional[SessionSummary] = None
+    ) -> Tuple[List[Dict[str, str]], List[ChatMessage], int, int]:
+        """
+        Build the LLM message list within the model's context budget.
+        
+        The system prompt, session summary and current message are always
+        included; history not covered by the summary is then added
+        newest-to-oldest while it fits, leaving COMPLETION_RESERVE_TOKENS
+        free for the answer.
+        
+        Args:
+            request: Chat request
+            model: Model the prompt is built for
+            summary: Rolling summary covering the oldest history messages
+            
+        Returns:
+            Tuple of LLM messages, included history, prompt tokens and max completion tokens
+        """
+        system_prompt = self._build_system_prompt()
+        context_window = self.llm_service.context_window(model)
+        prompt_budget = context_window - settings.COMPLETION_RESERVE_TOKENS
+        
+        prompt_tokens = (
+            self.llm_service.estimate_tokens(system_prompt)
+            + self.llm_service.estimate_tokens(request.message)
+            + 2 * MESSAGE_TOKEN_OVERHEAD
+        )
+        
+        history = request.history
+        summary_message = None
+        if summary is not None:
+            history = history[summary.covered_messages:]
+            summary_message = {
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{summary.summary}"
+            }
+            prompt_tokens += self.llm_service.estimate_tokens(summary_message["content"]) + MESSAGE_TOKEN_OVERHEAD
+        
+        # Fill history newest-to-oldest until the budget is exhausted
+        max_history = settings.MAX_CONVERSATION_HISTORY
+        candidates = history[-max_history:] if len(history) > max_history else history
+        recent_history: List[ChatMessage] = []
+        for msg in reversed(candidates):
+            msg_tokens = self.llm_service.estimate_tokens(msg.content) + MESSAGE_TOKEN_OVERHEAD
+            if prompt_tokens + msg_tokens > prompt_budget:
+                break
+            recent_history.append(msg)
+            prompt_tokens += msg_tokens
+        recent_history.reverse()
+        
+        if len(recent_history) < len(request.history):
+            logger.debug(f"Context budget kept {len(recent_history)}/{len(request.history)} history messages")
+        
+        messages = [{"role": "system", "content": system_prompt}]
+        if summary_message is not None:
+            messages.append(summary_message)
+        messages.extend({"role": msg.role, "content": msg.content} for msg in recent_history)
+        messages.append({"role": "user", "content": request.message})
+        
+        max_tokens = min(settings.MAX_TOKENS, max(context_window - prompt_tokens, 1))
+        
+        return messages, recent_history, prompt_tokens, max_tokens
+    
+    def _match_intent(self, request: ChatRequest) -> Optional[IntentMatch]:
+        """
+        Match the request against the canned-answer intents.
+        
+        Args:
+            request: Chat request
+            
+        Returns:
+            Optional[IntentMatch]: Matched intent, or None to use the LLM
+        """
+        if not settings.INTENT_FASTPATH_ENABLED:
+            return None
+        
+        intent = self.intent_router.match(request.message)
+        metrics.record_cache("intent", intent is not None)
+        if intent:
+            logger.info(f"Intent fast-path hit: {intent.intent} ({intent.method})")
+        return intent
+    
+    async def _save_intent_turn(
+        self,
+        request: ChatRequest,
+        intent: IntentMatch,
+        conversation_id: str,
+        session_id: str
+    ) -> None:
+        """
+        Persist a turn answered from the answer bank.
+        
+        Args:
+            request: Chat request
+            intent: Matched intent
+            conversation_id: Conversation identifier
+            session_id: Session identifier
+        """
+        max_history = settings.MAX_CONVERSATION_HISTORY
+        recent_history = request.history[-max_history:] if len(request.history) > max_history else request.history
+        
+        await self.repository.save_conversation(
+            conversation_id=conversation_id,
+            messages=recent_history + [
+                ChatMessage(role="user", content=request.message, timestamp=datetime.utcnow()),
+                ChatMessage(role="assistant", content=intent.answer, timestamp=datetime.utcnow())
+            ],
+            user_id=request.user_id,
+            session_id=session_id,
+            metadata={
+                "intent": intent.intent,
+                "intent_method": intent.method,
+                "answer_bank_version": intent.version
+            }
+        )
+    
+    def _semantic_lookup(self, request: ChatRequest) -> Optional[Dict[str, Any]]:
+        """
+        Look up a first-turn question in the semantic cache.
+        
+        Args:
+            request: Chat request
+            
+        Returns:
+            Optional[Dict[str, Any]]: Cached payload on a hit, None otherwise
+        """
+        if not settings.SEMANTIC_CACHE_ENABLED or request.history:
+            return None
+        
+        hit = self.semantic_cache.lookup(request.message, self._knowledgebase_version)
+        metrics.record_cache("semantic", hit is not None)
+        if hit:
+            logger.info(f"Semantic cache hit (similarity: {hit['similarity']:.2f}) for message: {request.message[:50]}...")
+        return hit
+    
+    def _semantic_store(self, request: ChatRequest, payload: Dict[str, Any]) -> None:
+        """
+        Store a first-turn answer in the semantic cache.
+        
+        Args:
+            request: Chat request that produced the answer
+            payload: Response, model and token usage
+        """
+        if not settings.SEMANTIC_CACHE_ENABLED or request.history or not payload.get("response"):
+            return
+        
+        self.semantic_cache.store(request.message, self._knowledgebase_version, payload)
+    
+    async def _load_summary(self, request: ChatRequest) -> Optional[SessionSummary]:
+        """
+        Load the rolling summary for the request's session if it applies.
+        
+        Args:
+            request: Chat request
+            
+        Returns:
+            Optional[SessionSummary]: Summary covering a prefix of the history, or None
+        """
+        if not settings.SUMMARY_ENABLED or not request.session_id:
+            return None
+        if len(request.history) <= settings.SUMMARY_KEEP_MESSAGES:
+            return None
+        
+        summary = await self.repository.get_session_summary(request.session_id)
+        return self.summarizer.usable_summary(summary, request.history)
+    
+    async def _prepare(
+        self,
+        request: ChatRequest
+    ) -> Tuple[List[Dict[str, str]], List[ChatMessage], BudgetDecision, Optional[SessionSummary]]:
+        """
+        Build the prompt and check it against token budgets before calling the LLM.
+        The prompt is rebuilt if the budget downgrades to a model with a different context window.
+        
+        Args:
+            request: Chat request
+            
+        Returns:
+            Tuple of LLM messages, included history, the budget decision and the session summary used
+            
+        Raises:
+            TokenBudgetExceeded: If the request would exceed a token budget
+        """
+        model = self.llm_service.default_model
+        summary = await self._load_summary(request)
+        messages, recent_history, prompt_tokens, max_tokens = self._build_messages(request, model, summary)
+        
+        decision = await self.token_budget.admit(
+            model=model,
+            prompt_tokens=prompt_tokens,
+            max_tokens=max_tokens,
+            user_id=request.user_id
+        )
+        
+        if decision.downgraded and self.llm_service.context_window(decision.model) != self.llm_service.context_window(model):
+            messages, recent_history, _, downgraded_max = self._build_messages(request, decision.model, summary)
+            decision = decision._replace(max_tokens=min(decision.max_tokens, downgraded_max))
+        
+        return messages, recent_history, decision, summary
+    
     async def chat(self, request: ChatRequest) -> ChatResponse:
         """
         Process chat request and generate response.
@@ -134,17 +378,37 @@ Remember: You are representing a professional AI company. Be helpful, accurate,
             
         Returns:
             ChatResponse: AI response with metadata
+            
+        Raises:
+            TokenBudgetExceeded: If the request would exceed a token budget
         """
         try:
             # Generate conversation and session IDs if not provided
             conversation_id = str(uuid.uuid4())
             session_id = request.session_id or str(uuid.uuid4())
+            user_id_var.set(request.user_id)
+            
+            # Canned requests are answered from the answer bank
+            intent = self._match_intent(request)
+            if intent:
+                await self._save_intent_turn(request, intent, conversation_id, session_id)
+                return ChatResponse(
+                    response=intent.answer,
+                    conversation_id=conversation_id,
+                    session_id=session_id,
+                    cached=True,
+                    tokens_used=0,
+                    model=f"answer-bank/{intent.intent}",
+                    timestamp=datetime.utcnow()
+                )
             
             # Check cache if enabled
             cached_response = None
             if settings.CACHE_ENABLED and self.cache.is_connected:
                 cache_key = self._generate_cache_key(request.message, request.history)
-                cached_response = await self.cache.get(cache_key)
+                with stage("cache"):
+                    cached_response = await self.cache.get(cache_key)
+                metrics.record_cache("redis", cached_response is not None)
                 
                 if cached_response:
                     logger.info(f"Cache hit for message: {request.message[:50]}...")
@@ -163,47 +427,63 @@ Remember: You are representing a professional AI company. Be helpful, accurate,
                     except json.JSONDecodeError:
                         logger.warning("Invalid cached response format, fetching fresh response")
             
-            # Build messages for LLM
-            messages = [
-                {"role": "system", "content": self._build_system_prompt()}
-            ]
-            
-            # Add conversation history (limit to avoid context overflow)
-            max_history = settings.MAX_CONVERSATION_HISTORY
-            recent_history = request.history[-max_history:] if len(request.history) > max_history else request.history
-            
-            for msg in recent_history:
-                messages.append({
-                    "role": msg.role,
-                    "content": msg.content
-                })
-            
-            # Add current user message
-            messages.append({
-                "role": "user",
-                "content": request.message
-            })
+            # Semantic cache tier for first-turn questions
+            with stage("cache"):
+                semantic_hit = self._semantic_lookup(request)
+            if semantic_hit:
+                return ChatResponse(
+                    response=semantic_hit["response"],
+                    conversation_id=conversation_id,
+                    session_id=session_id,
+                    cached=True,
+                    tokens_used=semantic_hit.get("tokens_used"),
+                    model=semantic_hit.get("model"),
+                    timestamp=datetime.utcnow()
+                )
+            
+            # Build messages for LLM within the context and token budgets
+            with stage("prompt"):
+                messages, recent_history, decision, summary = await self._prepare(request)
             
             # Call LLM service
             logger.info(f"Calling LLM for user message: {request.message[:50]}...")
             
-            llm_response = await self.llm_service.chat_completion(messages)
+            try:
+                with stage("llm"):
+                    llm_response = await self.llm_service.chat_completion(
+                        messages,
+                        model=decision.model,
+                        max_tokens=decision.max_tokens
+                    )
+            except Exception:
+                await self.token_budget.settle(decision, 0, 0)
+                raise
             
             # Extract response
             ai_message = llm_response['choices'][0]['message']['content']
-            model_used = llm_response.get('model', settings.OPENROUTER_MODEL)
-            tokens_used = llm_response.get('usage', {}).get('total_tokens')
+            model_used = llm_response.get('model', decision.model)
+            usage = llm_response.get('usage') or {}
+            tokens_used = usage.get('total_tokens')
+            
+            await self.token_budget.settle(
+                decision,
+                prompt_tokens=usage.get('prompt_tokens', decision.prompt_tokens),
+                completion_tokens=usage.get('completion_tokens', self.llm_service.estimate_tokens(ai_message)),
+                model=model_used,
+                session_id=session_id
+            )
             
             logger.info(f"Received LLM response (tokens: {tokens_used})")
             
             # Cache the response if enabled
+            cache_data = {
+                "response": ai_message,
+                "tokens_used": tokens_used,
+                "model": model_used
+            }
             if settings.CACHE_ENABLED and self.cache.is_connected:
-                cache_data = {
-                    "response": ai_message,
-                    "tokens_used": tokens_used,
-                    "model": model_used
-                }
                 await self.cache.set(cache_key, json.dumps(cache_data), ttl=settings.CACHE_TTL_SECONDS)
+            self._semantic_store(request, cache_data)
             
             # Build full conversation for storage
             full_messages = recent_history + [
@@ -212,17 +492,22 @@ Remember: You are representing a professional AI company. Be helpful, accurate,
             ]
             
             # Save conversation to database
-            await self.repository.save_conversation(
-                conversation_id=conversation_id,
-                messages=full_messages,
-                user_id=request.user_id,
-                session_id=session_id,
-                metadata={
-                    "model": model_used,
-                    "tokens_used": tokens_used,
-                    "cached": False
-                }
-            )
+            with stage("db"):
+                await self.repository.save_conversation(
+                    conversation_id=conversation_id,
+                    messages=full_messages,
+                    user_id=request.user_id,
+                    session_id=session_id,
+                    metadata={
+                        "model": model_used,
+                        "tokens_used": tokens_used,
+                        "cached": False,
+                        "budget_downgraded": decision.downgraded
+                    }
+                )
+            
+            # Fold older turns into the session summary in the background
+            self.summarizer.maybe_schedule(self.repository, request.session_id, request.history, summary)
             
             return ChatResponse(
                 response=ai_message,
@@ -234,70 +519,195 @@ Remember: You are representing a professional AI company. Be helpful, accurate,
                 timestamp=datetime.utcnow()
             )
             
+        except TokenBudgetExceeded:
+            raise
         except Exception as e:
             logger.error(f"Error in chat service: {e}")
             raise
     
-    async def stream_chat(self, request: ChatRequest):
+    async def stream_chat(self, request: ChatRequest) -> AsyncIterator[str]:
+        """
+        Prepare a streaming chat response.
+        Budget checks run before returning so callers can reject the request
+        before any bytes are sent.
+        
+        Args:
+            request: Chat request
+            
+        Returns:
+            AsyncIterator[str]: Content chunks
+            
+        Raises:
+            TokenBudgetExceeded: If the request would exceed a token budget
+        """
+        user_id_var.set(request.user_id)
+        
+        intent = self._match_intent(request)
+        if intent:
+            return self._stream_intent(request, intent)
+        
+        with stage("cache"):
+            semantic_hit = self._semantic_lookup(request)
+        if semantic_hit:
+            return self._replay_cached(semantic_hit["response"])
+        
+        with stage("prompt"):
+            messages, recent_history, decision, summary = await self._prepare(request)
+        
+        return self._stream_response(request, messages, recent_history, decision, summary)
+    
+    async def _stream_response(
+        self,
+        request: ChatRequest,
+        messages: List[Dict[str, str]],
+        recent_history: List[ChatMessage],
+        decision: BudgetDecision,
+        summary: Optional[SessionSummary]
+    ) -> AsyncIterator[str]:
         """
-        Stream chat response.
+        Stream chat response and persist it once complete.
         
         Args:
             request: Chat request
+            messages: LLM messages
+            recent_history: History messages included in the prompt
+            decision: Token budget decision
+            summary: Session summary used for the prompt
             
         Yields:
             str: Content chunks
         """
+        session_id = request.session_id or str(uuid.uuid4())
+        usage: Dict[str, Any] = {}
+        full_response = ""
+        
         try:
-            # Build messages
-            messages = [
-                {"role": "system", "content": self._build_system_prompt()}
-            ]
-            
-            # Add history
-            max_history = settings.MAX_CONVERSATION_HISTORY
-            recent_history = request.history[-max_history:] if len(request.history) > max_history else request.history
-            
-            for msg in recent_history:
-                messages.append({
-                    "role": msg.role,
-                    "content": msg.content
-                })
-            
-            # Add current message
-            messages.append({
-                "role": "user",
-                "content": request.message
-            })
-            
             logger.info(f"Starting streaming chat for message: {request.message[:50]}...")
             
             # Stream from LLM
-            full_response = ""
-            async for chunk in self.llm_service.stream_chat_completion(messages):
+            async for chunk in self.llm_service.stream_chat_completion(
+                messages,
+                model=decision.model,
+                max_tokens=decision.max_tokens,
+                usage=usage
+            ):
                 full_response += chunk
                 yield chunk
             
-            # After streaming completes, save to database
-            conversation_id = str(uuid.uuid4())
-            session_id = request.session_id or str(uuid.uuid4())
-            
-            full_messages = recent_history + [
-                ChatMessage(role="user", content=request.message, timestamp=datetime.utcnow()),
-                ChatMessage(role="assistant", content=full_response, timestamp=datetime.utcnow())
-            ]
-            
-            await self.repository.save_conversation(
-                conversation_id=conversation_id,
-                messages=full_messages,
-                user_id=request.user_id,
-                session_id=session_id,
-                metadata={"model": settings.OPENROUTER_MODEL, "streaming": True}
-            )
-            
         except Exception as e:
             logger.error(f"Error in streaming chat: {e}")
+            await self.token_budget.settle(
+                decision, 0, self.llm_service.estimate_tokens(full_response)
+            )
+            raise
+        except BaseException:
+            # Client disconnected or task cancelled mid-stream: keep what was sent
+            await self.token_budget.settle(
+                decision, 0, self.llm_service.estimate_tokens(full_response)
+            )
+            if full_response:
+                await self._save_streamed_turn(
+                    request, session_id, recent_history, full_response, decision.model, None, decision,
+                    partial=True
+                )
             raise
+        
+        model_used = usage.get('model', decision.model)
+        await self.token_budget.settle(
+            decision,
+            prompt_tokens=usage.get('prompt_tokens', decision.prompt_tokens),
+            completion_tokens=usage.get('completion_tokens', self.llm_service.estimate_tokens(full_response)),
+            model=model_used,
+            session_id=session_id
+        )
+        
+        # After streaming completes, save to database
+        await self._save_streamed_turn(
+            request, session_id, recent_history, full_response, model_used, usage.get('total_tokens'), decision
+        )
+        
+        self.summarizer.maybe_schedule(self.repository, request.session_id, request.history, summary)
+        
+        self._semantic_store(request, {
+            "response": full_response,
+            "tokens_used": usage.get('total_tokens'),
+            "model": model_used
+        })
+    
+    async def _save_streamed_turn(
+        self,
+        request: ChatRequest,
+        session_id: str,
+        recent_history: List[ChatMessage],
+        response: str,
+        model: str,
+        tokens_used: Optional[int],
+        decision: BudgetDecision,
+        partial: bool = False
+    ) -> None:
+        """
+        Persist a streamed turn.
+        
+        Args:
+            request: Chat request
+            session_id: Session identifier
+            recent_history: History messages included in the prompt
+            response: Streamed response text (possibly truncated)
+            model: Model used
+            tokens_used: Provider-reported total tokens, if known
+            decision: Token budget decision
+            partial: Whether the stream was cut off before completion
+        """
+        full_messages = recent_history + [
+            ChatMessage(role="user", content=request.message, timestamp=datetime.utcnow()),
+            ChatMessage(role="assistant", content=response, timestamp=datetime.utcnow())
+        ]
+        
+        metadata = {
+            "model": model,
+            "tokens_used": tokens_used,
+            "streaming": True,
+            "budget_downgraded": decision.downgraded
+        }
+        if partial:
+            metadata["partial"] = True
+        
+        await self.repository.save_conversation(
+            conversation_id=str(uuid.uuid4()),
+            messages=full_messages,
+            user_id=request.user_id,
+            session_id=session_id,
+            metadata=metadata
+        )
+    
+    async def _stream_intent(self, request: ChatRequest, intent: IntentMatch) -> AsyncIterator[str]:
+        """
+        Stream a canned answer and persist the turn.
+        
+        Args:
+            request: Chat request
+            intent: Matched intent
+            
+        Yields:
+            str: The canned answer
+        """
+        yield intent.answer
+        
+        await self._save_intent_turn(
+            request, intent, str(uuid.uuid4()), request.session_id or str(uuid.uuid4())
+        )
+    
+    async def _replay_cached(self, response: str) -> AsyncIterator[str]:
+        """
+        Stream a cached response as a single chunk.
+        
+        Args:
+            response: Cached response text
+            
+        Yields:
+            str: The response
+        """
+        yield response
     
     async def get_session_history(self, session_id: str) -> List[ChatMessage]:
         """
@@ -346,15 +756,16 @@ Remember: You are representing a professional AI company. Be helpful, accurate,
             return 0
 
 
-async def get_chatbot_service() -> ChatbotService:
+async def get_chatbot_service(connection: HTTPConnection) -> ChatbotService:
     """
-    Dependency to get chatbot service.
+    Dependency to get the application-scoped chatbot service.
+    Built once in lifespan (see app.core.container); async so FastAPI does not
+    dispatch it to the thread pool.
+    
+    Args:
+        connection: Current HTTP or WebSocket connection
     
     Returns:
         ChatbotService: Chatbot service instance
     """
-    llm = get_llm_service()
-    repo = await get_chatbot_repository()
-    cache = await get_cache()
-    
-    return ChatbotService(llm, repo, cache)
+    return connection.app.state.container.chatbot_service
@@ -0,0 +1,165 @@
+"""
+Intent fast-path for canned requests.
+Matches short messages such as "how do I contact you" against a versioned
+answer bank and serves the templated answer without calling the LLM.
+"""
+
+import json
+import logging
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional, Pattern, Tuple
+import numpy as np
+from app.core.config import settings
+from app.core.semantic_cache import HashingVectorizer
+
+logger = logging.getLogger(__name__)
+
+
+class IntentMatch(NamedTuple):
+    """A message matched to an answer bank intent."""
+
+    intent: str
+    answer: str
+    version: str
+    method: str
+
+
+class IntentRouter:
+    """Keyword/regex intent classifier with an optional vector fallback."""
+
+    def __init__(self, answer_bank_path: str):
+        self.answer_bank_path = answer_bank_path
+        self.version: Optional[str] = None
+        self._answers: Dict[str, str] = {}
+        self._rules: List[Tuple[str, Pattern]] = []
+        self._example_intents: List[str] = []
+        self._example_vectors: Optional[np.ndarray] = None
+        self._vectorizer = HashingVectorizer()
+        self._checked = 0
+        self._hits: Dict[str, int] = {}
+
+    def load(self) -> bool:
+        """
+        Load and compile the answer bank.
+
+        Returns:
+            bool: True if the answer bank was loaded
+        """
+        try:
+            file_path = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+                self.answer_bank_path
+            )
+
+            with open(file_path, "r", encoding="utf-8") as f:
+                bank = json.load(f)
+
+            answers: Dict[str, str] = {}
+            rules: List[Tuple[str, Pattern]] = []
+            example_intents: List[str] = []
+            example_vectors = []
+
+            for intent, spec in bank["intents"].items():
+                answers[intent] = spec["answer"]
+                for pattern in spec.get("patterns", []):
+                    rules.append((intent, re.compile(pattern, re.IGNORECASE)))
+                for example in spec.get("examples", []):
+                    example_intents.append(intent)
+                    example_vectors.append(self._vectorizer.embed(example))
+
+            self.version = str(bank.get("version", "0"))
+            self._answers = answers
+            self._rules = rules
+            self._example_intents = example_intents
+            self._example_vectors = np.vstack(example_vectors) if example_vectors else None
+            self._hits = {intent: self._hits.get(intent, 0) for intent in answers}
+
+            logger.info(f"Answer bank v{self.version} loaded with {len(answers)} intents")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error loading answer bank: {e}")
+            self._answers = {}
+            self._rules = []
+            self._example_vectors = None
+            return False
+
+    def _classify(self, text: str) -> Optional[Tuple[str, str]]:
+        """Return (intent, method) for a normalized message."""
+        for intent, pattern in self._rules:
+            if pattern.search(text):
+                return intent, "rule"
+
+        if settings.INTENT_VECTOR_ENABLED and self._example_vectors is not None:
+            scores = self._example_vectors @ self._vectorizer.embed(text)
+            best = int(np.argmax(scores))
+            if scores[best] >= settings.INTENT_VECTOR_THRESHOLD:
+                return self._example_intents[best], "vector"
+
+        return None
+
+    def match(self, message: str) -> Optional[IntentMatch]:
+        """
+        Match a user message to a canned intent.
+
+        Args:
+            message: User message
+
+        Returns:
+            Optional[IntentMatch]: Matched intent and answer, or None to use the LLM
+        """
+        if self.version is None:
+            self.load()
+
+        self._checked += 1
+
+        text = " ".join(message.lower().split())
+        # Longer messages usually carry detail the canned answer would ignore
+        if len(text.split(" ")) > settings.INTENT_MAX_WORDS:
+            return None
+
+        result = self._classify(text)
+        if result is None:
+            return None
+
+        intent, method = result
+        self._hits[intent] = self._hits.get(intent, 0) + 1
+        return IntentMatch(intent, self._answers[intent], self.version or "0", method)
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Per-intent hit counts and rates.
+
+        Returns:
+            Dict with the answer bank version, messages checked and hits per intent
+        """
+        checked = self._checked
+        total_hits = sum(self._hits.values())
+        return {
+            "version": self.version,
+            "checked": checked,
+            "hits": total_hits,
+            "hit_rate": round(total_hits / checked, 4) if checked else 0.0,
+            "intents": {
+                intent: {
+                    "hits": hits,
+                    "hit_rate": round(hits / checked, 4) if checked else 0.0,
+                }
+                for intent, hits in self._hits.items()
+            },
+        }
+
+
+# Global intent router instance
+intent_router = IntentRouter(settings.INTENT_ANSWER_BANK_PATH)
+
+
+def get_intent_router() -> IntentRouter:
+    """
+    Dependency to get intent router.
+
+    Returns:
+        IntentRouter: Intent router instance
+    """
+    return intent_router
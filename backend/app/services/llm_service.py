@@ -6,13 +6,49 @@ Handles API calls, retry logic, and multi-model support.
 import logging
 from typing import List, Dict, Any, Optional
 import asyncio
+import time
 import aiohttp
+import orjson
 from aiohttp import ClientError, ClientTimeout
 from app.core.config import settings
+from app.core import metrics
+from app.core.context import get_request_id
+from app.core.faults import fault_injector
 from app.schemas.chatbot import ChatMessage
+from app.utils.tokenizer import token_counter
 
 logger = logging.getLogger(__name__)
 
+# Per-message formatting overhead added by chat templates
+MESSAGE_TOKEN_OVERHEAD = 4
+
+# Returned by parse_stream_line for the terminating "data: [DONE]" line
+STREAM_DONE: Dict[str, Any] = {}
+
+
+def parse_stream_line(line: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Decode one line of an OpenRouter SSE stream.
+    Works on the raw bytes, so lines that are not data (blank lines and
+    keep-alive comments) are skipped without decoding.
+    
+    Args:
+        line: Raw line including the trailing newline
+        
+    Returns:
+        Chunk payload, STREAM_DONE for the final line, or None for lines to skip
+    """
+    if not line.startswith(b"data: "):
+        return None
+    data = line[6:].strip()
+    if data == b"[DONE]":
+        return STREAM_DONE
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        logger.warning(f"Failed to parse streaming data: {data.decode('utf-8', 'replace')}")
+        return None
+
 
 class LLMService:
     """Service for interacting with OpenRouter LLM API."""
@@ -23,7 +59,63 @@ class LLMService:
         self.default_model = settings.OPENROUTER_MODEL
         self.fallback_model = settings.OPENROUTER_FALLBACK_MODEL
         self.timeout = ClientTimeout(total=settings.REQUEST_TIMEOUT)
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Shared session so TCP/TLS connections to OpenRouter are reused across calls."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.LLM_MAX_CONNECTIONS,
+                keepalive_timeout=settings.LLM_KEEPALIVE_SECONDS
+            )
+            self._session = fault_injector.wrap_llm(
+                aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            )
+        return self._session
+    
+    async def warm(self, connections: int) -> int:
+        """
+        Open keep-alive connections to OpenRouter ahead of the first request.
+        
+        Args:
+            connections: Number of connections to open concurrently
+            
+        Returns:
+            int: Connections opened
+        """
+        session = self._get_session()
+        
+        async def _open() -> bool:
+            try:
+                # HEAD has no body, so the connection goes straight back to the pool
+                async with session.head(self.api_url, headers={"HTTP-Referer": settings.SITE_URL}):
+                    return True
+            except ClientError as e:
+                logger.warning(f"Failed to pre-open OpenRouter connection: {e}")
+                return False
+        
+        results = await asyncio.gather(*(_open() for _ in range(connections)))
+        return sum(results)
+    
+    async def close(self) -> None:
+        """Close the shared session and its connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
     
+    def _headers(self) -> Dict[str, str]:
+        """Request headers for OpenRouter, tagged with the current request ID."""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "HTTP-Referer": settings.SITE_URL,
+            "X-Title": settings.SITE_NAME,
+            "Content-Type": "application/json"
+        }
+        request_id = get_request_id()
+        if request_id:
+            headers["X-Request-ID"] = request_id
+        return headers
+
     async def chat_completion(
         self,
         messages: List[Dict[str, str]],
@@ -52,12 +144,7 @@ class LLMService:
         temperature = temperature if temperature is not None else settings.TEMPERATURE
         max_tokens = max_tokens or settings.MAX_TOKENS
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "HTTP-Referer": settings.SITE_URL,
-            "X-Title": settings.SITE_NAME,
-            "Content-Type": "application/json"
-        }
+        headers = self._headers()
         
         payload = {
             "model": model,
@@ -79,23 +166,32 @@ class LLMService:
         for attempt_model in models_to_try:
             payload["model"] = attempt_model
             
+            start = time.perf_counter()
             try:
                 logger.info(f"Calling OpenRouter API with model: {attempt_model}")
                 
-                async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                    async with session.post(
-                        self.api_url,
-                        headers=headers,
-                        json=payload
-                    ) as response:
-                        response.raise_for_status()
-                        result = await response.json()
-                        
-                        logger.info(f"Successfully received response from {attempt_model}")
-                        return result
+                async with self._get_session().post(
+                    self.api_url,
+                    headers=headers,
+                    json=payload
+                ) as response:
+                    response.raise_for_status()
+                    result = await response.json()
+                    
+                    metrics.observe_llm(attempt_model, "chat", "success", time.perf_counter() - start)
+                    usage = result.get('usage') or {}
+                    metrics.record_tokens(
+                        result.get('model', attempt_model),
+                        usage.get('prompt_tokens', 0),
+                        usage.get('completion_tokens', 0)
+                    )
+                    
+                    logger.info(f"Successfully received response from {attempt_model}")
+                    return result
                         
             except ClientError as e:
                 last_exception = e
+                metrics.observe_llm(attempt_model, "chat", "error", time.perf_counter() - start)
                 logger.warning(f"API call failed with model {attempt_model}: {e}")
                 
                 # If this is the last model, raise the exception
@@ -105,10 +201,12 @@ class LLMService:
                 
                 # Otherwise, try the next model
                 logger.info(f"Trying fallback model: {self.fallback_model}")
+                metrics.record_fallback(attempt_model, self.fallback_model)
                 continue
                 
             except Exception as e:
                 last_exception = e
+                metrics.observe_llm(attempt_model, "chat", "error", time.perf_counter() - start)
                 logger.error(f"Unexpected error calling OpenRouter API: {e}")
                 raise
         
@@ -121,6 +219,7 @@ class LLMService:
         model: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
+        usage: Optional[Dict[str, Any]] = None,
     ):
         """
         Stream chat completion from OpenRouter API.
@@ -130,6 +229,7 @@ class LLMService:
             model: Model to use
             temperature: Sampling temperature
             max_tokens: Maximum tokens
+            usage: Optional dict updated with the usage block sent at the end of the stream
             
         Yields:
             str: Content chunks as they arrive
@@ -138,91 +238,107 @@ class LLMService:
         temperature = temperature if temperature is not None else settings.TEMPERATURE
         max_tokens = max_tokens or settings.MAX_TOKENS
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "HTTP-Referer": settings.SITE_URL,
-            "X-Title": settings.SITE_NAME,
-            "Content-Type": "application/json"
-        }
+        headers = self._headers()
         
         payload = {
             "model": model,
             "messages": messages,
             "temperature": temperature,
             "max_tokens": max_tokens,
-            "stream": True
+            "stream": True,
+            "stream_options": {"include_usage": True}
         }
         
+        if usage is None:
+            usage = {}
+        start = time.perf_counter()
+        first_token = True
+        
         try:
             logger.info(f"Starting streaming request with model: {model}")
             
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.post(
-                    self.api_url,
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    response.raise_for_status()
+            async with self._get_session().post(
+                self.api_url,
+                headers=headers,
+                json=payload
+            ) as response:
+                response.raise_for_status()
+                
+                async for line in response.content:
+                    data = parse_stream_line(line)
+                    if data is None:
+                        continue
+                    if data is STREAM_DONE:
+                        break
                     
-                    async for line in response.content:
-                        if line:
-                            line_str = line.decode('utf-8').strip()
-                            
-                            # OpenRouter uses SSE format: "data: {...}"
-                            if line_str.startswith('data: '):
-                                data_str = line_str[6:]  # Remove "data: " prefix
-                                
-                                if data_str == '[DONE]':
-                                    break
-                                
-                                try:
-                                    import json
-                                    data = json.loads(data_str)
-                                    
-                                    if 'choices' in data and len(data['choices']) > 0:
-                                        delta = data['choices'][0].get('delta', {})
-                                        content = delta.get('content', '')
-                                        
-                                        if content:
-                                            yield content
-                                            
-                                except json.JSONDecodeError:
-                                    logger.warning(f"Failed to parse streaming data: {data_str}")
-                                    continue
+                    if data.get('usage'):
+                        usage.update(data['usage'])
+                        usage.setdefault('model', data.get('model', model))
+                    
+                    choices = data.get('choices')
+                    if choices:
+                        content = (choices[0].get('delta') or {}).get('content')
+                        
+                        if content:
+                            if first_token:
+                                first_token = False
+                                metrics.observe_ttft(model, time.perf_counter() - start)
+                            yield content
+        
+            metrics.observe_llm(model, "stream", "success", time.perf_counter() - start)
+            metrics.record_tokens(
+                usage.get('model', model),
+                usage.get('prompt_tokens', 0),
+                usage.get('completion_tokens', 0)
+            )
                                     
         except Exception as e:
+            metrics.observe_llm(model, "stream", "error", time.perf_counter() - start)
             logger.error(f"Error in streaming completion: {e}")
             raise
     
     def estimate_tokens(self, text: str) -> int:
         """
-        Roughly estimate token count for text.
-        Uses simple heuristic: ~4 characters per token.
+        Count tokens in text using the shared tokenizer.
+        Falls back to ~4 characters per token if the tokenizer is unavailable.
         
         Args:
-            text: Text to estimate
+            text: Text to count
             
         Returns:
-            int: Estimated token count
+            int: Token count
         """
-        return len(text) // 4
+        return token_counter.count(text)
     
     def count_messages_tokens(self, messages: List[Dict[str, str]]) -> int:
         """
-        Estimate total tokens in message list.
+        Count total tokens in message list.
         
         Args:
             messages: List of messages
             
         Returns:
-            int: Estimated total tokens
+            int: Total tokens including per-message overhead
         """
         total = 0
         for msg in messages:
             total += self.estimate_tokens(msg.get('content', ''))
-            total += 4  # Overhead per message
+            total += MESSAGE_TOKEN_OVERHEAD
         
         return total
+    
+    def context_window(self, model: Optional[str] = None) -> int:
+        """
+        Get the context window size for a model.
+        
+        Args:
+            model: Model name. Defaults to the default model
+            
+        Returns:
+            int: Context window in tokens
+        """
+        model = model or self.default_model
+        return settings.MODEL_CONTEXT_WINDOWS.get(model, settings.DEFAULT_CONTEXT_WINDOW)
 
 
 # Global LLM service instance
@@ -0,0 +1,203 @@
+"""
+Rolling conversation summaries for long sessions.
+Older turns are folded into a compact summary in the background so prompts
+stay roughly constant in size as sessions grow.
+"""
+
+import asyncio
+import hashlib
+import logging
+from typing import Dict, List, Optional, Set
+from datetime import datetime
+from app.core.config import settings
+from app.core.drain import drain_coordinator
+from app.core.token_budget import TokenBudgetExceeded, TokenBudgetManager, get_token_budget
+from app.schemas.chatbot import ChatMessage, SessionSummary
+from app.repositories.chatbot_repository import ChatbotRepository
+from app.services.llm_service import LLMService, get_llm_service
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a website visitor and the "
+    "BIGFAT AI Labs assistant. Merge the new turns into the existing summary. Keep facts the "
+    "visitor shared about themselves, their goals, questions already answered and any open "
+    "requests. Write in plain prose, under 150 words, without greetings or commentary."
+)
+
+
+def history_fingerprint(messages: List[ChatMessage]) -> str:
+    """
+    Hash a run of history messages.
+    Used to check that a stored summary still matches the client's history.
+
+    Args:
+        messages: History messages
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for msg in messages:
+        digest.update(msg.role.encode())
+        digest.update(b"\x00")
+        digest.update(msg.content.encode("utf-8"))
+        digest.update(b"\x01")
+    return digest.hexdigest()
+
+
+class ConversationSummarizer:
+    """Maintains rolling per-session summaries in background tasks."""
+
+    def __init__(self, llm_service: LLMService, token_budget: TokenBudgetManager):
+        self.llm_service = llm_service
+        self.token_budget = token_budget
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def pending(self) -> Set[asyncio.Task]:
+        """Summary tasks that have not finished yet."""
+        return {task for task in self._tasks.values() if not task.done()}
+
+    def usable_summary(
+        self,
+        summary: Optional[SessionSummary],
+        history: List[ChatMessage]
+    ) -> Optional[SessionSummary]:
+        """
+        Return the summary if it still describes a prefix of the history.
+
+        Args:
+            summary: Stored summary, if any
+            history: History sent by the client
+
+        Returns:
+            Optional[SessionSummary]: The summary, or None if it does not apply
+        """
+        if summary is None or summary.covered_messages > len(history):
+            return None
+        if history_fingerprint(history[:summary.covered_messages]) != summary.fingerprint:
+            return None
+        return summary
+
+    def maybe_schedule(
+        self,
+        repository: ChatbotRepository,
+        session_id: Optional[str],
+        history: List[ChatMessage],
+        summary: Optional[SessionSummary]
+    ) -> bool:
+        """
+        Schedule a summary update if the unsummarized history is too long.
+        Runs after the response has been produced and never blocks the caller.
+
+        Args:
+            repository: Repository used to persist the summary
+            session_id: Session identifier
+            history: Full history sent by the client
+            summary: Current usable summary, if any
+
+        Returns:
+            bool: True if an update was scheduled
+        """
+        if not settings.SUMMARY_ENABLED or not session_id:
+            return False
+
+        covered = summary.covered_messages if summary else 0
+        fold_until = len(history) - settings.SUMMARY_KEEP_MESSAGES
+        if fold_until <= covered:
+            return False
+
+        unsummarized = sum(self.llm_service.estimate_tokens(msg.content) for msg in history[covered:])
+        if unsummarized < settings.SUMMARY_TRIGGER_TOKENS:
+            return False
+
+        running = self._tasks.get(session_id)
+        if running is not None and not running.done():
+            return False
+
+        task = drain_coordinator.track("summary", asyncio.create_task(
+            self._update(repository, session_id, list(history[:fold_until]), summary)
+        ))
+        self._tasks[session_id] = task
+        task.add_done_callback(lambda t, sid=session_id: self._forget(sid, t))
+        return True
+
+    def _forget(self, session_id: str, task: asyncio.Task) -> None:
+        if self._tasks.get(session_id) is task:
+            del self._tasks[session_id]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Summary update failed for session {session_id}: {task.exception()}")
+
+    async def _update(
+        self,
+        repository: ChatbotRepository,
+        session_id: str,
+        history: List[ChatMessage],
+        summary: Optional[SessionSummary]
+    ) -> None:
+        """Fold history[covered:] into the summary and persist it."""
+        covered = summary.covered_messages if summary else 0
+        transcript = "\n".join(f"{msg.role}: {msg.content}" for msg in history[covered:])
+
+        messages = [
+            {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+            {
+                "role": "user",
+                "content": f"Existing summary:\n{summary.summary if summary else '(none)'}\n\nNew turns:\n{transcript}"
+            }
+        ]
+
+        model = settings.SUMMARY_MODEL or settings.OPENROUTER_FALLBACK_MODEL or self.llm_service.default_model
+        try:
+            decision = await self.token_budget.admit(
+                model=model,
+                prompt_tokens=self.llm_service.count_messages_tokens(messages),
+                max_tokens=settings.SUMMARY_MAX_TOKENS
+            )
+        except TokenBudgetExceeded:
+            logger.info(f"Skipping summary update for session {session_id}: token budget exhausted")
+            return
+
+        try:
+            response = await self.llm_service.chat_completion(
+                messages,
+                model=decision.model,
+                temperature=0.2,
+                max_tokens=decision.max_tokens
+            )
+        except Exception:
+            await self.token_budget.settle(decision, 0, 0)
+            raise
+
+        text = response['choices'][0]['message']['content'].strip()
+        usage = response.get('usage') or {}
+        await self.token_budget.settle(
+            decision,
+            prompt_tokens=usage.get('prompt_tokens', decision.prompt_tokens),
+            completion_tokens=usage.get('completion_tokens', self.llm_service.estimate_tokens(text)),
+            model=response.get('model', decision.model),
+            session_id=session_id
+        )
+
+        await repository.save_session_summary(SessionSummary(
+            session_id=session_id,
+            summary=text,
+            covered_messages=len(history),
+            fingerprint=history_fingerprint(history),
+            updated_at=datetime.utcnow()
+        ))
+
+
+# Global summarizer instance
+conversation_summarizer = ConversationSummarizer(get_llm_service(), get_token_budget())
+
+
+def get_summarizer() -> ConversationSummarizer:
+    """
+    Dependency to get conversation summarizer.
+
+    Returns:
+        ConversationSummarizer: Summarizer instance
+    """
+    return conversation_summarizer
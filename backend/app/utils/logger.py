@@ -1,53 +1,147 @@
 """
 Logging configuration with structured logging support.
+Records are handed to a background thread through a bounded queue so slow
+stdout never blocks the event loop.
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
-from typing import Optional
+import threading
+import time
+from typing import Dict, Optional, Tuple
 from app.core.config import settings
-import json
-from datetime import datetime
+from app.core.context import request_id_var, user_id_var
+import orjson
 
 
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging."""
-    
+
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as JSON."""
         log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+            + f".{int(record.msecs):03d}Z",
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
         }
-        
+
         # Add exception info if present
-        if record.exc_info:
+        if record.exc_text:
+            log_data["exception"] = record.exc_text
+        elif record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
-        
+
         # Add extra fields
-        if hasattr(record, "request_id"):
-            log_data["request_id"] = record.request_id
-        
-        if hasattr(record, "user_id"):
-            log_data["user_id"] = record.user_id
-        
-        return json.dumps(log_data)
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            log_data["request_id"] = request_id
+
+        user_id = getattr(record, "user_id", None)
+        if user_id:
+            log_data["user_id"] = user_id
+
+        return orjson.dumps(log_data, default=str).decode()
+
+
+class ContextFilter(logging.Filter):
+    """Attach request_id and user_id from the current request context."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        if not hasattr(record, "user_id"):
+            record.user_id = user_id_var.get()
+        return True
+
+
+class DedupFilter(logging.Filter):
+    """
+    Rate-limit identical WARNING and above records.
+    The first occurrence is logged; repeats within the window are counted and
+    reported on the next record that gets through.
+    """
+
+    MAX_KEYS = 1000
+
+    def __init__(self, window_seconds: float):
+        super().__init__()
+        self.window = window_seconds
+        # (logger, level, message) -> (window start, suppressed count)
+        self._seen: Dict[Tuple[str, int, str], Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING or self.window <= 0:
+            return True
+
+        key = (record.name, record.levelno, str(record.msg))
+        now = record.created
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry and now - entry[0] < self.window:
+                self._seen[key] = (entry[0], entry[1] + 1)
+                return False
+
+            if len(self._seen) >= self.MAX_KEYS:
+                self._seen = {k: v for k, v in self._seen.items() if now - v[0] < self.window}
+            self._seen[key] = (now, 0)
+
+        if entry and entry[1]:
+            record.msg = f"{record.msg} (suppressed {entry[1]} similar messages)"
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that drops records instead of blocking when the queue is full.
+    Uses the lock-free SimpleQueue with an explicit size check.
+    """
+
+    def __init__(self, maxsize: int):
+        super().__init__(queue.SimpleQueue())
+        self.maxsize = maxsize
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Resolve the message and traceback now; formatting happens on the listener thread."""
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.stack_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.queue.qsize() >= self.maxsize:
+            self.dropped += 1
+            return
+        self.queue.put_nowait(record)
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
 
 
 def setup_logging() -> None:
     """
     Configure application logging.
-    Sets up console logging with appropriate format and level.
+    Sets up queued console logging with appropriate format and level.
     """
+    global _listener
+
     # Get log level from settings
     log_level = getattr(logging, settings.LOG_LEVEL, logging.INFO)
-    
-    # Create console handler
+
+    # Create console handler, written to by the listener thread only
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(log_level)
-    
+
     # Set formatter based on configuration
     if settings.JSON_LOGS:
         formatter = JSONFormatter()
@@ -56,31 +150,55 @@ def setup_logging() -> None:
             fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
             datefmt="%Y-%m-%d %H:%M:%S"
         )
-    
+
     console_handler.setFormatter(formatter)
-    
+
+    # Context and dedup run on the calling side, before the record leaves its context
+    queue_handler = NonBlockingQueueHandler(settings.LOG_QUEUE_SIZE)
+    queue_handler.setLevel(log_level)
+    queue_handler.addFilter(ContextFilter())
+    queue_handler.addFilter(DedupFilter(settings.LOG_DEDUP_WINDOW_SECONDS))
+
+    shutdown_logging()
+    _listener = logging.handlers.QueueListener(
+        queue_handler.queue, console_handler, respect_handler_level=True
+    )
+    _listener.start()
+
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
     root_logger.handlers = []  # Clear existing handlers
-    root_logger.addHandler(console_handler)
-    
+    root_logger.addHandler(queue_handler)
+
     # Set third-party library log levels
     logging.getLogger("uvicorn").setLevel(logging.INFO)
     logging.getLogger("fastapi").setLevel(logging.INFO)
     logging.getLogger("motor").setLevel(logging.WARNING)
     logging.getLogger("aiohttp").setLevel(logging.WARNING)
-    
+
     logging.info(f"Logging configured (level: {settings.LOG_LEVEL}, JSON: {settings.JSON_LOGS})")
 
 
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger instance.
-    
+
     Args:
         name: Logger name (typically __name__)
-        
+
     Returns:
         logging.Logger: Logger instance
     """
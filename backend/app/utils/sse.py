@@ -0,0 +1,70 @@
+"""
+Server-Sent Events frame encoding.
+Frames are assembled from pre-encoded byte templates around the
+orjson-escaped content, so each chunk costs one string encode.
+"""
+
+from typing import Any, Dict, Optional
+import orjson
+
+_CONTENT_PREFIX = b'data: {"content":'
+_CONTENT_SUFFIX = b',"done":false}\n\n'
+
+DONE_FRAME = b'data: {"content":"","done":true}\n\n'
+
+
+def content_frame(content: str) -> bytes:
+    """
+    Encode a content chunk as an SSE frame.
+
+    Args:
+        content: Text chunk
+
+    Returns:
+        bytes: `data: {"content": ..., "done": false}` frame
+    """
+    return _CONTENT_PREFIX + orjson.dumps(content) + _CONTENT_SUFFIX
+
+
+def error_frame(message: str) -> bytes:
+    """
+    Encode a terminal error as an SSE frame.
+
+    Args:
+        message: Error message shown to the client
+
+    Returns:
+        bytes: `data: {"error": ..., "done": true}` frame
+    """
+    return b'data: {"error":' + orjson.dumps(message) + b',"done":true}\n\n'
+
+
+def with_id(frame: bytes, event_id: str) -> bytes:
+    """
+    Prefix a frame with an SSE `id:` field so clients can resume with Last-Event-ID.
+
+    Args:
+        frame: Encoded frame
+        event_id: Event identifier
+
+    Returns:
+        bytes: Frame with id field
+    """
+    return b"id: " + event_id.encode() + b"\n" + frame
+
+
+def event_frame(data: Dict[str, Any], event: Optional[str] = None) -> bytes:
+    """
+    Encode an arbitrary JSON payload as an SSE frame.
+
+    Args:
+        data: JSON-serialisable payload
+        event: Optional event name
+
+    Returns:
+        bytes: SSE frame
+    """
+    frame = b"data: " + orjson.dumps(data) + b"\n\n"
+    if event:
+        frame = b"event: " + event.encode() + b"\n" + frame
+    return frame
@@ -0,0 +1,117 @@
+"""
+Token counting backed by tiktoken with an LRU cache keyed by content hash.
+Falls back to a character heuristic until the tokenizer has loaded.
+The BPE file is read from TOKENIZER_CACHE_DIR, which the build seeds with
+`python -m app.utils.tokenizer`, so startup does not depend on a download.
+"""
+
+import hashlib
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Strings shorter than this are cheaper to count than to hash
+_MIN_CACHED_LENGTH = 64
+
+
+def _cache_dir() -> str:
+    """TOKENIZER_CACHE_DIR resolved against the backend directory."""
+    return os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        settings.TOKENIZER_CACHE_DIR,
+    )
+
+
+class TokenCounter:
+    """Counts tokens with a bounded LRU cache of recent results."""
+
+    def __init__(self, encoding_name: str, cache_size: int):
+        self.encoding_name = encoding_name
+        self.cache_size = cache_size
+        self._encoding = None
+        self._cache: "OrderedDict[bytes, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """Whether counts come from the real tokenizer."""
+        return self._encoding is not None
+
+    def load(self) -> bool:
+        """
+        Load the tokenizer. Blocking (tiktoken may download the BPE file when
+        it is not in TIKTOKEN_CACHE_DIR), so it runs in a thread during warm-up
+        and again from the health prober after a failure. Counting never loads.
+
+        Returns:
+            bool: True if the real tokenizer is available
+        """
+        if self._encoding is not None:
+            return True
+        # A load already in progress will set the encoding
+        if not self._load_lock.acquire(blocking=False):
+            return False
+        try:
+            if self._encoding is None:
+                os.environ.setdefault("TIKTOKEN_CACHE_DIR", _cache_dir())
+                import tiktoken
+                self._encoding = tiktoken.get_encoding(self.encoding_name)
+                logger.info(f"Tokenizer loaded: {self.encoding_name}")
+        except Exception as e:
+            logger.warning(f"Tokenizer unavailable, using heuristic token counts until it loads: {e}")
+        finally:
+            self._load_lock.release()
+        return self._encoding is not None
+
+    def _count_uncached(self, text: str) -> int:
+        encoding = self._encoding
+        if encoding is None:
+            return max(len(text) // 4, 1) if text else 0
+        return len(encoding.encode_ordinary(text))
+
+    def count(self, text: str) -> int:
+        """
+        Count tokens in text.
+
+        Args:
+            text: Text to count
+
+        Returns:
+            int: Token count
+        """
+        # Heuristic counts are not cached, so they are replaced once the tokenizer loads
+        if len(text) < _MIN_CACHED_LENGTH or self._encoding is None:
+            return self._count_uncached(text)
+
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+        with self._lock:
+            cached: Optional[int] = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        tokens = self._count_uncached(text)
+
+        with self._lock:
+            self._cache[key] = tokens
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return tokens
+
+
+# Global token counter instance
+token_counter = TokenCounter(settings.TOKENIZER_ENCODING, settings.TOKEN_COUNT_CACHE_SIZE)
+
+
+if __name__ == "__main__":
+    # Seed the BPE cache at build time; fails the build if it cannot be fetched
+    sys.exit(0 if token_counter.load() else 1)
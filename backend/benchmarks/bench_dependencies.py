@@ -0,0 +1,106 @@
+"""
+Per-request dependency resolution cost for the chat routes.
+Runs FastAPI's own dependency solver against the previous route signatures
+(ChatbotService and ChatbotRepository built per request, sync getters that
+FastAPI dispatches to the thread pool) and the container-based ones.
+Request body parsing is excluded; both variants would pay it equally.
+
+Usage: python -m benchmarks.bench_dependencies [--quick] [--json PATH]
+"""
+
+import asyncio
+from fastapi import Depends, FastAPI
+from fastapi.dependencies.utils import get_dependant, solve_dependencies
+from starlette.requests import Request
+from benchmarks.harness import parse_args, print_table, run_cases, timing_options, write_json
+from app.core.cache import get_cache
+from app.core.container import Container, build_container, get_container
+from app.core.database import db_manager
+from app.core.drain import get_drain_coordinator
+from app.core.idempotency import get_idempotency_store
+from app.core.semantic_cache import get_semantic_cache
+from app.core.stream_registry import get_stream_registry
+from app.core.token_budget import get_token_budget
+from app.repositories.chatbot_repository import ChatbotRepository
+from app.services.chatbot_service import ChatbotService
+from app.services.intent_service import get_intent_router
+from app.services.llm_service import get_llm_service
+from app.services.summary_service import get_summarizer
+
+
+async def legacy_chatbot_service() -> ChatbotService:
+    """The per-request factory used before the container."""
+    repository = ChatbotRepository(db_manager)
+    cache = await get_cache()
+    return ChatbotService(
+        get_llm_service(), repository, cache, get_token_budget(), get_summarizer(),
+        get_semantic_cache(), get_intent_router()
+    )
+
+
+async def legacy_chat(
+    chatbot_service=Depends(legacy_chatbot_service),
+    cache=Depends(get_cache),
+    idempotency=Depends(get_idempotency_store),
+    drain=Depends(get_drain_coordinator),
+):
+    pass
+
+
+async def legacy_stream(
+    chatbot_service=Depends(legacy_chatbot_service),
+    cache=Depends(get_cache),
+    stream_registry=Depends(get_stream_registry),
+    idempotency=Depends(get_idempotency_store),
+    drain=Depends(get_drain_coordinator),
+):
+    pass
+
+
+async def container_route(container: Container = Depends(get_container)):
+    pass
+
+
+async def no_dependencies():
+    pass
+
+
+def _request(app: FastAPI) -> Request:
+    return Request({
+        "type": "http",
+        "app": app,
+        "method": "POST",
+        "path": "/",
+        "headers": [],
+        "query_string": b"",
+    })
+
+
+def main():
+    args = parse_args(__doc__)
+    options = timing_options(args)
+
+    app = FastAPI()
+    app.state.container = build_container()
+    loop = asyncio.new_event_loop()
+
+    def case(endpoint):
+        dependant = get_dependant(path="/", call=endpoint)
+        return lambda: loop.run_until_complete(
+            solve_dependencies(request=_request(app), dependant=dependant)
+        )
+
+    results = run_cases([
+        ("no dependencies (loop overhead)", case(no_dependencies)),
+        ("/chat per-request services", case(legacy_chat)),
+        ("/stream per-request services", case(legacy_stream)),
+        ("container", case(container_route)),
+    ], **options)
+    loop.close()
+
+    print_table("Dependency resolution per request", results, baseline="/stream per-request services")
+    write_json(args.json, "dependencies", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Per-request hot paths, gated against a stored baseline.
+Covers the work every chat request or streamed chunk repeats: cache key
+hashing, system prompt formatting, request validation at maximum size,
+conversation document construction, OpenRouter SSE parsing, outgoing SSE
+frame encoding and JSON log formatting.
+
+Store a baseline after an intentional change and check before merging:
+
+    python -m benchmarks.bench_hotpaths --save-baseline
+    python -m benchmarks.bench_hotpaths --check [--tolerance 0.25]
+
+--check exits 1 when a case is slower than its baseline by more than the
+tolerance. Cases are compared by their time relative to a reference workload
+run alternately with them, which cancels out machine speed and load.
+
+Usage: python -m benchmarks.bench_hotpaths [--quick] [--json PATH]
+           [--save-baseline | --check] [--tolerance FRACTION] [--baseline PATH]
+"""
+
+import json
+import logging
+import sys
+from datetime import datetime
+from typing import List
+import orjson
+from bson import ObjectId
+from benchmarks.harness import check_baseline, parse_args, print_table, run_cases, timing_options, write_json
+from app.core.container import build_container
+from app.schemas.chatbot import MAX_HISTORY_MESSAGES, MAX_MESSAGE_LENGTH, ChatRequest, ConversationDocument
+from app.services.chatbot_service import ChatbotService
+from app.services.llm_service import STREAM_DONE, parse_stream_line
+from app.utils.logger import JSONFormatter
+from app.utils.sse import content_frame, with_id
+
+
+def _history(count: int) -> List[dict]:
+    return [
+        {
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"Message {i} about AI consulting, agents and custom LLM platforms. " * 6,
+            "timestamp": "2026-01-09T14:00:00Z",
+        }
+        for i in range(count)
+    ]
+
+
+def _stream_lines(chunks: int) -> List[bytes]:
+    """An OpenRouter stream as aiohttp yields it: data lines separated by blank lines."""
+    lines = [b": OPENROUTER PROCESSING\n", b"\n"]
+    for i in range(chunks):
+        chunk = {
+            "id": "gen-1736431200-abc",
+            "model": "anthropic/claude-3-haiku",
+            "choices": [{"index": 0, "delta": {"role": "assistant", "content": f"token{i} "}, "finish_reason": None}],
+        }
+        lines += [b"data: " + orjson.dumps(chunk) + b"\n", b"\n"]
+    usage = {"choices": [], "usage": {"prompt_tokens": 900, "completion_tokens": chunks, "total_tokens": 900 + chunks}}
+    lines += [b"data: " + orjson.dumps(usage) + b"\n", b"\n", b"data: [DONE]\n"]
+    return lines
+
+
+def _legacy_parse(lines: List[bytes]) -> int:
+    """The loop body stream_chat_completion used before parse_stream_line."""
+    count = 0
+    for line in lines:
+        if line:
+            line_str = line.decode("utf-8").strip()
+            if line_str.startswith("data: "):
+                data_str = line_str[6:]
+                if data_str == "[DONE]":
+                    break
+                try:
+                    data = json.loads(data_str)
+                    if "choices" in data and len(data["choices"]) > 0:
+                        if data["choices"][0].get("delta", {}).get("content", ""):
+                            count += 1
+                except json.JSONDecodeError:
+                    continue
+    return count
+
+
+def _parse(lines: List[bytes]) -> int:
+    count = 0
+    for line in lines:
+        data = parse_stream_line(line)
+        if data is None:
+            continue
+        if data is STREAM_DONE:
+            break
+        choices = data.get("choices")
+        if choices and (choices[0].get("delta") or {}).get("content"):
+            count += 1
+    return count
+
+
+def main():
+    args = parse_args(__doc__, baseline=True)
+    options = timing_options(args)
+
+    service = build_container().chatbot_service
+    payload = {
+        "message": " " + "x" * (MAX_MESSAGE_LENGTH - 2) + " ",
+        "history": _history(MAX_HISTORY_MESSAGES),
+        "user_id": "user_123",
+        "session_id": "session_abc",
+    }
+    body = orjson.dumps(payload)
+    request = ChatRequest.model_validate(payload)
+
+    now = datetime(2026, 1, 9, 14, 0, 0)
+    document = {
+        "_id": ObjectId(),
+        "conversation_id": "conv_1",
+        "session_id": "session_abc",
+        "user_id": "user_123",
+        "messages": [
+            {"role": "user", "content": "What are your AI consulting services?", "timestamp": now},
+            {"role": "assistant", "content": "We offer AI consulting and custom agents. " * 10, "timestamp": now},
+        ],
+        "created_at": now,
+        "updated_at": now,
+        "metadata": {"model": "anthropic/claude-3-haiku", "tokens_used": 150},
+    }
+
+    lines = _stream_lines(100)
+    assert _parse(lines) == _legacy_parse(lines) == 100
+
+    ChatbotService._load_knowledgebase()
+
+    def cold_system_prompt():
+        ChatbotService._system_prompt = None
+        return ChatbotService._build_system_prompt()
+
+    record = logging.LogRecord(
+        "app.api.v1.endpoints.chatbot", logging.INFO, __file__, 1,
+        "Chat request processed in %.1f ms", (123.4,), None,
+    )
+    record.request_id = "3f2a9c1e-5b7d-4e8f-9a0b-1c2d3e4f5a6b"
+    record.user_id = "user_123"
+    formatter = JSONFormatter()
+
+    cases = [
+        ("cache key (max history)", lambda: service._generate_cache_key(request.message, request.history)),
+        ("system prompt format (cold)", cold_system_prompt),
+        ("request validate (dict)", lambda: ChatRequest.model_validate(payload)),
+        ("request validate (json)", lambda: ChatRequest.model_validate_json(body)),
+        ("conversation document", lambda: ConversationDocument(**document)),
+        ("stream parse 100 chunks legacy", lambda: _legacy_parse(lines)),
+        ("stream parse 100 chunks", lambda: _parse(lines)),
+        ("sse frame with id", lambda: with_id(content_frame("token42 "), "3f2a9c1e5b7d:42")),
+        ("json log format", lambda: formatter.format(record)),
+    ]
+    results = run_cases(cases, **options)
+
+    print_table("Per-request hot paths", results)
+    write_json(args.json, "hotpaths", results)
+    # The legacy parser is only there for comparison; it is not gated
+    status = check_baseline(
+        args, "hotpaths", [case for case in cases if "legacy" not in case[0]],
+        # Building the prompt copies the 8 KB knowledgebase into a new string, whose speed
+        # depends on where the allocator puts it; that differs by up to 60% between runs
+        noise={"system prompt format (cold)": 0.6},
+    )
+    # Leave the cached prompt in place, as after warm-up
+    ChatbotService._build_system_prompt()
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
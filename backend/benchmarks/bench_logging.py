@@ -0,0 +1,101 @@
+"""
+Per-record cost of logging on the calling thread.
+Compares the previous synchronous StreamHandler + json.dumps setup with the
+queued pipeline from app.utils.logger. Output goes to /dev/null so only the
+logging overhead is measured.
+
+Usage: python -m benchmarks.bench_logging [--quick] [--json PATH]
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from datetime import datetime
+from benchmarks.harness import parse_args, print_table, run_cases, timing_options, write_json
+from app.core.context import request_id_var
+from app.utils.logger import (
+    ContextFilter,
+    DedupFilter,
+    JSONFormatter,
+    NonBlockingQueueHandler,
+)
+
+
+class LegacyJSONFormatter(logging.Formatter):
+    """The formatter used before the queued pipeline."""
+
+    def format(self, record):
+        log_data = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if hasattr(record, "request_id"):
+            log_data["request_id"] = record.request_id
+        return json.dumps(log_data)
+
+
+def _logger(name, handler):
+    logger = logging.getLogger(f"bench.{name}")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def _drain(log_queue, stop):
+    """Consume records like QueueListener would, so the queue never fills."""
+    while not stop.is_set():
+        try:
+            log_queue.get(timeout=0.1)
+        except queue.Empty:
+            pass
+
+
+def main():
+    args = parse_args(__doc__)
+    devnull = open(os.devnull, "w")
+
+    sync_text = logging.StreamHandler(devnull)
+    sync_text.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    sync_json = logging.StreamHandler(devnull)
+    sync_json.setFormatter(LegacyJSONFormatter())
+    new_sync_json = logging.StreamHandler(devnull)
+    new_sync_json.setFormatter(JSONFormatter())
+
+    queued = NonBlockingQueueHandler(100_000)
+    queued.addFilter(ContextFilter())
+    queued.addFilter(DedupFilter(10.0))
+    stop = threading.Event()
+    consumer = threading.Thread(target=_drain, args=(queued.queue, stop), daemon=True)
+    consumer.start()
+
+    loggers = {
+        "NullHandler (floor)": _logger("null", logging.NullHandler()),
+        "sync text (before)": _logger("sync_text", sync_text),
+        "sync json.dumps (before)": _logger("sync_json", sync_json),
+        "sync orjson formatter": _logger("new_sync_json", new_sync_json),
+        "queued (after)": _logger("queued", queued),
+    }
+
+    request_id_var.set("0123456789abcdef0123456789abcdef")
+    message = "Calling LLM for user message: What services does BIGFAT AI Labs offer?..."
+    cases = [(name, lambda logger=logger: logger.info(message)) for name, logger in loggers.items()]
+    cases.append(("queued, repeated warning (deduped)", lambda: loggers["queued (after)"].warning("Redis unavailable")))
+
+    results = run_cases(cases, **timing_options(args))
+    stop.set()
+    consumer.join()
+
+    print_table("Logging cost per record on the calling thread", results, baseline="sync json.dumps (before)")
+    if queued.dropped:
+        print(f"(queue dropped {queued.dropped} records)")
+    write_json(args.json, "logging", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Validation and serialization throughput of the chat schemas at maximum size:
+a 2000-character message with 50 history messages, and a page of 50 stored
+conversations read back from MongoDB.
+
+The legacy models reproduce the previous schemas (role checked against a list
+and message/history checks in v1-style Python validators) so both versions
+run under the same pydantic install.
+
+Usage: python -m benchmarks.bench_schemas [--quick] [--json PATH]
+"""
+
+import warnings
+from datetime import datetime
+from typing import List, Optional
+import orjson
+from pydantic import BaseModel, Field
+from benchmarks.harness import parse_args, print_table, run_cases, timing_options, write_json
+from app.schemas.chatbot import (
+    MAX_HISTORY_MESSAGES,
+    MAX_MESSAGE_LENGTH,
+    ChatRequest,
+    chat_message_list_adapter,
+    conversation_document_list_adapter,
+)
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    from pydantic import validator
+
+    class LegacyChatMessage(BaseModel):
+        role: str
+        content: str
+        timestamp: Optional[datetime] = Field(default_factory=datetime.utcnow)
+
+        @validator("role")
+        def validate_role(cls, v):
+            allowed = ["user", "assistant", "system"]
+            if v not in allowed:
+                raise ValueError(f"Role must be one of {allowed}")
+            return v
+
+    class LegacyChatRequest(BaseModel):
+        message: str = Field(..., min_length=1, max_length=2000)
+        history: List[LegacyChatMessage] = Field(default=[])
+        user_id: Optional[str] = None
+        session_id: Optional[str] = None
+
+        @validator("message")
+        def validate_message(cls, v):
+            if not v.strip():
+                raise ValueError("Message cannot be empty")
+            return v.strip()
+
+        @validator("history")
+        def validate_history(cls, v):
+            if len(v) > 50:
+                raise ValueError("Conversation history too long (max 50 messages)")
+            return v
+
+    class LegacyConversationDocument(BaseModel):
+        conversation_id: str
+        session_id: Optional[str] = None
+        user_id: Optional[str] = None
+        messages: List[LegacyChatMessage]
+        created_at: datetime = Field(default_factory=datetime.utcnow)
+        updated_at: datetime = Field(default_factory=datetime.utcnow)
+        metadata: dict = Field(default={})
+
+
+def _history(count: int) -> List[dict]:
+    return [
+        {
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"Message {i} about AI consulting, agents and custom LLM platforms. " * 6,
+            "timestamp": "2026-01-09T14:00:00Z",
+        }
+        for i in range(count)
+    ]
+
+
+def _stored_documents(count: int) -> List[dict]:
+    """Conversation documents as motor returns them, two messages each."""
+    now = datetime(2026, 1, 9, 14, 0, 0)
+    return [
+        {
+            "_id": f"65a0c0ffee{i:014d}",
+            "conversation_id": f"conv_{i}",
+            "session_id": "session_abc",
+            "user_id": "user_123",
+            "messages": [
+                {"role": "user", "content": "What are your AI consulting services?", "timestamp": now},
+                {"role": "assistant", "content": "We offer AI consulting and custom agents. " * 10, "timestamp": now},
+            ],
+            "created_at": now,
+            "updated_at": now,
+            "metadata": {"model": "anthropic/claude-3-haiku", "tokens_used": 150},
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    args = parse_args(__doc__)
+    options = timing_options(args)
+
+    payload = {
+        "message": " " + "x" * (MAX_MESSAGE_LENGTH - 2) + " ",
+        "history": _history(MAX_HISTORY_MESSAGES),
+        "user_id": "user_123",
+        "session_id": "session_abc",
+    }
+    body = orjson.dumps(payload)
+    messages = ChatRequest.model_validate(payload).history
+    legacy_messages = LegacyChatRequest.model_validate(payload).history
+    documents = _stored_documents(50)
+
+    def legacy_documents():
+        result = []
+        for doc in documents:
+            doc = dict(doc)
+            doc.pop("_id", None)
+            result.append(LegacyConversationDocument(**doc))
+        return result
+
+    results = run_cases([
+        ("request validate (dict) legacy", lambda: LegacyChatRequest.model_validate(payload)),
+        ("request validate (dict) v2", lambda: ChatRequest.model_validate(payload)),
+        ("request validate (json) legacy", lambda: LegacyChatRequest.model_validate_json(body)),
+        ("request validate (json) v2", lambda: ChatRequest.model_validate_json(body)),
+        ("history dump per message", lambda: [msg.model_dump() for msg in legacy_messages]),
+        ("history dump adapter", lambda: chat_message_list_adapter.dump_python(messages)),
+        ("history dump json adapter", lambda: chat_message_list_adapter.dump_json(messages)),
+        ("50 documents per document", legacy_documents),
+        ("50 documents adapter", lambda: conversation_document_list_adapter.validate_python(documents)),
+    ], **options)
+
+    print_table("Schema validation and serialization (max-size request)", results,
+                baseline="request validate (dict) legacy")
+    write_json(args.json, "schemas", results)
+
+
+if __name__ == "__main__":
+    main()
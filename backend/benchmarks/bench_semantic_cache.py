@@ -0,0 +1,75 @@
+"""
+Semantic cache matching decisions and lookup cost.
+Each pair is a cached question and an incoming one: paraphrases must reuse the
+cached answer, while negated or narrower questions must not, however similar
+their embeddings are. Lookups are timed against a full cache.
+
+Exits 1 if any pair is decided wrongly at SEMANTIC_CACHE_THRESHOLD.
+
+Usage: python -m benchmarks.bench_semantic_cache [--quick] [--json PATH]
+"""
+
+import sys
+from benchmarks.harness import parse_args, print_table, run_cases, timing_options, write_json
+from app.core.config import settings
+from app.core.semantic_cache import SemanticCache
+
+VERSION = "bench"
+
+# (cached question, incoming question, should reuse the answer)
+PAIRS = [
+    ("What services do you offer?", "What services does BIGFAT provide?", True),
+    ("What AI services do you provide?", "Which AI solutions do you offer?", True),
+    ("How can I contact you?", "How do I reach you?", True),
+    ("How can I book a consultation?", "How do I schedule a meeting?", True),
+    ("What is your pricing?", "What are your prices?", True),
+    ("Do you offer custom LLM platforms?", "Do you not offer custom LLM platforms?", False),
+    ("What services do you offer?", "What services don't you offer?", False),
+    ("Can you build a custom LLM platform?", "Can you build a custom LLM platform on AWS?", False),
+    ("Do you build AI agents?", "Do you build AI agents for healthcare?", False),
+    ("What are your prices?", "How much does it cost?", False),
+]
+
+
+def check_pairs() -> int:
+    """Print each pair's decision; returns the number decided wrongly."""
+    wrong = 0
+    print(f"\nSemantic cache pairs (threshold {settings.SEMANTIC_CACHE_THRESHOLD})")
+    for cached, incoming, expected in PAIRS:
+        cache = SemanticCache(capacity=4, threshold=settings.SEMANTIC_CACHE_THRESHOLD, ttl_seconds=60)
+        cache.store(cached, VERSION, {"response": cached})
+        hit = cache.lookup(incoming, VERSION) is not None
+        similarity = float(cache.vectorizer.embed(cached) @ cache.vectorizer.embed(incoming))
+        status = "ok" if hit == expected else "WRONG"
+        wrong += hit != expected
+        print(f"  {status:5} {'hit' if hit else 'miss':4} {similarity:.3f}  {cached!r} -> {incoming!r}")
+    return wrong
+
+
+def main():
+    args = parse_args(__doc__)
+    options = timing_options(args)
+
+    wrong = check_pairs()
+
+    cache = SemanticCache(
+        capacity=settings.SEMANTIC_CACHE_SIZE,
+        threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+        ttl_seconds=3600
+    )
+    for i in range(settings.SEMANTIC_CACHE_SIZE):
+        cache.store(f"Question {i} about AI consulting, agents and custom LLM platforms", VERSION, {"response": str(i)})
+
+    results = run_cases([
+        ("lookup hit (full cache)", lambda: cache.lookup("Question 7 about AI consulting, agents and custom LLM platforms", VERSION)),
+        ("lookup miss (full cache)", lambda: cache.lookup("Do you offer data labelling?", VERSION)),
+        ("embed question", lambda: cache.vectorizer.embed("What AI services do you provide for startups?")),
+    ], **options)
+
+    print_table("Semantic cache", results)
+    write_json(args.json, "semantic_cache", results)
+    sys.exit(1 if wrong else 0)
+
+
+if __name__ == "__main__":
+    main()
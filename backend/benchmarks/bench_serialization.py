@@ -0,0 +1,64 @@
+"""
+Response and SSE serialization cost for typical payload sizes.
+Compares FastAPI's default path (jsonable_encoder + json.dumps) with the
+orjson fast path used by the endpoints, and f-string SSE frames with the
+pre-encoded templates in app.utils.sse.
+
+Usage: python -m benchmarks.bench_serialization [--quick] [--json PATH]
+"""
+
+import json
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from benchmarks.harness import parse_args, print_table, run_cases, timing_options, write_json
+from app.schemas.chatbot import ChatResponse
+from app.utils.sse import content_frame
+
+# Typical answer lengths: short greeting, normal answer, long answer
+RESPONSE_SIZES = {"short": 120, "medium": 1200, "long": 6000}
+# Typical streamed chunk lengths (provider deltas are a few tokens)
+CHUNK_SIZES = {"token": 4, "phrase": 40}
+
+SAMPLE = "BIGFAT AI Labs builds custom LLM solutions — \"agents\", RAG & automation.\n"
+
+
+def _text(length: int) -> str:
+    return (SAMPLE * (length // len(SAMPLE) + 1))[:length]
+
+
+def main():
+    args = parse_args(__doc__)
+    options = timing_options(args)
+    all_results = {}
+
+    for label, length in RESPONSE_SIZES.items():
+        response = ChatResponse(
+            response=_text(length),
+            conversation_id="3f0c2a64-4f5e-4f0e-9f57-1d2b3c4d5e6f",
+            session_id="session_abc",
+            tokens_used=length // 4,
+            model="anthropic/claude-3-haiku",
+        )
+        results = run_cases([
+            ("jsonable_encoder + JSONResponse", lambda r=response: JSONResponse(jsonable_encoder(r)).body),
+            ("jsonable_encoder + ORJSONResponse", lambda r=response: ORJSONResponse(jsonable_encoder(r)).body),
+            ("model_dump + ORJSONResponse", lambda r=response: ORJSONResponse(r.model_dump()).body),
+            ("model_dump_json", lambda r=response: r.model_dump_json()),
+        ], **options)
+        print_table(f"ChatResponse, {label} ({length} chars)", results, baseline="jsonable_encoder + JSONResponse")
+        all_results.update({f"chat_response/{label}/{name}": result for name, result in results.items()})
+
+    for label, length in CHUNK_SIZES.items():
+        chunk = _text(length)
+        results = run_cases([
+            ("f-string + json.dumps", lambda c=chunk: f"data: {json.dumps({'content': c, 'done': False})}\n\n".encode()),
+            ("sse.content_frame", lambda c=chunk: content_frame(c)),
+        ], **options)
+        print_table(f"SSE frame, {label} ({length} chars)", results, baseline="f-string + json.dumps")
+        all_results.update({f"sse_frame/{label}/{name}": result for name, result in results.items()})
+
+    write_json(args.json, "serialization", all_results)
+
+
+if __name__ == "__main__":
+    main()
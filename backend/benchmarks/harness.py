@@ -0,0 +1,215 @@
+"""
+Shared micro-benchmark harness.
+Calibrates the loop count to a minimum run time, keeps the best of several
+repeats and prints a comparison table. Suites can store a baseline and fail
+on regressions; each case is timed alternately with a fixed reference
+workload and compared by that ratio, so a baseline recorded on one machine
+still gates runs on another.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+Case = Tuple[str, Callable[[], object]]
+
+
+def _calibrate(func: Callable[[], object], min_time: float) -> int:
+    """Loop count for which one run of func takes about min_time seconds."""
+    loops = 1
+    while True:
+        elapsed = _run(func, loops)
+        if elapsed >= min_time / 10 or loops >= 10_000_000:
+            break
+        loops *= 10
+    return max(1, int(loops * (min_time / max(elapsed, 1e-9))))
+
+
+def _run(func: Callable[[], object], loops: int) -> float:
+    """Seconds taken by loops calls of func."""
+    start = time.perf_counter()
+    for _ in range(loops):
+        func()
+    return time.perf_counter() - start
+
+
+def measure(func: Callable[[], object], repeat: int = 5, min_time: float = 0.2) -> Dict[str, float]:
+    """
+    Time a zero-argument callable.
+
+    Args:
+        func: Callable to time
+        repeat: Number of timed runs
+        min_time: Minimum duration of one run in seconds, used to size the loop
+
+    Returns:
+        Dict with ns_per_op (best run), median_ns and loops
+    """
+    loops = _calibrate(func, min_time)
+    runs = [_run(func, loops) / loops * 1e9 for _ in range(repeat)]
+    return {"ns_per_op": min(runs), "median_ns": statistics.median(runs), "loops": loops}
+
+
+def run_cases(cases: Sequence[Case], repeat: int = 5, min_time: float = 0.2) -> Dict[str, Dict[str, float]]:
+    """Measure each named case in order."""
+    return {name: measure(func, repeat=repeat, min_time=min_time) for name, func in cases}
+
+
+def print_table(title: str, results: Dict[str, Dict[str, float]], baseline: Optional[str] = None) -> None:
+    """Print results, with speed-up relative to the baseline case if given."""
+    print(f"\n{title}")
+    print(f"{'case':<40} {'ns/op':>12} {'median':>12} {'vs base':>9}")
+    base = results.get(baseline, {}).get("ns_per_op") if baseline else None
+    for name, result in results.items():
+        ratio = f"{base / result['ns_per_op']:.2f}x" if base else ""
+        print(f"{name:<40} {result['ns_per_op']:>12.0f} {result['median_ns']:>12.0f} {ratio:>9}")
+
+
+def parse_args(description: str, baseline: bool = False) -> argparse.Namespace:
+    """
+    Common command line options for benchmark scripts.
+
+    Args:
+        description: Help text
+        baseline: Also accept --save-baseline, --check, --tolerance and --baseline
+    """
+    parser = argparse.ArgumentParser(description=description, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="Fewer, shorter runs")
+    parser.add_argument("--json", metavar="PATH", help="Write results as JSON")
+    if baseline:
+        parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+        parser.add_argument("--check", action="store_true", help="Compare with the baseline; exit 1 on regressions")
+        parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown relative to the baseline, on top of each case's measured noise")
+        parser.add_argument("--baseline", metavar="PATH", help="Baseline file (default: benchmarks/baselines/<suite>.json)")
+    return parser.parse_args()
+
+
+def timing_options(args: argparse.Namespace) -> Dict[str, float]:
+    """Repeat and min_time for the selected mode."""
+    return {"repeat": 3, "min_time": 0.05} if args.quick else {"repeat": 5, "min_time": 0.2}
+
+
+def write_json(path: Optional[str], suite: str, results: Dict[str, Dict[str, float]]) -> None:
+    """Write results to a JSON file if a path was given."""
+    if not path:
+        return
+    with open(path, "w") as f:
+        json.dump({"suite": suite, "results": results}, f, indent=2)
+
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+# Measurements per case when saving a baseline, used to estimate its noise
+BASELINE_ATTEMPTS = 5
+# Extra measurements before a case over its limit is reported
+RECHECK_ATTEMPTS = 2
+
+_REFERENCE_DATA = bytes(range(256)) * 16
+
+
+def _reference_workload() -> None:
+    """Fixed mix of interpreter work and hashing used to normalize timings."""
+    total = 0
+    for i in range(200):
+        total += i * i
+    hashlib.sha256(_REFERENCE_DATA).digest()
+    json.dumps({"values": list(range(50))})
+
+
+def measure_relative(func: Callable[[], object], repeat: int = 9, min_time: float = 0.1) -> Dict[str, float]:
+    """
+    Time a callable relative to the reference workload.
+    Each repeat runs the reference and then the case, so both see the same
+    machine state. The best run of each is kept, since interference from
+    other processes only ever adds time.
+
+    Returns:
+        Dict with relative (best case time / best reference time) and ns_per_op
+    """
+    loops = _calibrate(func, min_time)
+    reference_loops = _calibrate(_reference_workload, min_time)
+    reference = case = float("inf")
+    for _ in range(repeat):
+        reference = min(reference, _run(_reference_workload, reference_loops) / reference_loops)
+        case = min(case, _run(func, loops) / loops)
+    return {"relative": case / reference, "ns_per_op": case * 1e9}
+
+
+def check_baseline(
+    args: argparse.Namespace,
+    suite: str,
+    cases: Sequence[Case],
+    noise: Optional[Dict[str, float]] = None
+) -> int:
+    """
+    Save or check a suite baseline according to --save-baseline and --check.
+    Cases are re-measured interleaved with the reference workload; baselines
+    store each case's time relative to it, so they stay valid on other machines.
+
+    Saving measures every case BASELINE_ATTEMPTS times and records the spread
+    as that case's noise floor, added to the tolerance. A case over its
+    threshold is re-measured up to RECHECK_ATTEMPTS more times and only
+    reported if its best result still is.
+
+    Args:
+        args: Options from parse_args(..., baseline=True)
+        suite: Suite name, used for the default baseline path
+        cases: Named cases, as passed to run_cases
+        noise: Minimum noise floor per case name, for cases whose speed shifts
+            between processes, which re-measuring in the same process cannot see
+
+    Returns:
+        int: Process exit code (1 if --check found regressions)
+    """
+    if not (args.save_baseline or args.check):
+        return 0
+    path = args.baseline or os.path.join(BASELINE_DIR, f"{suite}.json")
+    options = {"repeat": 5, "min_time": 0.05} if args.quick else {"repeat": 9, "min_time": 0.1}
+
+    if args.save_baseline:
+        results = {}
+        for name, func in cases:
+            relative = sorted(measure_relative(func, **options)["relative"] for _ in range(BASELINE_ATTEMPTS))
+            median = statistics.median(relative)
+            # The slowest attempt is left out of the spread: interference only ever adds time
+            results[name] = {"relative": median, "spread": (relative[-2] - relative[0]) / median}
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"suite": suite, "results": results}, f, indent=2)
+        print(f"\nBaseline saved to {path}")
+        return 0
+
+    if not os.path.exists(path):
+        print(f"\nNo baseline at {path}; run with --save-baseline first")
+        return 1
+    with open(path) as f:
+        base = json.load(f)["results"]
+
+    print("\nAgainst baseline (time relative to the reference workload)")
+    print(f"{'case':<40} {'base':>10} {'now':>10} {'change':>9} {'limit':>8}")
+    regressions = []
+    for name, func in cases:
+        relative = measure_relative(func, **options)["relative"]
+        if name not in base:
+            print(f"{name:<40} {'-':>10} {relative:>10.3f} {'new':>9}")
+            continue
+        limit = args.tolerance + max(base[name].get("spread", 0.0), (noise or {}).get(name, 0.0))
+        for _ in range(RECHECK_ATTEMPTS):
+            if relative / base[name]["relative"] - 1 <= limit:
+                break
+            relative = min(relative, measure_relative(func, **options)["relative"])
+        change = relative / base[name]["relative"] - 1
+        flag = ""
+        if change > limit:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<40} {base[name]['relative']:>10.3f} {relative:>10.3f} {change:>+8.1%} {limit:>+7.0%}{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond their limit: {', '.join(regressions)}")
+        return 1
+    print("\nNo regressions beyond the limits")
+    return 0
@@ -0,0 +1,625 @@
+"""
+End-to-end load test.
+Boots the app (uvicorn subprocess) against the local OpenRouter stand-in and
+drives /chat, /stream and /history at a fixed open-loop arrival rate: requests
+are issued on schedule whether or not earlier ones have finished, so a slow
+server shows up as latency instead of a lower request rate. Latency is
+measured from each request's scheduled start, which keeps client-side delays
+in the numbers rather than hiding them (coordinated omission).
+
+MongoDB: none (degraded mode, /history is empty), --mongomock (in-memory,
+pip install -r requirements-bench.txt) or --mongodb-uri for a local server. Redis is used only
+with --redis HOST:PORT, which also enables the response cache.
+
+--faults adds latency, errors, timeouts or outages to the app's MongoDB,
+Redis and OpenRouter calls (rules as in FAULT_INJECTION_RULES, see
+app.core.faults) to measure degraded-mode latency and throughput.
+
+Usage:
+    python -m benchmarks.loadtest run [--rate 20] [--duration 60] [--json PATH]
+        [--mix chat=0.3,stream=0.6,history=0.1] [--deep-ratio 0.3] [--repeat-ratio 0.2]
+        [--mongomock | --mongodb-uri URI] [--redis HOST:PORT] [--target URL]
+        [--faults JSON|PATH] [--fault-seed N]
+        [mock OpenRouter options, see benchmarks.mock_openrouter]
+    python -m benchmarks.loadtest compare BASE.json NEW.json [--threshold 0.1] [--min-delta-ms 5]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import random
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import aiohttp
+from benchmarks.mock_openrouter import add_config_arguments
+from app.core.faults import FaultInjector
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API = "/api/v1/chatbot"
+
+# Repeat questions: a small fixed set, so caches and the answer bank can hit
+QUESTIONS = [
+    "What services does BIGFAT AI Labs provide?",
+    "Do you build custom AI agents?",
+    "How long does a typical AI consulting engagement take?",
+    "Can you help us deploy an enterprise LLM platform?",
+    "What industries do you work with?",
+    "How do I get in touch with your team?",
+    "Do you offer retrieval-augmented generation solutions?",
+    "What does an AI automation project cost?",
+]
+PERCENTILES = (50, 95, 99)
+
+
+class RequestRecord:
+    """Outcome of one request."""
+
+    __slots__ = ("kind", "status", "latency", "ttft", "error")
+
+    def __init__(self, kind: str, status: int, latency: float, ttft: Optional[float] = None, error: Optional[str] = None):
+        self.kind = kind
+        self.status = status
+        self.latency = latency
+        self.ttft = ttft
+        self.error = error
+
+
+class Workload:
+    """Generates requests for the configured endpoint mix and session shapes."""
+
+    def __init__(self, mix: Dict[str, float], deep_ratio: float, history_length: int, repeat_ratio: float, rng: random.Random):
+        self.kinds = list(mix)
+        self.weights = [mix[kind] for kind in self.kinds]
+        self.deep_ratio = deep_ratio
+        self.history_length = history_length
+        self.repeat_ratio = repeat_ratio
+        self.rng = rng
+        # Sessions that have at least one saved turn, for /history
+        self.sessions: Deque[str] = deque(maxlen=1000)
+
+    def next_kind(self) -> str:
+        return self.rng.choices(self.kinds, self.weights)[0]
+
+    def chat_body(self) -> Dict[str, Any]:
+        """A first-turn or deep-session chat request."""
+        if self.rng.random() < self.repeat_ratio:
+            message = self.rng.choice(QUESTIONS)
+        else:
+            message = f"{self.rng.choice(QUESTIONS)} Context ref {uuid.uuid4().hex[:12]}."
+        history = []
+        if self.rng.random() < self.deep_ratio:
+            for i in range(self.history_length):
+                role = "user" if i % 2 == 0 else "assistant"
+                history.append({"role": role, "content": f"Earlier {role} turn {i} about AI agents and consulting. " * 4})
+        session_id = f"load-{uuid.uuid4().hex[:16]}"
+        return {"message": message, "history": history, "user_id": session_id, "session_id": session_id}
+
+    def history_session(self) -> str:
+        return self.rng.choice(self.sessions) if self.sessions else f"load-{uuid.uuid4().hex[:16]}"
+
+
+async def _chat(session: aiohttp.ClientSession, base: str, workload: Workload, scheduled: float) -> RequestRecord:
+    body = workload.chat_body()
+    async with session.post(f"{base}{API}/chat", json=body) as response:
+        await response.read()
+        latency = time.perf_counter() - scheduled
+        if response.status == 200:
+            workload.sessions.append(body["session_id"])
+        return RequestRecord("chat", response.status, latency)
+
+
+async def _stream(session: aiohttp.ClientSession, base: str, workload: Workload, scheduled: float) -> RequestRecord:
+    body = workload.chat_body()
+    ttft = None
+    error = None
+    async with session.post(f"{base}{API}/stream", json=body) as response:
+        if response.status != 200:
+            await response.read()
+            return RequestRecord("stream", response.status, time.perf_counter() - scheduled)
+        async for line in response.content:
+            if not line.startswith(b"data: "):
+                continue
+            if ttft is None and line.startswith(b'data: {"content":"') and not line.startswith(b'data: {"content":""'):
+                ttft = time.perf_counter() - scheduled
+            if b'"error":' in line:
+                error = line[6:].decode(errors="replace").strip()
+            if b'"done":true' in line:
+                break
+        latency = time.perf_counter() - scheduled
+    if error is None:
+        workload.sessions.append(body["session_id"])
+    return RequestRecord("stream", 200, latency, ttft=ttft, error=error)
+
+
+async def _history(session: aiohttp.ClientSession, base: str, workload: Workload, scheduled: float) -> RequestRecord:
+    async with session.get(f"{base}{API}/history/{workload.history_session()}") as response:
+        await response.read()
+        return RequestRecord("history", response.status, time.perf_counter() - scheduled)
+
+
+ISSUERS = {"chat": _chat, "stream": _stream, "history": _history}
+
+
+async def drive(
+    base: str,
+    workload: Workload,
+    rate: float,
+    duration: float,
+    arrivals: str,
+    max_inflight: int,
+    request_timeout: float,
+) -> Tuple[List[RequestRecord], int, float]:
+    """
+    Issue requests on an open-loop schedule for a fixed duration.
+
+    Args:
+        base: Server base URL
+        workload: Request generator
+        rate: Mean arrivals per second
+        duration: Seconds to issue requests for
+        arrivals: "poisson" (exponential gaps) or "constant"
+        max_inflight: Arrivals beyond this many open requests are dropped and counted
+        request_timeout: Per-request timeout in seconds
+
+    Returns:
+        Tuple of records, dropped arrivals and elapsed seconds (including the tail)
+    """
+    records: List[RequestRecord] = []
+    tasks = set()
+    dropped = 0
+
+    async def issue(kind: str, scheduled: float) -> None:
+        try:
+            records.append(await ISSUERS[kind](session, base, workload, scheduled))
+        except asyncio.TimeoutError:
+            records.append(RequestRecord(kind, 0, time.perf_counter() - scheduled, error="timeout"))
+        except aiohttp.ClientError as e:
+            records.append(RequestRecord(kind, 0, time.perf_counter() - scheduled, error=type(e).__name__))
+
+    connector = aiohttp.TCPConnector(limit=max_inflight)
+    timeout = aiohttp.ClientTimeout(total=request_timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        start = time.perf_counter()
+        next_at = start
+        while True:
+            next_at += workload.rng.expovariate(rate) if arrivals == "poisson" else 1.0 / rate
+            if next_at - start >= duration:
+                break
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(tasks) >= max_inflight:
+                dropped += 1
+                continue
+            task = asyncio.create_task(issue(workload.next_kind(), next_at))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.wait(tasks)
+        elapsed = time.perf_counter() - start
+
+    return records, dropped, elapsed
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Linear-interpolated percentile of sorted values."""
+    if not values:
+        return None
+    position = (len(values) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def _distribution_ms(values: List[float]) -> Dict[str, Optional[float]]:
+    values = sorted(values)
+    result = {f"p{q}": percentile(values, q) for q in PERCENTILES}
+    result["mean"] = sum(values) / len(values) if values else None
+    result["max"] = values[-1] if values else None
+    return {key: round(value * 1000, 1) if value is not None else None for key, value in result.items()}
+
+
+def summarize(records: List[RequestRecord], dropped: int, elapsed: float, offered: int) -> Dict[str, Any]:
+    """Throughput, error rate and latency percentiles per endpoint and overall."""
+    endpoints = {}
+    for kind in sorted({record.kind for record in records}):
+        subset = [record for record in records if record.kind == kind]
+        ok = [record for record in subset if record.status == 200 and record.error is None]
+        entry = {
+            "count": len(subset),
+            "errors": len(subset) - len(ok),
+            "error_rate": round((len(subset) - len(ok)) / len(subset), 4),
+            "status": dict(Counter(str(record.status) for record in subset)),
+            "throughput_rps": round(len(ok) / elapsed, 2),
+            "latency_ms": _distribution_ms([record.latency for record in ok]),
+        }
+        errors = Counter(record.error for record in subset if record.error)
+        if errors:
+            entry["error_kinds"] = dict(errors.most_common(10))
+        ttfts = [record.ttft for record in ok if record.ttft is not None]
+        if ttfts:
+            entry["ttft_ms"] = _distribution_ms(ttfts)
+        endpoints[kind] = entry
+
+    ok_total = sum(entry["count"] - entry["errors"] for entry in endpoints.values())
+    return {
+        "overall": {
+            "offered": offered,
+            "issued": len(records),
+            "dropped": dropped,
+            "elapsed_seconds": round(elapsed, 2),
+            "throughput_rps": round(ok_total / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(1 - ok_total / len(records), 4) if records else 0.0,
+            "latency_ms": _distribution_ms([r.latency for r in records if r.status == 200 and r.error is None]),
+        },
+        "endpoints": endpoints,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _mock_command(args: argparse.Namespace, port: int) -> List[str]:
+    command = [sys.executable, "-m", "benchmarks.mock_openrouter", "--port", str(port)]
+    for option in ("ttft", "itl", "tokens", "chunk_tokens", "error_429", "error_5xx", "stall", "stall_seconds", "retry_after", "seed"):
+        value = getattr(args, option)
+        if value is not None:
+            command += [f"--{option.replace('_', '-')}", str(value)]
+    return command
+
+
+def _app_environment(args: argparse.Namespace, llm_url: str) -> Dict[str, str]:
+    """Settings for the app under test; environment variables take precedence over .env."""
+    env = dict(os.environ)
+    env.update({
+        "OPENROUTER_API_URL": llm_url,
+        "ENVIRONMENT": "production",
+        "LOG_LEVEL": "WARNING",
+        "RATE_LIMIT_ENABLED": "false",
+        "MONGODB_URI": "",
+        "REDIS_ENABLED": "false",
+        "CACHE_ENABLED": "false",
+        "GRACEFUL_SHUTDOWN_SECONDS": "5",
+        "DRAIN_TIMEOUT_SECONDS": "5",
+    })
+    if not args.llm_url:
+        # The stand-in accepts any key; a real --llm-url keeps the key from the environment or .env
+        env["OPENROUTER_API_KEY"] = "loadtest"
+    if args.mongomock:
+        env.update({"MONGODB_URI": "mongodb://mongomock", "LOADTEST_MONGOMOCK": "1"})
+    elif args.mongodb_uri:
+        env.update({"MONGODB_URI": args.mongodb_uri, "MONGODB_TLS": "true" if args.mongodb_tls else "false"})
+    if args.redis:
+        host, _, port = args.redis.partition(":")
+        env.update({"REDIS_ENABLED": "true", "CACHE_ENABLED": "true", "REDIS_HOST": host, "REDIS_PORT": port or "6379"})
+    if args.faults:
+        # Fault injection is refused in production; staging differs only in that
+        env.update({
+            "ENVIRONMENT": "staging",
+            "FAULT_INJECTION_ENABLED": "true",
+            "FAULT_INJECTION_RULES": json.dumps(args.faults),
+            "ADMIN_API_KEY": args.admin_key,
+        })
+        if args.fault_seed is not None:
+            env["FAULT_INJECTION_SEED"] = str(args.fault_seed)
+    return env
+
+
+def _load_faults(spec: str) -> Dict[str, Dict[str, Any]]:
+    """Fault rules from inline JSON or a JSON file, validated before the app boots."""
+    if os.path.exists(spec):
+        with open(spec) as f:
+            spec = f.read()
+    try:
+        rules = json.loads(spec)
+        FaultInjector().configure(rules)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"Invalid --faults: {e}")
+    return rules
+
+
+async def _faults(base: str, key: str, method: str = "GET", body: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Read or replace the fault rules of the worker that answers."""
+    try:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
+            async with session.request(
+                method, f"{base}/api/v1/admin/faults", json=body, headers={"X-API-Key": key}
+            ) as response:
+                return await response.json() if response.status == 200 else None
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        return None
+
+
+async def _wait_until(
+    url: str, process: subprocess.Popen, timeout: float, log_path: str, method: str = "GET"
+) -> None:
+    """Poll a URL until it answers 200."""
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=2)) as session:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(
+                    f"{' '.join(process.args[:4])} exited with code {process.returncode}{_log_tail(log_path)}"
+                )
+            try:
+                async with session.request(method, url) as response:
+                    if response.status == 200:
+                        return
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout:.0f}s")
+
+
+def _log_tail(log_path: str, lines: int = 15) -> str:
+    """Last lines of the shared subprocess log, for boot failures."""
+    with open(log_path, errors="replace") as f:
+        tail = f.readlines()[-lines:]
+    return f"; last lines of {log_path}:\n" + "".join(tail)
+
+
+def _stop(process: Optional[subprocess.Popen]) -> None:
+    if process is None or process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def _mock_stats(llm_url: str) -> Optional[Dict[str, Any]]:
+    try:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
+            async with session.get(llm_url.rsplit("/chat/completions", 1)[0] + "/__mock/stats") as response:
+                return (await response.json())["stats"] if response.status == 200 else None
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        return None
+
+
+def _parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        if kind not in ISSUERS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{kind}' in mix, expected {sorted(ISSUERS)}")
+        mix[kind] = float(weight)
+    return mix
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Boot the stack unless --target is given, warm up, measure and summarize."""
+    log = tempfile.NamedTemporaryFile(prefix="loadtest-", suffix=".log", delete=False)
+    mock = app = None
+    llm_url = args.llm_url
+    base = args.target
+    try:
+        if not llm_url and not base:
+            port = _free_port()
+            mock = subprocess.Popen(_mock_command(args, port), cwd=BACKEND_DIR, stdout=log, stderr=log)
+            llm_url = f"http://127.0.0.1:{port}/chat/completions"
+            await _wait_until(llm_url, mock, 30, log.name, method="HEAD")
+        if not base:
+            port = _free_port()
+            app = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "benchmarks.loadtest_app:app", "--host", "127.0.0.1",
+                 "--port", str(port), "--workers", str(args.workers), "--no-access-log", "--log-level", "warning"],
+                cwd=BACKEND_DIR, stdout=log, stderr=log, env=_app_environment(args, llm_url),
+            )
+            base = f"http://127.0.0.1:{port}"
+            await _wait_until(f"{base}/readyz", app, args.boot_timeout, log.name)
+
+        print(f"Target {base}, LLM {llm_url or 'as configured on target'}, logs in {log.name}")
+        workload = Workload(_parse_mix(args.mix), args.deep_ratio, args.history_length, args.repeat_ratio, random.Random(args.seed))
+        options = dict(arrivals=args.arrivals, max_inflight=args.max_inflight, request_timeout=args.request_timeout)
+
+        if args.warmup > 0:
+            print(f"Warm-up: {args.warmup:.0f}s at {args.rate:g} req/s")
+            await drive(base, workload, args.rate, args.warmup, **options)
+        if args.faults and app:
+            # Restart fault counts and flapping phases for the measured window
+            await _faults(base, args.admin_key, "PUT", {"rules": args.faults, "seed": args.fault_seed})
+
+        print(f"Measuring: {args.duration:.0f}s at {args.rate:g} req/s ({args.arrivals})")
+        records, dropped, elapsed = await drive(base, workload, args.rate, args.duration, **options)
+        result = summarize(records, dropped, elapsed, len(records) + dropped)
+        result["meta"] = {
+            "revision": _git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "rate": args.rate,
+            "duration": args.duration,
+            "arrivals": args.arrivals,
+            "mix": _parse_mix(args.mix),
+            "deep_ratio": args.deep_ratio,
+            "history_length": args.history_length,
+            "repeat_ratio": args.repeat_ratio,
+            "workers": args.workers,
+            "mongodb": "mongomock" if args.mongomock else ("local" if args.mongodb_uri else "none"),
+            "redis": bool(args.redis),
+            "faults": args.faults,
+        }
+        if args.faults and app:
+            state = await _faults(base, args.admin_key)
+            result["faults"] = state["injected"] if state else None
+        if llm_url:
+            result["mock"] = await _mock_stats(llm_url)
+        return result
+    finally:
+        _stop(app)
+        _stop(mock)
+        log.close()
+
+
+def print_summary(result: Dict[str, Any]) -> None:
+    overall = result["overall"]
+    print(
+        f"\n{overall['issued']} requests in {overall['elapsed_seconds']}s, {overall['dropped']} dropped; "
+        f"{overall['throughput_rps']} ok/s, error rate {overall['error_rate']:.2%}"
+    )
+    print(f"{'endpoint':<10} {'count':>7} {'err%':>7} {'ok/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ttft p50':>9} {'ttft p95':>9} {'ttft p99':>9}")
+
+    def fmt(value: Optional[float]) -> str:
+        return f"{value:.1f}" if value is not None else "-"
+
+    for kind, entry in result["endpoints"].items():
+        latency = entry["latency_ms"]
+        ttft = entry.get("ttft_ms", {})
+        print(
+            f"{kind:<10} {entry['count']:>7} {entry['error_rate']:>7.2%} {entry['throughput_rps']:>8.2f} "
+            f"{fmt(latency['p50']):>9} {fmt(latency['p95']):>9} {fmt(latency['p99']):>9} "
+            f"{fmt(ttft.get('p50')):>9} {fmt(ttft.get('p95')):>9} {fmt(ttft.get('p99')):>9}"
+        )
+    if result.get("faults"):
+        injected = ", ".join(
+            f"{operation} {fault}={count}"
+            for operation, faults in result["faults"].items()
+            for fault, count in faults.items()
+        )
+        print(f"\nInjected faults (one worker): {injected}")
+
+
+def compare(
+    base: Dict[str, Any], new: Dict[str, Any], threshold: float, min_delta_ms: float, max_error_increase: float
+) -> List[str]:
+    """
+    Compare two load test results.
+    Latency and TTFT regress when they grow by more than the threshold and by
+    more than min_delta_ms; throughput is compared overall, since per-endpoint
+    shares vary with the random mix.
+
+    Args:
+        base: Baseline result
+        new: Result to check
+        threshold: Allowed relative latency increase or throughput decrease (0.1 = 10%)
+        min_delta_ms: Latency changes smaller than this are treated as noise
+        max_error_increase: Allowed absolute error rate increase
+
+    Returns:
+        List of regression descriptions (empty if none)
+    """
+    regressions = []
+    print(f"{'endpoint':<10} {'metric':<18} {'base':>10} {'new':>10} {'change':>9}")
+
+    def check(scope: str, metric: str, old: Optional[float], current: Optional[float], higher_is_worse: bool) -> None:
+        if not old or current is None:
+            return
+        change = (current - old) / old
+        worse = change > threshold and current - old > min_delta_ms if higher_is_worse else -change > threshold
+        flag = "  REGRESSION" if worse else ""
+        if worse:
+            regressions.append(f"{scope} {metric}: {old} -> {current} ({change:+.1%})")
+        print(f"{scope:<10} {metric:<18} {old:>10.1f} {current:>10.1f} {change:>+8.1%}{flag}")
+
+    def check_errors(scope: str, old: float, current: float) -> None:
+        worse = current - old > max_error_increase
+        if worse:
+            regressions.append(f"{scope} error_rate: {old:.2%} -> {current:.2%}")
+        flag = "  REGRESSION" if worse else ""
+        print(f"{scope:<10} {'error_rate':<18} {old:>10.2%} {current:>10.2%} {current - old:>+8.2%}{flag}")
+
+    for kind, new_entry in new["endpoints"].items():
+        base_entry = base["endpoints"].get(kind)
+        if base_entry is None:
+            continue
+        for group, label in (("latency_ms", "latency"), ("ttft_ms", "ttft")):
+            if group in base_entry and group in new_entry:
+                for p in ("p50", "p95", "p99"):
+                    check(kind, f"{label} {p}", base_entry[group].get(p), new_entry[group].get(p), True)
+        check_errors(kind, base_entry["error_rate"], new_entry["error_rate"])
+
+    check("overall", "throughput_rps", base["overall"]["throughput_rps"], new["overall"]["throughput_rps"], False)
+    check_errors("overall", base["overall"]["error_rate"], new["overall"]["error_rate"])
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end load test")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Boot the stack and run a load test")
+    run_parser.add_argument("--rate", type=float, default=20.0, help="Mean arrivals per second")
+    run_parser.add_argument("--duration", type=float, default=60.0, help="Measured seconds")
+    run_parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds before measuring")
+    run_parser.add_argument("--arrivals", choices=("poisson", "constant"), default="poisson")
+    run_parser.add_argument("--mix", default="chat=0.3,stream=0.6,history=0.1", help="Endpoint weights")
+    run_parser.add_argument("--deep-ratio", type=float, default=0.3, help="Fraction of chats sent with a long history")
+    run_parser.add_argument("--history-length", type=int, default=20, help="History messages in deep sessions (max 50)")
+    run_parser.add_argument("--repeat-ratio", type=float, default=0.2, help="Fraction of chats asking a repeated question")
+    run_parser.add_argument("--max-inflight", type=int, default=1000, help="Open requests before arrivals are dropped")
+    run_parser.add_argument("--request-timeout", type=float, default=120.0)
+    run_parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the app under test")
+    run_parser.add_argument("--boot-timeout", type=float, default=90.0, help="Seconds to wait for /readyz")
+    run_parser.add_argument("--target", help="Load an already running server instead of booting one")
+    run_parser.add_argument("--llm-url", help="Use this OPENROUTER_API_URL instead of starting the stand-in")
+    mongo = run_parser.add_mutually_exclusive_group()
+    mongo.add_argument("--mongomock", action="store_true", help="In-memory MongoDB (requires mongomock_motor)")
+    mongo.add_argument("--mongodb-uri", help="Local MongoDB, e.g. mongodb://localhost:27017")
+    run_parser.add_argument("--mongodb-tls", action="store_true", help="Connect to --mongodb-uri with TLS")
+    run_parser.add_argument("--redis", metavar="HOST:PORT", help="Enable Redis and the response cache")
+    run_parser.add_argument("--faults", type=_load_faults, metavar="JSON|PATH",
+                            help='Fault injection rules, e.g. \'{"mongo": {"latency": "const:2"}}\'')
+    run_parser.add_argument("--fault-seed", type=int, help="Seed for reproducible fault sequences")
+    run_parser.add_argument("--json", metavar="PATH", help="Write results as JSON")
+    add_config_arguments(run_parser)
+
+    compare_parser = commands.add_parser("compare", help="Compare two results and fail on regressions")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative latency/throughput change")
+    compare_parser.add_argument("--min-delta-ms", type=float, default=5.0, help="Ignore latency changes smaller than this")
+    compare_parser.add_argument("--max-error-increase", type=float, default=0.01, help="Allowed absolute error rate increase")
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.base) as f:
+            base = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        regressions = compare(base, new, args.threshold, args.min_delta_ms, args.max_error_increase)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond threshold:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nNo regressions beyond threshold")
+        return
+
+    if args.mongomock:
+        if importlib.util.find_spec("mongomock_motor") is None:
+            parser.error("--mongomock needs mongomock_motor: pip install -r requirements-bench.txt")
+        if args.workers != 1:
+            parser.error("--mongomock keeps data per worker; use --workers 1")
+
+    args.admin_key = secrets.token_hex(16)
+    result = asyncio.run(run(args))
+    print_summary(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+ASGI entry point used by the load test.
+Serves the unchanged application. With LOADTEST_MONGOMOCK=1 the MongoDB
+client is swapped for an in-memory mongomock_motor client before the app is
+imported, so conversation saves and /history work without a MongoDB server.
+Run with a single worker in that mode; each worker would get its own store.
+"""
+
+import os
+
+if os.environ.get("LOADTEST_MONGOMOCK") == "1":
+    from mongomock_motor import AsyncMongoMockClient
+    import app.core.database as database
+
+    # Pool, timeout and TLS options do not apply to the in-memory client
+    database.AsyncIOMotorClient = lambda *args, **kwargs: AsyncMongoMockClient()
+
+from main import app  # noqa: E402,F401
@@ -0,0 +1,355 @@
+"""
+Local OpenRouter stand-in for load tests and integration tests.
+Serves POST /chat/completions in the JSON and SSE streaming formats that
+LLMService parses, with configurable time to first token, inter-token delay,
+response length, usage reporting and injected failures (429 with Retry-After,
+5xx, stalled responses). Point the backend at it with
+
+    OPENROUTER_API_URL=http://127.0.0.1:8089/chat/completions
+
+Latency options take a distribution spec:
+    const:S              always S seconds
+    uniform:A,B          uniform between A and B
+    normal:MEAN,SD       normal, clipped at 0
+    lognormal:MEDIAN,SIGMA
+    exp:MEAN             exponential
+
+Runtime control (no restart needed between benchmark phases):
+    GET  /__mock/stats   request and outcome counters
+    POST /__mock/config  JSON body with any MockConfig field to change
+    POST /__mock/reset   zero the counters
+
+Usage: python -m benchmarks.mock_openrouter [--port 8089] [--ttft lognormal:0.4,0.3]
+       [--itl const:0.02] [--tokens 40:200] [--error-429 0.02] [--error-5xx 0.01]
+       [--stall 0.005] [--seed 1]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+import orjson
+from aiohttp import web
+from app.core.faults import Distribution
+
+WORDS = (
+    "BIGFAT AI Labs builds custom AI agents, retrieval pipelines and enterprise LLM platforms "
+    "for teams that want automation they can trust in production. We scope, prototype and ship "
+    "consulting engagements in weeks, then help your engineers run and extend the system."
+).split()
+
+
+class MockConfig:
+    """Behaviour of the stand-in; every field can be changed at runtime."""
+
+    def __init__(
+        self,
+        ttft: str = "lognormal:0.4,0.3",
+        itl: str = "const:0.02",
+        tokens: str = "40:200",
+        chunk_tokens: int = 1,
+        error_429: float = 0.0,
+        error_5xx: float = 0.0,
+        stall: float = 0.0,
+        stall_seconds: float = 60.0,
+        retry_after: int = 1,
+        seed: Optional[int] = None,
+    ):
+        self.ttft = Distribution(ttft)
+        self.itl = Distribution(itl)
+        low, _, high = tokens.partition(":")
+        self.min_tokens = int(low)
+        self.max_tokens = int(high or low)
+        self.chunk_tokens = max(1, chunk_tokens)
+        self.error_429 = error_429
+        self.error_5xx = error_5xx
+        self.stall = stall
+        self.stall_seconds = stall_seconds
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+
+    def update(self, changes: Dict[str, Any]) -> None:
+        """Apply a partial config, e.g. {"error_429": 0.2} between benchmark phases."""
+        for key, value in changes.items():
+            if key in ("ttft", "itl"):
+                setattr(self, key, Distribution(value))
+            elif key == "tokens":
+                low, _, high = str(value).partition(":")
+                self.min_tokens, self.max_tokens = int(low), int(high or low)
+            elif key == "seed":
+                self.rng = random.Random(value)
+            elif key in ("chunk_tokens", "error_429", "error_5xx", "stall", "stall_seconds", "retry_after"):
+                setattr(self, key, type(getattr(self, key))(value))
+            else:
+                raise ValueError(f"Unknown config field '{key}'")
+
+    def describe(self) -> Dict[str, Any]:
+        """Current settings as JSON-friendly values."""
+        return {
+            "ttft": self.ttft.spec,
+            "itl": self.itl.spec,
+            "tokens": f"{self.min_tokens}:{self.max_tokens}",
+            "chunk_tokens": self.chunk_tokens,
+            "error_429": self.error_429,
+            "error_5xx": self.error_5xx,
+            "stall": self.stall,
+            "stall_seconds": self.stall_seconds,
+            "retry_after": self.retry_after,
+        }
+
+
+class MockOpenRouter:
+    """Request handlers and counters for one stand-in instance."""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.stats: Counter = Counter()
+
+    def _fault(self) -> Optional[str]:
+        """Pick the injected failure for a request, if any."""
+        draw = self.config.rng.random()
+        if draw < self.config.error_429:
+            return "429"
+        draw -= self.config.error_429
+        if draw < self.config.error_5xx:
+            return "5xx"
+        draw -= self.config.error_5xx
+        if draw < self.config.stall:
+            return "stall"
+        return None
+
+    def _error(self, fault: str) -> web.Response:
+        if fault == "429":
+            status, message = 429, "Rate limit exceeded"
+            headers = {"Retry-After": str(self.config.retry_after)}
+        else:
+            status = self.config.rng.choice((500, 502, 503))
+            message = "Upstream provider error"
+            headers = {"Retry-After": str(self.config.retry_after)} if status == 503 else {}
+        self.stats[f"error_{status}"] += 1
+        return web.json_response({"error": {"code": status, "message": message}}, status=status, headers=headers)
+
+    def _completion_tokens(self, payload: Dict[str, Any]) -> List[str]:
+        count = self.config.rng.randint(self.config.min_tokens, self.config.max_tokens)
+        if payload.get("max_tokens"):
+            count = min(count, int(payload["max_tokens"]))
+        offset = self.config.rng.randrange(len(WORDS))
+        return [WORDS[(offset + i) % len(WORDS)] + " " for i in range(count)]
+
+    @staticmethod
+    def _prompt_tokens(payload: Dict[str, Any]) -> int:
+        # Same ~4 characters per token heuristic as the backend's fallback
+        return sum(len(m.get("content") or "") // 4 + 4 for m in payload.get("messages", []))
+
+    @staticmethod
+    def _usage(prompt_tokens: int, completion_tokens: int) -> Dict[str, int]:
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    async def completions(self, request: web.Request) -> web.StreamResponse:
+        """POST /chat/completions."""
+        payload = await request.json(loads=orjson.loads)
+        self.stats["requests"] += 1
+        fault = self._fault()
+        if fault in ("429", "5xx"):
+            return self._error(fault)
+
+        model = payload.get("model", "mock/model")
+        tokens = self._completion_tokens(payload)
+        prompt_tokens = self._prompt_tokens(payload)
+        if payload.get("stream"):
+            return await self._stream(request, payload, model, tokens, prompt_tokens, stalled=fault == "stall")
+
+        if fault == "stall":
+            self.stats["stalled"] += 1
+            await asyncio.sleep(self.config.stall_seconds)
+        # A non-streaming call returns after the whole generation
+        delay = self.config.ttft.sample(self.config.rng)
+        delay += sum(self.config.itl.sample(self.config.rng) for _ in range(len(tokens)))
+        await asyncio.sleep(delay)
+        self.stats["completed"] += 1
+        self.stats["completion_tokens"] += len(tokens)
+        return web.json_response({
+            "id": f"gen-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens).rstrip()},
+                "finish_reason": "stop",
+            }],
+            "usage": self._usage(prompt_tokens, len(tokens)),
+        }, dumps=lambda data: orjson.dumps(data).decode())
+
+    async def _stream(
+        self,
+        request: web.Request,
+        payload: Dict[str, Any],
+        model: str,
+        tokens: List[str],
+        prompt_tokens: int,
+        stalled: bool,
+    ) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        generation_id = f"gen-{uuid.uuid4().hex}"
+        created = int(time.time())
+        rng = self.config.rng
+        stall_at = rng.randrange(len(tokens)) if stalled and tokens else None
+
+        def frame(delta: Dict[str, Any], finish_reason: Optional[str] = None, usage: Optional[Dict] = None) -> bytes:
+            chunk = {
+                "id": generation_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            if usage:
+                chunk["usage"] = usage
+            return b"data: " + orjson.dumps(chunk) + b"\n\n"
+
+        try:
+            # OpenRouter sends keep-alive comments while the model is queued
+            await response.write(b": OPENROUTER PROCESSING\n\n")
+            await asyncio.sleep(self.config.ttft.sample(rng))
+            for start in range(0, len(tokens), self.config.chunk_tokens):
+                if stall_at is not None and start >= stall_at:
+                    self.stats["stalled"] += 1
+                    stall_at = None
+                    await asyncio.sleep(self.config.stall_seconds)
+                if start:
+                    await asyncio.sleep(sum(self.config.itl.sample(rng) for _ in range(self.config.chunk_tokens)))
+                await response.write(frame({"role": "assistant", "content": "".join(tokens[start:start + self.config.chunk_tokens])}))
+
+            include_usage = (payload.get("stream_options") or {}).get("include_usage")
+            usage = self._usage(prompt_tokens, len(tokens)) if include_usage else None
+            await response.write(frame({}, finish_reason="stop", usage=usage))
+            await response.write(b"data: [DONE]\n\n")
+            await response.write_eof()
+        except (ConnectionResetError, asyncio.CancelledError):
+            self.stats["client_disconnects"] += 1
+            raise
+
+        self.stats["completed"] += 1
+        self.stats["completion_tokens"] += len(tokens)
+        return response
+
+    async def head(self, request: web.Request) -> web.Response:
+        """HEAD used by LLMService.warm to pre-open connections."""
+        return web.Response()
+
+    async def get_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"stats": dict(self.stats), "config": self.config.describe()})
+
+    async def set_config(self, request: web.Request) -> web.Response:
+        try:
+            self.config.update(await request.json())
+        except (ValueError, TypeError) as e:
+            return web.json_response({"error": str(e)}, status=400)
+        return web.json_response({"config": self.config.describe()})
+
+    async def reset(self, request: web.Request) -> web.Response:
+        self.stats.clear()
+        return web.json_response({"stats": {}})
+
+
+def create_app(config: MockConfig) -> web.Application:
+    """
+    Build the stand-in application.
+
+    Args:
+        config: Latency, length and fault settings
+
+    Returns:
+        web.Application: aiohttp application
+    """
+    mock = MockOpenRouter(config)
+    app = web.Application()
+    app["mock"] = mock
+    # Served with and without OpenRouter's /api/v1 prefix
+    for path in ("/chat/completions", "/api/v1/chat/completions"):
+        app.router.add_post(path, mock.completions)
+        app.router.add_route("HEAD", path, mock.head)
+    app.router.add_get("/__mock/stats", mock.get_stats)
+    app.router.add_post("/__mock/config", mock.set_config)
+    app.router.add_post("/__mock/reset", mock.reset)
+    return app
+
+
+@asynccontextmanager
+async def run_mock(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> AsyncIterator[str]:
+    """
+    Run the stand-in on the current event loop, e.g. inside a load test.
+
+    Args:
+        config: Latency, length and fault settings
+        host: Bind address
+        port: Port, 0 for a free one
+
+    Yields:
+        str: URL to use as OPENROUTER_API_URL
+    """
+    runner = web.AppRunner(create_app(config), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = runner.addresses[0][1]
+    try:
+        yield f"http://{host}:{bound_port}/chat/completions"
+    finally:
+        await runner.cleanup()
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    """Command line options for MockConfig, shared with the load test."""
+    parser.add_argument("--ttft", default="lognormal:0.4,0.3", help="Time to first token distribution")
+    parser.add_argument("--itl", default="const:0.02", help="Inter-token delay distribution")
+    parser.add_argument("--tokens", default="40:200", help="Completion length range MIN:MAX")
+    parser.add_argument("--chunk-tokens", type=int, default=1, help="Tokens per streamed chunk")
+    parser.add_argument("--error-429", type=float, default=0.0, help="Fraction of requests answered 429")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="Fraction of requests answered 500/502/503")
+    parser.add_argument("--stall", type=float, default=0.0, help="Fraction of requests that stall")
+    parser.add_argument("--stall-seconds", type=float, default=60.0, help="Length of a stall")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds on 429/503")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible runs")
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    """MockConfig from parsed add_config_arguments options."""
+    return MockConfig(
+        ttft=args.ttft,
+        itl=args.itl,
+        tokens=args.tokens,
+        chunk_tokens=args.chunk_tokens,
+        error_429=args.error_429,
+        error_5xx=args.error_5xx,
+        stall=args.stall,
+        stall_seconds=args.stall_seconds,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local OpenRouter stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    config = config_from_args(args)
+    print(f"Mock OpenRouter on http://{args.host}:{args.port}/chat/completions {config.describe()}")
+    web.run_app(create_app(config), host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()
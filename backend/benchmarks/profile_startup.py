@@ -0,0 +1,116 @@
+"""
+Cold-start profile: import time of the application module and the duration of
+each background startup phase.
+
+Import time is measured in a fresh interpreter with `python -X importtime`, so
+cached modules in this process do not hide the cost. Startup phases run the
+real lifespan against whatever MongoDB, Redis and OpenRouter the environment
+points at.
+
+Usage: python -m benchmarks.profile_startup [--top N] [--skip-lifespan] [--json PATH]
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from benchmarks.harness import write_json
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile_imports(module: str = "main") -> List[Tuple[str, int, int]]:
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Args:
+        module: Module to import
+
+    Returns:
+        List of (module name, self microseconds, cumulative microseconds)
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def summarize_imports(rows: List[Tuple[str, int, int]], module: str, top: int) -> Dict[str, object]:
+    """Total import time, the slowest modules by self time and per top-level package."""
+    total = next((cumulative for name, _, cumulative in rows if name == module), 0)
+    packages: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in rows:
+        packages[name.split(".")[0]] += self_us
+    return {
+        "total_ms": round(total / 1000, 1),
+        "modules": [
+            {"module": name, "self_ms": round(self_us / 1000, 1), "cumulative_ms": round(cumulative_us / 1000, 1)}
+            for name, self_us, cumulative_us in sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+        ],
+        "packages": {
+            name: round(self_us / 1000, 1)
+            for name, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+    }
+
+
+async def profile_lifespan() -> Dict[str, object]:
+    """Run the application lifespan and time startup up to readiness."""
+    sys.path.insert(0, BACKEND_DIR)
+    import main
+    from app.core.startup import startup
+
+    start = time.perf_counter()
+    async with main.lifespan(main.app):
+        serving = time.perf_counter() - start
+        await startup.wait()
+        report = startup.report()
+    report["serving_ms"] = round(serving * 1000, 1)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Profile application cold start")
+    parser.add_argument("--top", type=int, default=15, help="Number of modules and packages to list")
+    parser.add_argument("--skip-lifespan", action="store_true", help="Only profile imports")
+    parser.add_argument("--json", metavar="PATH", help="Write results as JSON")
+    args = parser.parse_args()
+
+    imports = summarize_imports(profile_imports(), "main", args.top)
+    print(f"\nImport of main: {imports['total_ms']:.1f} ms")
+    print(f"{'module (self time)':<50} {'self ms':>10} {'cum ms':>10}")
+    for row in imports["modules"]:
+        print(f"{row['module']:<50} {row['self_ms']:>10.1f} {row['cumulative_ms']:>10.1f}")
+    print(f"\n{'package':<50} {'self ms':>10}")
+    for name, ms in imports["packages"].items():
+        print(f"{name:<50} {ms:>10.1f}")
+
+    results: Dict[str, object] = {"imports": imports}
+    if not args.skip_lifespan:
+        report = asyncio.run(profile_lifespan())
+        results["startup"] = report
+        print(f"\nServing after {report['serving_ms']:.1f} ms, warm-up complete after {report['total_ms']:.1f} ms")
+        print(f"{'phase':<50} {'ms':>10}")
+        for name, ms in sorted(report["phases"].items(), key=lambda item: item[1], reverse=True):
+            failed = f"  failed: {report['errors'][name]}" if name in report["errors"] else ""
+            print(f"{name:<50} {ms:>10.1f}{failed}")
+
+    write_json(args.json, "startup", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,56 +3,121 @@ Main FastAPI application.
 Production-ready chatbot service with MongoDB integration.
 """
 
+import asyncio
 from contextlib import asynccontextmanager
+from typing import Dict, List
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from app.core.config import settings
 from app.core.database import db_manager
+from app.core.drain import drain_coordinator
 from app.core.cache import cache_manager
+from app.core.container import build_container
+from app.core.health import health_prober
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics import mark_process_dead, render_metrics
+from app.core.middleware import RequestContextMiddleware
+from app.core.profiling import profiler
+from app.core.startup import Phase, startup
+from app.services.chatbot_service import ChatbotService
+from app.services.intent_service import intent_router
+from app.services.llm_service import llm_service
+from app.utils.tokenizer import token_counter
 from app.api.v1 import api_router
 from app.utils.logger import setup_logging, get_logger
-import time
 
 # Setup logging
 setup_logging()
 logger = get_logger(__name__)
 
 
+async def _connect_mongodb() -> None:
+    """Connect to MongoDB; indexes are built in a later phase."""
+    await db_manager.connect(create_indexes=False)
+    if db_manager.is_connected:
+        logger.info("MongoDB connection established")
+    else:
+        logger.warning("Application will continue in degraded mode without database")
+
+
+async def _create_indexes() -> None:
+    if db_manager.is_connected:
+        await db_manager.create_indexes()
+
+
+async def _connect_redis() -> None:
+    if not settings.REDIS_ENABLED:
+        logger.info("Redis is disabled, skipping connection")
+        return
+    await cache_manager.connect()
+    if cache_manager.is_connected:
+        logger.info("Redis connection established")
+    else:
+        logger.warning("Redis connection failed, caching disabled")
+
+
+async def _warm_llm_connections() -> None:
+    if settings.LLM_WARM_CONNECTIONS > 0:
+        opened = await llm_service.warm(settings.LLM_WARM_CONNECTIONS)
+        logger.info(f"Pre-opened {opened} OpenRouter connections")
+
+
+async def _warm_knowledgebase() -> None:
+    tokens = await asyncio.to_thread(ChatbotService.warm)
+    logger.info(f"System prompt ready ({tokens} tokens)")
+
+
+def startup_stages() -> List[Dict[str, Phase]]:
+    """
+    Background startup phases. Phases in a stage run concurrently; blocking
+    file and CPU work runs in threads so the event loop keeps serving probes.
+    
+    Returns:
+        List of {phase name: coroutine function}
+    """
+    return [
+        {
+            "mongodb": _connect_mongodb,
+            "redis": _connect_redis,
+            "tokenizer": lambda: asyncio.to_thread(token_counter.load),
+            "intents": lambda: asyncio.to_thread(intent_router.load),
+            "llm_connections": _warm_llm_connections,
+        },
+        {
+            # The prompt token count is cached, so count it with the real tokenizer
+            "knowledgebase": _warm_knowledgebase,
+            "mongodb_indexes": _create_indexes,
+            # Refresh probes so readiness reflects the new connections immediately
+            "health_probe": health_prober.probe,
+        },
+    ]
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Lifespan context manager for application startup and shutdown.
-    Handles database connections and cleanup.
+    Connections and warm-up run in the background so the port binds
+    immediately; /readyz reports not ready until they finish.
     """
     # Startup
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     
-    try:
-        # Connect to MongoDB
-        try:
-            await db_manager.connect()
-            logger.info("MongoDB connection established")
-        except Exception as e:
-            logger.warning(f"MongoDB connection failed: {e}")
-            logger.warning("Application will continue in degraded mode without database")
-        
-        # Connect to Redis if enabled
-        if settings.REDIS_ENABLED:
-            await cache_manager.connect()
-            if cache_manager.is_connected:
-                logger.info("Redis connection established")
-            else:
-                logger.warning("Redis connection failed, caching disabled")
-        else:
-            logger.info("Redis is disabled, skipping connection")
-        
-        logger.info("Application startup complete")
-        
-    except Exception as e:
-        logger.error(f"Error during startup: {e}")
-        raise
+    # Shared services, resolved by request dependencies from app.state
+    app.state.container = build_container()
+    
+    # Started first so blocking work during warm-up is caught too
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    
+    startup.start(startup_stages())
+    
+    # Probe dependencies in the background; health endpoints serve the cached result
+    health_prober.start()
+    
+    logger.info("Application startup complete, warm-up continues in background")
     
     yield
     
@@ -60,6 +125,20 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down application...")
     
     try:
+        # Let detached streams and pending writes finish while the clients are still open
+        report = await drain_coordinator.drain()
+        if report:
+            logger.info("Drain complete: " + ", ".join(
+                f"{kind} {counts['completed']} completed, {counts['abandoned']} abandoned"
+                for kind, counts in report.items()
+            ))
+        
+        await startup.stop()
+        await health_prober.stop()
+        await loop_monitor.stop()
+        profiler.stop_tracing()
+        await llm_service.close()
+        
         # Disconnect from MongoDB
         await db_manager.disconnect()
         logger.info("MongoDB connection closed")
@@ -69,6 +148,7 @@ async def lifespan(app: FastAPI):
             await cache_manager.disconnect()
             logger.info("Redis connection closed")
         
+        mark_process_dead()
         logger.info("Application shutdown complete")
         
     except Exception as e:
@@ -82,6 +162,7 @@ app = FastAPI(
     description="Production-ready chatbot service for BIGFAT AI Labs",
     docs_url="/docs" if settings.is_development else None,
     redoc_url="/redoc" if settings.is_development else None,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -93,34 +174,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "X-Stream-ID"],
 )
 
 
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all incoming requests and their processing time."""
-    start_time = time.time()
-    
-    # Log request
-    logger.info(f"Request: {request.method} {request.url.path}")
-    
-    # Process request
-    response = await call_next(request)
-    
-    # Calculate processing time
-    process_time = time.time() - start_time
-    
-    # Add custom header
-    response.headers["X-Process-Time"] = str(process_time)
-    
-    # Log response
-    logger.info(
-        f"Response: {request.method} {request.url.path} "
-        f"- Status: {response.status_code} - Time: {process_time:.3f}s"
-    )
-    
-    return response
+# Request context middleware (request IDs, Server-Timing, access log, HTTP metrics).
+# Added last so it wraps CORS and times the whole request.
+app.add_middleware(RequestContextMiddleware)
 
 
 # Global exception handler
@@ -129,7 +189,7 @@ async def global_exception_handler(request: Request, exc: Exception):
     """Handle all unhandled exceptions."""
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "detail": "Internal server error",
@@ -160,13 +220,11 @@ async def root():
 async def health():
     """
     Global health check endpoint.
-    Checks connectivity to all required services.
+    Reports the cached result of the background dependency probes.
     """
-    mongodb_status = await db_manager.health_check()
-    
-    redis_status = None
-    if cache_manager.is_enabled:
-        redis_status = await cache_manager.health_check()
+    checks = health_prober.snapshot()
+    mongodb_status = checks.get("mongodb", {}).get("healthy", False)
+    redis_status = checks.get("redis", {}).get("healthy", False)
     
     services = {
         "mongodb": "healthy" if mongodb_status else "unhealthy",
@@ -179,18 +237,57 @@ async def health():
     return {
         "status": overall_status,
         "services": services,
+        "checks": checks,
         "version": settings.APP_VERSION
     }
 
 
-# Run with uvicorn if executed directly
-if __name__ == "__main__":
-    import uvicorn
-    
-    uvicorn.run(
-        "main:app",
-        host=settings.HOST,
-        port=settings.PORT,
-        reload=settings.is_development,
-        log_level=settings.LOG_LEVEL.lower()
+# Liveness: the process is serving requests; never touches dependencies
+@app.get("/livez", include_in_schema=False)
+async def livez():
+    """Liveness probe."""
+    return {"status": "alive"}
+
+
+# Readiness: whether this instance should receive traffic
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness probe. Returns 503 until ready."""
+    readiness = health_prober.readiness()
+    return ORJSONResponse(
+        status_code=status.HTTP_200_OK if readiness["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if readiness["ready"] else "not_ready",
+            "reasons": readiness["reasons"],
+            "checks": health_prober.snapshot(),
+            "startup": startup.report()
+        }
     )
+
+
+# Prometheus metrics endpoint
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Expose Prometheus metrics."""
+        payload, content_type = render_metrics()
+        return Response(content=payload, media_type=content_type)
+
+
+# Run directly: auto-reload in development, multi-worker launcher otherwise
+if __name__ == "__main__":
+    if settings.is_development:
+        import uvicorn
+        
+        uvicorn.run(
+            "main:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            reload=True,
+            log_level=settings.LOG_LEVEL.lower()
+        )
+    else:
+        # Multi-worker launcher with per-worker pool sizing
+        import serve
+        
+        serve.main()
@@ -0,0 +1,144 @@
+"""
+Production entry point.
+Runs the app under uvicorn with one worker per available CPU, uvloop and
+httptools, and divides connection pool limits across workers so the instance
+as a whole stays within MongoDB, Redis and OpenRouter connection limits.
+
+Usage: python serve.py [--workers N] [--host HOST] [--port PORT]
+"""
+
+import argparse
+import importlib.util
+import os
+import shutil
+import tempfile
+from typing import Dict, Optional
+import uvicorn
+from app.core.config import settings
+from app.utils.logger import setup_logging, get_logger
+
+logger = get_logger("serve")
+
+
+def available_cpus() -> int:
+    """
+    CPUs this process may use, honouring affinity and a cgroup v2 CPU quota.
+
+    Returns:
+        int: Number of usable CPUs (at least 1)
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+
+    return max(1, cpus)
+
+
+def resolve_workers(requested: Optional[int] = None) -> int:
+    """
+    Number of worker processes: explicit argument, then WORKERS, then CPU count.
+
+    Args:
+        requested: Worker count from the command line
+
+    Returns:
+        int: Worker count
+    """
+    workers = requested if requested is not None else settings.WORKERS
+    return workers if workers > 0 else available_cpus()
+
+
+def per_worker(total: int, workers: int) -> int:
+    """Share of an instance-wide limit for one worker (at least 1)."""
+    return max(1, total // workers)
+
+
+def worker_environment(workers: int, port: int) -> Dict[str, str]:
+    """
+    Environment overrides inherited by every worker.
+    Settings read environment variables before .env, so these take precedence.
+
+    Args:
+        workers: Worker count
+        port: Listening port, used to keep metrics of separate instances apart
+
+    Returns:
+        Dict of environment variables to set
+    """
+    mongo_max = per_worker(settings.MONGODB_MAX_POOL_SIZE, workers)
+    llm_max = per_worker(settings.LLM_MAX_CONNECTIONS, workers)
+    env = {
+        "MONGODB_MAX_POOL_SIZE": str(mongo_max),
+        "MONGODB_MIN_POOL_SIZE": str(min(settings.MONGODB_MIN_POOL_SIZE, mongo_max)),
+        "REDIS_POOL_SIZE": str(per_worker(settings.REDIS_POOL_SIZE, workers)),
+        "LLM_MAX_CONNECTIONS": str(llm_max),
+        "LLM_WARM_CONNECTIONS": str(min(settings.LLM_WARM_CONNECTIONS, llm_max)),
+    }
+
+    if workers > 1 and settings.METRICS_ENABLED and not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        env["PROMETHEUS_MULTIPROC_DIR"] = os.path.join(tempfile.gettempdir(), f"prometheus-{port}")
+
+    return env
+
+
+def prepare_multiproc_dir(path: str) -> None:
+    """Start with an empty metrics directory; files left by a previous run would be aggregated."""
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=f"Run {settings.APP_NAME}")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: WORKERS or CPU count)")
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    args = parser.parse_args()
+
+    # Not at import time: spawned workers re-import this module
+    setup_logging()
+
+    workers = resolve_workers(args.workers)
+    env = worker_environment(workers, args.port)
+    os.environ.update(env)
+    if "PROMETHEUS_MULTIPROC_DIR" in env:
+        prepare_multiproc_dir(env["PROMETHEUS_MULTIPROC_DIR"])
+
+    loop = "uvloop" if _available("uvloop") else "asyncio"
+    http = "httptools" if _available("httptools") else "h11"
+    if loop != "uvloop" or http != "httptools":
+        logger.warning(f"uvloop/httptools not installed, using {loop}/{http}")
+
+    logger.info(
+        f"Starting {workers} worker(s) on {args.host}:{args.port} ({loop}/{http}); per worker: "
+        + ", ".join(f"{key}={value}" for key, value in env.items())
+    )
+
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        # Requests are logged by RequestContextMiddleware
+        access_log=False,
+        log_level=settings.LOG_LEVEL.lower(),
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_SECONDS,
+    )
+
+
+if __name__ == "__main__":
+    main()